@@ -17,6 +17,58 @@ class Settings(BaseSettings):
     DATA_ROOT: str = "/data"
     CORS_ORIGINS: str = "http://localhost:8080"
 
+    # preprocess: auto | memory | streaming
+    PREPROCESS_MODE: str = "auto"
+    PREPROCESS_MEMORY_BUDGET_MB: int = 1024
+
+    # features: preprocess와 train 사이의 시계열 특성 스테이지(run params의 "features"로 run별 spec 지정/false로 생략)
+    FEATURES_ENABLED: bool = True
+
+    # steps: 스텝마다 아티팩트를 다시 로딩 | fused: train→evaluate가 메모리의 모델/split 공유
+    PIPELINE_EXECUTION_MODE: str = "fused"
+
+    # admission: 같은 (데이터셋 hash, model_type, params)의 queued run이 있으면 새 run을 만들지 않음
+    RUN_COALESCE_ENABLED: bool = True
+    # 동시 실행 제한(워커 수와 무관하게 클러스터 전체 기준, Redis lease). 예: {"cpu": 4}, {"hist_gb": 1}
+    QUEUE_CONCURRENCY_LIMITS: dict[str, int] = {}
+    MODEL_TYPE_CONCURRENCY_LIMITS: dict[str, int] = {}
+    CONCURRENCY_RETRY_S: float = 10  # 자리가 없으면 이 시간 뒤 다시 큐에 넣음
+    CONCURRENCY_MAX_RETRIES: int = 360  # 이만큼 다시 넣어도 자리가 없으면 run을 failed로(기본 약 1시간)
+    CONCURRENCY_LEASE_S: int = 6 * 3600  # 워커가 죽어도 이 시간이 지나면 자리 반환
+    # 스텝 작업이 run 조회/실패 기록부터 못 하면(일시적 DB 오류) 이 간격으로 최대 횟수만큼 다시 시도
+    STEP_DB_RETRY_S: float = 5
+    STEP_DB_MAX_RETRIES: int = 3
+
+    # train: 0이면 컨테이너에 할당된 코어 수 / WORKER_CONCURRENCY, 예산 0이면 모델별 기본값
+    WORKER_CONCURRENCY: int = 1
+    TRAIN_N_JOBS: int = 0
+    TRAIN_TIME_BUDGET_S: float = 0
+
+    # serving: 메모리에 유지할 모델 번들 수(LRU)
+    SERVING_CACHE_SIZE: int = 8
+    SERVING_MAX_ROWS: int = 100_000
+    SERVING_N_JOBS: int = 1
+
+    # step cache (DATA_ROOT/cache)
+    STEP_CACHE_ENABLED: bool = True
+    STEP_CACHE_MAX_GB: float = 20.0
+    STEP_CACHE_MAX_AGE_DAYS: int = 30
+    PIPELINE_CODE_VERSION: str = ""  # 비우면 pipelines/*.py 내용 해시
+
+    # model artifact: "none"이면 비압축(mmap 로딩), "zlib:3"/"lzma:1"/"lz4" 등은 작지만 로딩 시 전체 해제
+    MODEL_COMPRESSION: str = "none"
+
+    # artifact retention: 승격되지 않은 종료 run의 processed/features/model 정리
+    ARTIFACT_RETENTION_DAYS: int = 30
+    ARTIFACT_MAX_GB: float = 100.0  # DATA_ROOT/runs 전체 예산, 초과 시 오래된 run부터 정리
+    ARTIFACT_GC_INTERVAL_S: int = 3600
+
+    # DB 연결 풀(프로세스·엔진당): API는 async 엔진, 워커는 sync 엔진 사용
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_S: float = 10  # 풀이 가득 찼을 때 연결을 기다리는 최대 시간
+    DB_POOL_RECYCLE_S: int = 1800
+
     @property
     def database_url(self) -> str:
         return (
@@ -24,6 +76,10 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return self.database_url.replace("+psycopg2", "+asyncpg", 1)
+
     @property
     def redis_url(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
@@ -1,41 +1,352 @@
+import base64
+import json
+import math
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy import select, desc, update, delete, insert, and_, or_, func
 from . import models
+from .services.events import STEP_PROFILE_FIELDS, publish_event, publish_events, run_payload, step_payload, dataset_payload
+
+STEP_NAMES = ("preprocess", "features", "train", "evaluate")
+TERMINAL = (models.RunStatus.success, models.RunStatus.failed, models.RunStatus.canceled)
+ACTIVE = (models.RunStatus.queued, models.RunStatus.running)
+GC_MARKERS = ("collected", "collected_at", "collected_bytes")
+PRIORITY_RANK = {models.RunPriority.low: 0, models.RunPriority.normal: 1, models.RunPriority.high: 2}
+CANCELED_STEP_MESSAGE = "run canceled"  # 취소로 skipped된 스텝 표시(retry 시 미완료로 취급)
+NON_SCORE_METRICS = ("val_samples", "db_round_trips")  # 순위/추세 대상이 아닌 수치(표본 수, 계측 값)
 
 def create_dataset(db: Session, name: str, source_path: str, meta: dict):
-    ds = models.Dataset(name=name, source_path=source_path, meta=meta or {})
+    ds = models.Dataset(name=name, source_path=source_path, meta=meta or {}, sha256=(meta or {}).get("sha256"))
     db.add(ds)
     db.commit()
     db.refresh(ds)
+    publish_event("dataset.created", dataset_payload(ds))
     return ds
 
-def list_datasets(db: Session, limit: int = 100):
-    stmt = select(models.Dataset).order_by(desc(models.Dataset.id)).limit(limit)
-    return list(db.scalars(stmt).all())
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode("|".join(str(v) for v in values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list[str]:
+    """잘못된 cursor는 ValueError"""
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+def _page(rows: list, limit: int, cursor_of) -> tuple[list, str | None]:
+    """limit+1개를 읽어 다음 페이지 존재 여부 판단"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, cursor_of(rows[-1])
+    return rows, None
+
+def get_dataset(db: Session, dataset_id: int):
+    return db.get(models.Dataset, dataset_id)
 
-def create_run(db: Session, dataset_id: int, model_type: str):
-    run = models.Run(dataset_id=dataset_id, model_type=model_type, status=models.RunStatus.queued)
-    db.add(run)
+def append_dataset_segment(db: Session, dataset_id: int, source_path: str, sha256: str):
+    """
+    데이터셋에 세그먼트 추가. 원본/기존 세그먼트와 같은 checksum이면 추가하지 않고 (dataset, False).
+    동시 append가 같은 seq를 쓰지 않도록 데이터셋 행을 잠그고(SELECT ... FOR UPDATE) 다음 seq 계산
+    """
+    stmt = select(models.Dataset).where(models.Dataset.id == dataset_id).with_for_update().options(selectinload(models.Dataset.segments))
+    ds = db.scalars(stmt).first()
+    if not ds:
+        return None, False
+    if sha256 == ds.sha256 or any(seg.sha256 == sha256 for seg in ds.segments):
+        return ds, False
+    seq = ds.segments[-1].seq + 1 if ds.segments else 1
+    ds.segments.append(models.DatasetSegment(seq=seq, source_path=source_path, sha256=sha256))
     db.commit()
-    db.refresh(run)
+    db.refresh(ds)
+    segments = [{"seq": s.seq, "source_path": s.source_path, "sha256": s.sha256} for s in ds.segments]
+    publish_event("dataset.appended", {**dataset_payload(ds), "segments": segments})
+    return ds, True
+
+def get_dataset_by_sha256(db: Session, sha256: str):
+    stmt = select(models.Dataset).where(models.Dataset.sha256 == sha256).order_by(models.Dataset.id).limit(1)
+    return db.scalars(stmt).first()
+
+def existing_dataset_ids(db: Session, dataset_ids) -> set[int]:
+    stmt = select(models.Dataset.id).where(models.Dataset.id.in_(set(dataset_ids)))
+    return set(db.scalars(stmt).all())
+
+def list_datasets(db: Session, limit: int = 100, *, cursor: str | None = None):
+    """id 내림차순 keyset 페이지 → (items, next_cursor)"""
+    stmt = select(models.Dataset).options(selectinload(models.Dataset.segments))
+    if cursor:
+        (last_id,) = decode_cursor(cursor)
+        stmt = stmt.where(models.Dataset.id < int(last_id))
+    stmt = stmt.order_by(desc(models.Dataset.id)).limit(limit + 1)
+    return _page(list(db.scalars(stmt).all()), limit, lambda d: encode_cursor(d.id))
 
-    # init steps
-    for step_name in ["preprocess", "train", "evaluate"]:
-        st = models.RunStep(run_id=run.id, name=step_name, status=models.StepStatus.pending)
-        db.add(st)
+def update_dataset_meta(db: Session, dataset_id: int, meta: dict):
+    ds = db.get(models.Dataset, dataset_id)
+    if not ds:
+        return None
+    ds.meta = {**(ds.meta or {}), **meta}
+    if meta.get("sha256"):
+        ds.sha256 = meta["sha256"]
     db.commit()
-    db.refresh(run)
-    return run
+    db.refresh(ds)
+    return ds
+
+def create_run(db: Session, dataset_id: int, model_type: str, *, params: dict | None = None, sweep_id: int | None = None,
+               parent_run_id: int | None = None):
+    spec = {"dataset_id": dataset_id, "model_type": model_type, "params": params, "parent_run_id": parent_run_id}
+    return create_runs(db, [spec], sweep_id=sweep_id)[0]
+
+def create_runs(db: Session, specs: list[dict], *, sweep_id: int | None = None):
+    """
+    run + step 행을 한 트랜잭션(flush 1회, commit 1회)으로 생성.
+    specs: [{"dataset_id", "model_type", "params", "parent_run_id", "priority"}], 반환 순서는 specs 순서와 같음
+    """
+    runs = []
+    for spec in specs:
+        run = models.Run(dataset_id=spec["dataset_id"], model_type=spec["model_type"], params=spec.get("params") or {},
+                         parent_run_id=spec.get("parent_run_id"), sweep_id=sweep_id, status=models.RunStatus.queued,
+                         priority=models.RunPriority(spec.get("priority") or "normal"))
+        run.steps = [models.RunStep(name=name, status=models.StepStatus.pending) for name in STEP_NAMES]
+        runs.append(run)
+    db.add_all(runs)
+    db.flush()
+    ids = [r.id for r in runs]
+    db.commit()
+
+    # commit으로 만료된 속성을 run마다 refresh하지 않고 steps까지 두 쿼리로 다시 읽음
+    stmt = select(models.Run).where(models.Run.id.in_(ids)).options(selectinload(models.Run.steps))
+    by_id = {r.id: r for r in db.scalars(stmt).all()}
+    runs = [by_id[i] for i in ids]
+    publish_events([("run.created", {**run_payload(r), "steps": [step_payload(st) for st in r.steps]}) for r in runs])
+    return runs
+
+def _dataset_keys(db: Session, dataset_ids) -> dict[int, str]:
+    """coalescing 기준 데이터셋 키: 원본 sha256(세그먼트가 없을 때), 그 외에는 dataset id"""
+    D, S = models.Dataset, models.DatasetSegment
+    stmt = (
+        select(D.id, D.sha256, func.count(S.id))
+        .outerjoin(S, S.dataset_id == D.id)
+        .where(D.id.in_(set(dataset_ids)))
+        .group_by(D.id, D.sha256)
+    )
+    return {i: f"sha256:{sha}" if sha and not n else f"id:{i}" for i, sha, n in db.execute(stmt)}
 
-def get_run(db: Session, run_id: int):
+def _run_key(dataset_key: str, model_type: str, params: dict | None, parent_run_id: int | None) -> tuple:
+    return dataset_key, model_type, json.dumps(params or {}, sort_keys=True), parent_run_id
+
+def submit_runs(db: Session, specs: list[dict], *, coalesce: bool = True) -> tuple[list, list]:
+    """
+    run 제출(admission) → (specs 순서의 run 목록, broker에 발행할 run 목록).
+    coalesce면 같은 (데이터셋 hash, model_type, params, parent_run_id)로 queued인 run(요청 안의 중복 포함)은 새로 만들지 않고 재사용.
+    재사용한 run보다 높은 priority로 요청되면 priority를 올리고 attempt를 증가시켜 다시 발행(이전 메시지는 워커가 무시)
+    """
+    if not coalesce:
+        runs = create_runs(db, specs)
+        return runs, runs
+
+    Run, D = models.Run, models.Dataset
+    ds_keys = _dataset_keys(db, {s["dataset_id"] for s in specs})
+    keys = [_run_key(ds_keys.get(s["dataset_id"], f"id:{s['dataset_id']}"), s["model_type"], s.get("params"), s.get("parent_run_id")) for s in specs]
+    hashes = {k[0].split(":", 1)[1] for k in keys if k[0].startswith("sha256:")}
+    # 같은 데이터셋(같은 원본 hash 포함)에 대한 동시 제출 직렬화: queued 확인 ~ 생성(commit) 사이에 다른 제출이 끼지 않음.
+    # id 순서로 잠가 교착 방지
+    lock = select(D.id).where(or_(D.id.in_({s["dataset_id"] for s in specs}), D.sha256.in_(hashes))).order_by(D.id).with_for_update()
+    db.execute(lock).all()
+    stmt = (
+        select(Run)
+        .join(D, Run.dataset_id == D.id)
+        .where(Run.status == models.RunStatus.queued, Run.sweep_id.is_(None), Run.model_type.in_({s["model_type"] for s in specs}))
+        .where(or_(Run.dataset_id.in_({s["dataset_id"] for s in specs}), D.sha256.in_(hashes)))
+        .order_by(Run.id)
+    )
+    candidates = list(db.scalars(stmt).all())
+    cand_keys = _dataset_keys(db, {r.dataset_id for r in candidates}) if candidates else {}
+    queued = {}
+    for r in candidates:
+        queued.setdefault(_run_key(cand_keys[r.dataset_id], r.model_type, r.params, r.parent_run_id), r)
+
+    slots, new_specs, pending, raise_to = [], [], {}, {}
+    for spec, key in zip(specs, keys):
+        priority = models.RunPriority(spec.get("priority") or "normal")
+        run = queued.get(key)
+        if run is not None:
+            slots.append(run)
+            if PRIORITY_RANK[priority] > PRIORITY_RANK[raise_to.get(run.id, run.priority)]:
+                raise_to[run.id] = priority
+        elif key in pending:
+            j = pending[key]
+            slots.append(j)
+            if PRIORITY_RANK[priority] > PRIORITY_RANK[new_specs[j]["priority"]]:
+                new_specs[j]["priority"] = priority
+        else:
+            pending[key] = len(new_specs)
+            slots.append(len(new_specs))
+            new_specs.append({**spec, "priority": priority})
+
+    # priority 상향: 아직 queued인 경우에만(조건부 UPDATE)
+    raised = []
+    for run_id, priority in raise_to.items():
+        stmt = (
+            update(Run)
+            .where(Run.id == run_id, Run.status == models.RunStatus.queued)
+            .values(priority=priority, attempt=Run.attempt + 1)
+            .returning(Run.id)
+        )
+        if db.execute(stmt).first():
+            raised.append(run_id)
+    created = create_runs(db, new_specs) if new_specs else []
+    if not created:
+        db.commit()  # priority 상향 반영 + 데이터셋 행 잠금 해제
+
+    runs = []
+    for slot in slots:
+        if isinstance(slot, int):
+            runs.append(created[slot])
+        else:
+            slot.coalesced = True  # 응답(RunOut.coalesced) 표시용
+            runs.append(slot)
+    bumped = [r for r in queued.values() if r.id in raised]
+    if bumped:
+        publish_events([("run.updated", run_payload(r)) for r in bumped])
+    return runs, created + bumped
+
+def run_dispatch_info(db: Session, run_ids: list[int]) -> list[tuple[int, int, models.RunPriority]]:
+    """발행에 필요한 (id, attempt, priority), run_ids 순서"""
+    stmt = select(models.Run.id, models.Run.attempt, models.Run.priority).where(models.Run.id.in_(set(run_ids)))
+    by_id = {row.id: (row.id, row.attempt or 0, row.priority) for row in db.execute(stmt)}
+    return [by_id[i] for i in run_ids if i in by_id]
+
+def get_run_status(db: Session, run_id: int) -> models.RunStatus | None:
+    return db.scalar(select(models.Run.status).where(models.Run.id == run_id))
+
+def cancel_run(db: Session, run_id: int):
+    """
+    queued/running run을 canceled로(조건부 UPDATE). 아직 시작하지 않은(pending) 스텝은 skipped로.
+    이미 종료된 run이면 None
+    """
+    runs, steps = models.Run.__table__, models.RunStep.__table__
+    now = datetime.utcnow()
+    stmt = (
+        update(runs)
+        .where(runs.c.id == run_id, runs.c.status.in_([models.RunStatus.queued, models.RunStatus.running]))
+        .values(status=models.RunStatus.canceled, finished_at=now)
+        .returning(*runs.c)
+    )
+    row = db.execute(stmt).first()
+    step_rows = []
+    if row is not None:
+        step_stmt = (
+            update(steps)
+            .where(steps.c.run_id == run_id, steps.c.status == models.StepStatus.pending)
+            .values(status=models.StepStatus.skipped, message=CANCELED_STEP_MESSAGE, finished_at=now)
+            .returning(*steps.c)
+        )
+        step_rows = db.execute(step_stmt).all()
+    db.commit()
+    if row is not None:
+        publish_events([("step.updated", step_payload(st)) for st in step_rows] + [("run.updated", run_payload(row))])
+    return row
+
+def fail_run(db: Session, run_id: int, attempt: int, step_name: str, error: str):
+    """
+    워커가 상태 기록 전에 실패한 run을 failed로(조건부 UPDATE). 같은 attempt이고 failed/canceled가 아닐 때만 기록하고,
+    실행 중이던 스텝은 pending/running일 때만 failed로. 이미 종료/재시도된 run이면 None
+    """
+    runs, steps = models.Run.__table__, models.RunStep.__table__
+    now = datetime.utcnow()
+    stmt = (
+        update(runs)
+        .where(runs.c.id == run_id, runs.c.attempt == attempt,
+               runs.c.status.notin_([models.RunStatus.failed, models.RunStatus.canceled]))
+        .values(status=models.RunStatus.failed, error=error, finished_at=now)
+        .returning(*runs.c)
+    )
+    row = db.execute(stmt).first()
+    step_row = None
+    if row is not None:
+        step_stmt = (
+            update(steps)
+            .where(steps.c.run_id == run_id, steps.c.name == step_name,
+                   steps.c.status.in_([models.StepStatus.pending, models.StepStatus.running]))
+            .values(status=models.StepStatus.failed, message=error, finished_at=now)
+            .returning(*steps.c)
+        )
+        step_row = db.execute(step_stmt).first()
+    db.commit()
+    events = []
+    if step_row is not None:
+        events.append(("step.updated", step_payload(step_row)))
+    if row is not None:
+        events.append(("run.updated", run_payload(row)))
+    publish_events(events)
+    return row
+
+def step_done(step: models.RunStep) -> bool:
+    """resume 입력으로 쓸 수 있는 스텝: 성공했거나 설정으로 생략됨(취소로 skipped된 스텝 제외)"""
+    if step.status == models.StepStatus.skipped:
+        return step.message != CANCELED_STEP_MESSAGE
+    return step.status == models.StepStatus.success
+
+def get_run(db: Session, run_id: int, *, eager: bool = False):
     stmt = select(models.Run).where(models.Run.id == run_id)
+    if eager:
+        stmt = stmt.options(selectinload(models.Run.steps), joinedload(models.Run.dataset))
     run = db.scalars(stmt).first()
     return run
 
-def list_runs(db: Session, limit: int = 200):
-    stmt = select(models.Run).order_by(desc(models.Run.id)).limit(limit)
-    return list(db.scalars(stmt).all())
+def list_runs(
+    db: Session,
+    limit: int = 50,
+    *,
+    cursor: str | None = None,
+    status: list[models.RunStatus] | None = None,
+    dataset_id: int | None = None,
+    model_type: str | None = None,
+    sweep_id: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+):
+    """
+    (created_at, id) 내림차순 keyset 페이지 → (items, next_cursor).
+    OFFSET 없이 마지막 행 위치부터 이어 읽고, steps는 selectinload로 한 번에 로딩(N+1 방지)
+    """
+    Run = models.Run
+    stmt = select(Run).options(selectinload(Run.steps))
+    if status:
+        stmt = stmt.where(Run.status.in_(status))
+    if dataset_id is not None:
+        stmt = stmt.where(Run.dataset_id == dataset_id)
+    if model_type:
+        stmt = stmt.where(Run.model_type == model_type)
+    if sweep_id is not None:
+        stmt = stmt.where(Run.sweep_id == sweep_id)
+    if created_after:
+        stmt = stmt.where(Run.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Run.created_at < created_before)
+    if cursor:
+        ts, last_id = decode_cursor(cursor)
+        ts, last_id = datetime.fromisoformat(ts), int(last_id)
+        stmt = stmt.where(or_(Run.created_at < ts, and_(Run.created_at == ts, Run.id < last_id)))
+    stmt = stmt.order_by(desc(Run.created_at), desc(Run.id)).limit(limit + 1)
+    return _page(list(db.scalars(stmt).all()), limit, lambda r: encode_cursor(r.created_at.isoformat(), r.id))
+
+def get_promoted_run(db: Session):
+    stmt = select(models.Run).where(models.Run.promoted.is_(True)).order_by(desc(models.Run.promoted_at)).limit(1)
+    return db.scalars(stmt).first()
+
+def set_run_promoted(db: Session, run_id: int, promoted: bool):
+    run = get_run(db, run_id)
+    if not run:
+        return None
+    if promoted:
+        # 서빙 모델은 하나만 유지
+        db.execute(update(models.Run).where(models.Run.promoted.is_(True)).values(promoted=False))
+        run.promoted_at = datetime.utcnow()
+    run.promoted = promoted
+    db.commit()
+    db.refresh(run)
+    publish_event("run.updated", run_payload(run))
+    return run
 
 def set_run_status(db: Session, run_id: int, status: models.RunStatus, *, error: str | None = None):
     run = get_run(db, run_id)
@@ -50,6 +361,7 @@ def set_run_status(db: Session, run_id: int, status: models.RunStatus, *, error:
         run.error = error
     db.commit()
     db.refresh(run)
+    publish_event("run.updated", run_payload(run))
     return run
 
 def set_step_status(db: Session, run_id: int, step_name: str, status: models.StepStatus, message: str | None = None):
@@ -66,8 +378,35 @@ def set_step_status(db: Session, run_id: int, step_name: str, status: models.Ste
         step.message = message
     db.commit()
     db.refresh(step)
+    publish_event("step.updated", step_payload(step))
     return step
 
+def reset_run_from_step(db: Session, run_id: int, from_step: str):
+    """
+    retry 준비: from_step 이후 스텝을 pending으로 되돌리고 run을 queued로, attempt를 1 증가.
+    이전 스텝의 상태/아티팩트는 그대로 두어 resume 입력으로 사용
+    """
+    run = get_run(db, run_id, eager=True)
+    if not run:
+        return None
+    names = STEP_NAMES[STEP_NAMES.index(from_step):]
+    reset = [st for st in run.steps if st.name in names]
+    for st in reset:
+        st.status = models.StepStatus.pending
+        st.started_at = st.finished_at = st.message = None
+        for field in STEP_PROFILE_FIELDS:
+            setattr(st, field, None)
+    run.status = models.RunStatus.queued
+    run.attempt = (run.attempt or 0) + 1
+    db.execute(delete(models.RunMetric).where(models.RunMetric.run_id == run_id))  # 다시 성공할 때 새로 기록
+    # retention으로 정리된 run은 preprocess부터만 재시도 가능(다른 스텝은 입력 파일 검사에서 409) → 정리 표시 해제
+    run.artifacts = {k: v for k, v in (run.artifacts or {}).items() if k not in GC_MARKERS}
+    run.finished_at = run.error = None
+    db.commit()
+    db.refresh(run)
+    publish_events([("step.updated", step_payload(st)) for st in reset] + [("run.updated", run_payload(run))])
+    return run
+
 def update_run_artifacts_and_metrics(db: Session, run_id: int, artifacts: dict | None = None, metrics: dict | None = None):
     run = get_run(db, run_id)
     if not run:
@@ -78,4 +417,190 @@ def update_run_artifacts_and_metrics(db: Session, run_id: int, artifacts: dict |
         run.metrics = {**(run.metrics or {}), **metrics}
     db.commit()
     db.refresh(run)
+    publish_event("run.updated", run_payload(run))
     return run
+
+def create_sweep(db: Session, dataset_id: int, metric: str, configs: list[dict]):
+    sweep = models.Sweep(dataset_id=dataset_id, metric=metric, status=models.RunStatus.queued)
+    db.add(sweep)
+    db.flush()
+    create_runs(db, [{**cfg, "dataset_id": dataset_id} for cfg in configs], sweep_id=sweep.id)
+    db.refresh(sweep)
+    return sweep
+
+def _sweep_runs():
+    return selectinload(models.Sweep.runs).selectinload(models.Run.steps)
+
+def get_sweep(db: Session, sweep_id: int):
+    return db.get(models.Sweep, sweep_id, options=[_sweep_runs()])
+
+def list_sweeps(db: Session, limit: int = 100):
+    stmt = select(models.Sweep).options(_sweep_runs()).order_by(desc(models.Sweep.id)).limit(limit)
+    return list(db.scalars(stmt).all())
+
+def set_sweep_status(db: Session, sweep_id: int, status: models.RunStatus, *, artifacts: dict | None = None, best: dict | None = None, error: str | None = None):
+    sweep = get_sweep(db, sweep_id)
+    if not sweep:
+        return None
+    sweep.status = status
+    if status in (models.RunStatus.success, models.RunStatus.failed, models.RunStatus.canceled):
+        sweep.finished_at = datetime.utcnow()
+    if artifacts:
+        sweep.artifacts = {**(sweep.artifacts or {}), **artifacts}
+    if best is not None:
+        sweep.best = best
+    if error:
+        sweep.error = error
+    db.commit()
+    db.refresh(sweep)
+    return sweep
+
+def artifact_gc_runs(db: Session) -> list:
+    """
+    retention 후보 run (id, 기준 시각, artifacts): 종료되고 승격되지 않았으며 아직 정리되지 않은 run, 오래된 순.
+    queued/running run의 parent(warm start 입력)는 제외
+    """
+    Run = models.Run
+    active_parents = select(Run.parent_run_id).where(Run.parent_run_id.is_not(None), Run.status.in_(ACTIVE))
+    stmt = (
+        select(Run.id, func.coalesce(Run.finished_at, Run.created_at).label("ts"), Run.artifacts)
+        .where(Run.status.in_(TERMINAL), Run.promoted.is_(False), Run.id.not_in(active_parents))
+        .order_by("ts", Run.id)
+    )
+    return [row for row in db.execute(stmt) if not (row.artifacts or {}).get("collected")]
+
+def artifact_gc_sweeps(db: Session) -> list:
+    """retention 후보 sweep (id, 기준 시각, artifacts): 종료됐고 승격되거나 진행 중인 run이 없는 sweep의 공유 processed"""
+    Sweep, Run = models.Sweep, models.Run
+    busy = select(Run.sweep_id).where(Run.sweep_id.is_not(None), or_(Run.promoted.is_(True), Run.status.in_(ACTIVE)))
+    stmt = (
+        select(Sweep.id, func.coalesce(Sweep.finished_at, Sweep.created_at).label("ts"), Sweep.artifacts)
+        .where(Sweep.status.in_(TERMINAL), Sweep.id.not_in(busy))
+        .order_by("ts", Sweep.id)
+    )
+    return [row for row in db.execute(stmt) if not (row.artifacts or {}).get("collected")]
+
+def mark_run_artifacts_collected(db: Session, run_id: int, freed_bytes: int):
+    """
+    정리 직전에 호출: 그 사이 승격/재시도된 run이면 None(삭제하지 않음).
+    경로는 그대로 두고 collected 표시만 추가(이력/지표 조회용)
+    """
+    run = get_run(db, run_id)
+    if not run or run.promoted or run.status not in TERMINAL:
+        return None
+    run.artifacts = {**(run.artifacts or {}), "collected": True, "collected_at": datetime.utcnow().isoformat(), "collected_bytes": freed_bytes}
+    db.commit()
+    db.refresh(run)
+    publish_event("run.updated", run_payload(run))
+    return run
+
+def mark_sweep_artifacts_collected(db: Session, sweep_id: int, freed_bytes: int):
+    sweep = db.get(models.Sweep, sweep_id)
+    if not sweep or sweep.status not in TERMINAL:
+        return None
+    sweep.artifacts = {**(sweep.artifacts or {}), "collected": True, "collected_at": datetime.utcnow().isoformat(), "collected_bytes": freed_bytes}
+    db.commit()
+    return sweep
+
+def numeric_metrics(metrics: dict | None) -> dict[str, float]:
+    """run_metrics에 기록할 지표: 유한한 숫자 값만(bool/문자열/목록, NON_SCORE_METRICS 제외)"""
+    return {
+        k: float(v) for k, v in (metrics or {}).items()
+        if k not in NON_SCORE_METRICS and isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+    }
+
+def replace_run_metrics(db: Session, run_id: int, dataset_id: int, model_type: str, metrics: dict, recorded_at: datetime):
+    """run의 run_metrics 행을 교체(commit하지 않음: 호출자의 상태 기록과 같은 트랜잭션)"""
+    table = models.RunMetric.__table__
+    db.execute(delete(table).where(table.c.run_id == run_id))
+    rows = [
+        {"run_id": run_id, "name": name, "value": value, "dataset_id": dataset_id, "model_type": model_type, "recorded_at": recorded_at}
+        for name, value in numeric_metrics(metrics).items()
+    ]
+    if rows:
+        db.execute(insert(table), rows)
+
+def _metric_filter(stmt, metric: str, dataset_id: int | None, model_type: str | None):
+    M = models.RunMetric
+    stmt = stmt.where(M.name == metric)
+    if dataset_id is not None:
+        stmt = stmt.where(M.dataset_id == dataset_id)
+    if model_type:
+        stmt = stmt.where(M.model_type == model_type)
+    return stmt
+
+def metric_leaderboard(db: Session, metric: str, *, dataset_id: int | None = None, model_type: str | None = None,
+                       limit: int = 20, ascending: bool = False) -> list[dict]:
+    """지표 상위 N개 run. (name[, dataset_id | model_type], value) 인덱스 순서로 읽고 N개만 runs와 join(params)"""
+    M = models.RunMetric
+    order = M.value.asc() if ascending else M.value.desc()
+    top = _metric_filter(select(M), metric, dataset_id, model_type).order_by(order, M.run_id).limit(limit).subquery()
+    stmt = (
+        select(top.c.run_id, top.c.dataset_id, top.c.model_type, top.c.value, top.c.recorded_at, models.Run.params)
+        .join(models.Run, models.Run.id == top.c.run_id)
+        .order_by(top.c.value.asc() if ascending else top.c.value.desc(), top.c.run_id)
+    )
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+METRIC_GROUPS = ("model_type", "dataset_id")
+
+def metric_groups(db: Session, metric: str, group_by: str, *, dataset_id: int | None = None, model_type: str | None = None,
+                  ascending: bool = False, limit: int = 100) -> list[dict]:
+    """
+    group_by(model_type | dataset_id)별 run 수, 최고값(과 그 run), 평균/최소/최대.
+    GROUP BY는 (name, group_by, value) 인덱스만 읽고, 그룹별 최고 run은 같은 인덱스에서 1행만 찾는 상관 subquery
+    """
+    M = models.RunMetric
+    key = getattr(M, group_by)
+    best_of = aliased(M)
+    best_run = select(best_of.run_id).where(best_of.name == metric, getattr(best_of, group_by) == key)
+    if dataset_id is not None:
+        best_run = best_run.where(best_of.dataset_id == dataset_id)
+    if model_type:
+        best_run = best_run.where(best_of.model_type == model_type)
+    best_run = best_run.order_by(best_of.value.asc() if ascending else best_of.value.desc(), best_of.run_id).limit(1)
+    best = func.min(M.value) if ascending else func.max(M.value)
+    stmt = _metric_filter(
+        select(
+            key.label("key"),
+            func.count().label("runs"),
+            best.label("best"),
+            best_run.scalar_subquery().label("best_run_id"),
+            func.avg(M.value).label("mean"),
+            func.min(M.value).label("min"),
+            func.max(M.value).label("max"),
+        ),
+        metric, dataset_id, model_type,
+    ).group_by(key).order_by(best.asc() if ascending else best.desc()).limit(limit)
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+TREND_BUCKETS = ("hour", "day", "week", "month")
+# SQLite에는 date_trunc가 없으므로 같은 구간 시작 시각 문자열로 변환(week는 월요일 시작, PostgreSQL과 동일)
+_SQLITE_BUCKETS = {
+    "hour": ("%Y-%m-%d %H:00:00",),
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+    "month": ("%Y-%m-01 00:00:00",),
+}
+
+def _time_bucket(db: Session, column, bucket: str):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(bucket, column)
+    fmt, *modifiers = _SQLITE_BUCKETS[bucket]
+    return func.strftime(fmt, column, *modifiers)
+
+def metric_trend(db: Session, metric: str, *, bucket: str = "day", dataset_id: int | None = None, model_type: str | None = None,
+                 since: datetime | None = None, until: datetime | None = None) -> list[dict]:
+    """기록 시각 구간별 run 수와 평균/최소/최대((name, recorded_at) 인덱스 범위 조회 + GROUP BY)"""
+    M = models.RunMetric
+    b = _time_bucket(db, M.recorded_at, bucket).label("bucket")
+    stmt = _metric_filter(
+        select(b, func.count().label("runs"), func.avg(M.value).label("mean"), func.min(M.value).label("min"), func.max(M.value).label("max")),
+        metric, dataset_id, model_type,
+    )
+    if since:
+        stmt = stmt.where(M.recorded_at >= since)
+    if until:
+        stmt = stmt.where(M.recorded_at < until)
+    stmt = stmt.group_by(b).order_by(b)
+    return [dict(row._mapping) for row in db.execute(stmt)]
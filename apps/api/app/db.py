@@ -1,10 +1,27 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
+from .services.events import defer_events, publish_events
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+# 프로세스당 풀. 스키마는 migration(alembic upgrade head)으로 한 번만 생성하고 import 시 DB에 접속하지 않음
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+    "pool_recycle": settings.DB_POOL_RECYCLE_S,
+    "pool_pre_ping": True,
+}
+
+# 워커/스크립트용 sync 엔진(psycopg2)
+engine = create_engine(settings.database_url, **POOL_OPTIONS)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# API용 async 엔진(asyncpg): 요청이 스레드 풀을 점유하지 않고 연결을 기다림(최대 pool_timeout)
+async_engine = create_async_engine(settings.async_database_url, **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
@@ -14,3 +31,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_sync(db: AsyncSession, fn, *args, out=None, **kwargs):
+    """
+    sync crud 함수(첫 인자 Session)를 async 세션에서 실행(greenlet으로 전환, 스레드 사용 안 함).
+    out(pydantic 스키마)을 주면 관계 lazy 로딩이 가능한 세션 안에서 응답 스키마로 변환해 반환.
+    crud가 발행하는 이벤트(blocking Redis 호출)는 모아 두었다가 끝난 뒤 threadpool에서 발행(이벤트 루프를 막지 않음)
+    """
+    events = []
+
+    def call(session):
+        with defer_events() as deferred:  # greenlet 안에서 설정(컨텍스트가 호출 쪽과 분리될 수 있음)
+            try:
+                result = fn(session, *args, **kwargs)
+                if out is None or result is None:
+                    return result
+                return out.model_validate(result)
+            finally:
+                events.extend(deferred)
+    try:
+        return await db.run_sync(call)
+    finally:
+        if events:
+            await run_in_threadpool(publish_events, events)
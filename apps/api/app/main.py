@@ -1,15 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.config import settings
-from app.db import engine
-from app.models import Base
 from app.routes.health import router as health_router
 from app.routes.datasets import router as datasets_router
 from app.routes.runs import router as runs_router
+from app.routes.sweeps import router as sweeps_router
+from app.routes.serving import router as serving_router
+from app.routes.events import router as events_router
+from app.routes.metrics import router as metrics_router
+from app.routes.leaderboard import router as leaderboard_router
 
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Exam AI Pipeline MVP", openapi_url="/api/openapi.json", docs_url="/api/docs", redoc_url="/api/redoc")
+# 스키마는 migrate 서비스(alembic upgrade head)가 생성. 응답 JSON은 orjson으로 직렬화
+app = FastAPI(title="Exam AI Pipeline MVP", openapi_url="/api/openapi.json", docs_url="/api/docs", redoc_url="/api/redoc",
+              default_response_class=ORJSONResponse)
 
 origins = [o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()]
 app.add_middleware(
@@ -21,10 +25,15 @@ app.add_middleware(
 )
 
 # Mount under /api
-api = FastAPI(title="API")
+api = FastAPI(title="API", default_response_class=ORJSONResponse)
 api.include_router(health_router)
 api.include_router(datasets_router)
 api.include_router(runs_router)
+api.include_router(sweeps_router)
+api.include_router(serving_router)
+api.include_router(events_router)
+api.include_router(metrics_router)
+api.include_router(leaderboard_router)
 
 app.mount("/api", api)
 
@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, Enum, ForeignKey, Text, JSON
+from sqlalchemy import String, Integer, BigInteger, Float, DateTime, Enum, ForeignKey, Text, JSON, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
 
@@ -11,6 +11,11 @@ class RunStatus(str, enum.Enum):
     failed = "failed"
     canceled = "canceled"
 
+class RunPriority(str, enum.Enum):
+    high = "high"
+    normal = "normal"
+    low = "low"
+
 class StepStatus(str, enum.Enum):
     pending = "pending"
     running = "running"
@@ -25,17 +30,62 @@ class Dataset(Base):
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     source_path: Mapped[str] = mapped_column(String(800), nullable=False)
     meta: Mapped[dict] = mapped_column(JSON, default=dict)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)  # 원본 파일 checksum(중복 등록 방지)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     runs: Mapped[list["Run"]] = relationship(back_populates="dataset")
+    # source_path 이후에 append된 파일(시간 순서)
+    segments: Mapped[list["DatasetSegment"]] = relationship(
+        back_populates="dataset", order_by="DatasetSegment.seq", cascade="all, delete-orphan"
+    )
+
+class DatasetSegment(Base):
+    __tablename__ = "dataset_segments"
+    __table_args__ = (Index("ix_dataset_segments_dataset_id_seq", "dataset_id", "seq", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dataset_id: Mapped[int] = mapped_column(ForeignKey("datasets.id"), nullable=False)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)  # 1부터(0은 dataset.source_path)
+    source_path: Mapped[str] = mapped_column(String(800), nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    dataset: Mapped["Dataset"] = relationship(back_populates="segments")
+
+class Sweep(Base):
+    __tablename__ = "sweeps"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dataset_id: Mapped[int] = mapped_column(ForeignKey("datasets.id"), nullable=False)
+    metric: Mapped[str] = mapped_column(String(100), default="f1")  # best 선정 기준(클수록 좋음)
+    status: Mapped[RunStatus] = mapped_column(Enum(RunStatus), default=RunStatus.queued)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    artifacts: Mapped[dict] = mapped_column(JSON, default=dict)   # 공유 processed 경로 등
+    best: Mapped[dict] = mapped_column(JSON, default=dict)        # best run 요약
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    runs: Mapped[list["Run"]] = relationship(back_populates="sweep")
 
 class Run(Base):
     __tablename__ = "runs"
+    __table_args__ = (
+        # 목록 keyset 정렬(created_at, id) + status/dataset 필터
+        Index("ix_runs_created_at_id", "created_at", "id"),
+        Index("ix_runs_status_created_at", "status", "created_at"),
+        Index("ix_runs_dataset_id_created_at", "dataset_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     dataset_id: Mapped[int] = mapped_column(ForeignKey("datasets.id"), nullable=False)
     model_type: Mapped[str] = mapped_column(String(100), default="baseline_sklearn")
+    params: Mapped[dict] = mapped_column(JSON, default=dict)      # 모델 하이퍼파라미터
+    sweep_id: Mapped[int | None] = mapped_column(ForeignKey("sweeps.id"), nullable=True, index=True)
+    parent_run_id: Mapped[int | None] = mapped_column(ForeignKey("runs.id"), nullable=True)  # warm start 기준 run
     status: Mapped[RunStatus] = mapped_column(Enum(RunStatus), default=RunStatus.queued)
+    attempt: Mapped[int] = mapped_column(Integer, default=0)  # retry/priority 상향마다 증가(이전 시도의 스텝 작업은 무시)
+    priority: Mapped[RunPriority] = mapped_column(Enum(RunPriority), default=RunPriority.normal)  # broker 우선순위
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -43,19 +93,53 @@ class Run(Base):
     artifacts: Mapped[dict] = mapped_column(JSON, default=dict)   # paths to processed/model/metrics
     metrics: Mapped[dict] = mapped_column(JSON, default=dict)     # scalar metrics summary
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    promoted: Mapped[bool] = mapped_column(Boolean, default=False, index=True)  # 서빙 대상 여부
+    promoted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     dataset: Mapped["Dataset"] = relationship(back_populates="runs")
+    sweep: Mapped["Sweep | None"] = relationship(back_populates="runs")
     steps: Mapped[list["RunStep"]] = relationship(back_populates="run", cascade="all, delete-orphan")
 
 class RunStep(Base):
     __tablename__ = "run_steps"
+    __table_args__ = (Index("ix_run_steps_run_id_name", "run_id", "name"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)  # preprocess/train/evaluate
+    name: Mapped[str] = mapped_column(String(100), nullable=False)  # preprocess/features/train/evaluate
     status: Mapped[StepStatus] = mapped_column(Enum(StepStatus), default=StepStatus.pending)
     started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # 자원 사용량(services/profiling.StepProfiler, 완료된 스텝만)
+    wall_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cpu_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    peak_rss_mb: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rows_in: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    rows_out: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    bytes_read: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    bytes_written: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    rows_per_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
+
     run: Mapped["Run"] = relationship(back_populates="steps")
+
+class RunMetric(Base):
+    """
+    성공한 run의 숫자 지표(run_id, 지표 이름, 값). evaluate가 Run.metrics를 기록할 때 같은 트랜잭션으로 갱신.
+    dataset_id/model_type/recorded_at은 leaderboard/trend 집계가 runs를 join하지 않고 인덱스만 읽도록 복제
+    """
+    __tablename__ = "run_metrics"
+    __table_args__ = (
+        Index("ix_run_metrics_name_value", "name", "value"),
+        Index("ix_run_metrics_name_dataset_id_value", "name", "dataset_id", "value"),
+        Index("ix_run_metrics_name_model_type_value", "name", "model_type", "value"),
+        Index("ix_run_metrics_name_recorded_at", "name", "recorded_at"),
+    )
+
+    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    dataset_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    model_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # evaluate 완료 시각
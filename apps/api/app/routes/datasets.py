@@ -1,18 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db, run_sync
 from app import schemas, crud
+from app.services.utils import sha256_file
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
 @router.post("", response_model=schemas.DatasetOut)
-def create_dataset(payload: schemas.DatasetCreate, db: Session = Depends(get_db)):
+async def create_dataset(payload: schemas.DatasetCreate, db: AsyncSession = Depends(get_async_db)):
     # MVP: only validate path existence inside container
     import os
     if not os.path.exists(payload.source_path):
         raise HTTPException(status_code=400, detail=f"source_path not found: {payload.source_path}")
-    return crud.create_dataset(db, payload.name, payload.source_path, payload.meta)
+    return await run_sync(db, crud.create_dataset, payload.name, payload.source_path, payload.meta, out=schemas.DatasetOut)
 
-@router.get("", response_model=list[schemas.DatasetOut])
-def list_datasets(db: Session = Depends(get_db)):
-    return crud.list_datasets(db)
+@router.post("/{dataset_id}/append", response_model=schemas.DatasetOut)
+async def append_dataset(dataset_id: int, payload: schemas.DatasetAppend, db: AsyncSession = Depends(get_async_db)):
+    """
+    데이터셋에 새 세그먼트(시간 순서로 뒤에 이어지는 파일) 추가.
+    이후 run은 추가된 세그먼트만 전처리해 이전 processed 뒤에 붙임(parent_run_id를 주면 모델도 warm start)
+    """
+    src = Path(payload.source_path)
+    if not src.exists():
+        raise HTTPException(status_code=400, detail=f"source_path not found: {payload.source_path}")
+    # 중복 판정/캐시 키에 쓰이므로 항상 서버에서 해시(이벤트 루프 밖에서). 클라이언트 값은 검증에만 사용
+    sha256 = await run_in_threadpool(sha256_file, src)
+    if payload.sha256 and payload.sha256.lower() != sha256:
+        raise HTTPException(status_code=400, detail=f"sha256 mismatch: file hashes to {sha256}")
+    ds, added = await run_sync(db, crud.append_dataset_segment, dataset_id, str(src), sha256)
+    if not ds:
+        raise HTTPException(status_code=404, detail="dataset not found")
+    if not added:
+        raise HTTPException(status_code=409, detail="segment already part of this dataset")
+    return ds
+
+@router.get("/lookup", response_model=schemas.DatasetOut)
+async def lookup_dataset(sha256: str = Query(..., min_length=64, max_length=64), db: AsyncSession = Depends(get_async_db)):
+    """checksum으로 이미 등록된 데이터셋 조회(watcher 중복 등록 방지용)"""
+    ds = await run_sync(db, crud.get_dataset_by_sha256, sha256.lower(), out=schemas.DatasetOut)
+    if not ds:
+        raise HTTPException(status_code=404, detail="dataset not found")
+    return ds
+
+@router.get("", response_model=schemas.DatasetPage)
+async def list_datasets(limit: int = Query(100, ge=1, le=500), cursor: str | None = None, db: AsyncSession = Depends(get_async_db)):
+    try:
+        items, next_cursor = await run_sync(db, crud.list_datasets, limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,35 @@
+import redis.asyncio as aioredis
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.events import CHANNEL
+
+router = APIRouter(tags=["events"])
+
+KEEPALIVE_SECONDS = 15.0
+
+@router.get("/events")
+async def stream_events(request: Request):
+    """
+    run/step/dataset 변경 이벤트 SSE 스트림(Redis pub/sub 구독).
+    data는 {"type": run.created | run.updated | step.updated | dataset.created, "data": {...}} JSON
+    """
+    async def events():
+        client = aioredis.Redis.from_url(settings.redis_url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(CHANNEL)
+        try:
+            yield "event: ready\ndata: {}\n\n"
+            while not await request.is_disconnected():
+                msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS)
+                if msg is None:
+                    yield ": keepalive\n\n"
+                    continue
+                data = msg["data"].decode() if isinstance(msg["data"], bytes) else msg["data"]
+                yield f"data: {data}\n\n"
+        finally:
+            await pubsub.unsubscribe(CHANNEL)
+            await pubsub.aclose()
+            await client.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,60 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db, run_sync
+from app import schemas, crud
+
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+
+def _ascending(order: str) -> bool:
+    if order not in ("desc", "asc"):
+        raise HTTPException(status_code=400, detail="order must be desc or asc")
+    return order == "asc"
+
+@router.get("", response_model=schemas.LeaderboardOut)
+async def leaderboard(
+    metric: str = "f1",
+    dataset_id: int | None = None,
+    model_type: str | None = None,
+    limit: int = Query(20, ge=1, le=500),
+    order: str = "desc",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """지표 상위 N개 run(성공한 run만, order=asc면 작을수록 좋은 지표)"""
+    items = await run_sync(db, crud.metric_leaderboard, metric, dataset_id=dataset_id, model_type=model_type,
+                           limit=limit, ascending=_ascending(order))
+    return {"metric": metric, "items": items}
+
+@router.get("/groups", response_model=schemas.LeaderboardGroupsOut)
+async def leaderboard_groups(
+    metric: str = "f1",
+    group_by: str = "model_type",
+    dataset_id: int | None = None,
+    model_type: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    order: str = "desc",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """model_type(또는 dataset_id)별 최고 run과 run 수/평균/최소/최대"""
+    if group_by not in crud.METRIC_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(crud.METRIC_GROUPS)}")
+    items = await run_sync(db, crud.metric_groups, metric, group_by, dataset_id=dataset_id, model_type=model_type,
+                           ascending=_ascending(order), limit=limit)
+    return {"metric": metric, "group_by": group_by, "items": items}
+
+@router.get("/trends", response_model=schemas.TrendOut)
+async def leaderboard_trends(
+    metric: str = "f1",
+    bucket: str = "day",
+    dataset_id: int | None = None,
+    model_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """evaluate 완료 시각 구간(hour/day/week/month)별 run 수와 평균/최소/최대"""
+    if bucket not in crud.TREND_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(crud.TREND_BUCKETS)}")
+    items = await run_sync(db, crud.metric_trend, metric, bucket=bucket, dataset_id=dataset_id, model_type=model_type,
+                           since=since, until=until)
+    return {"metric": metric, "bucket": bucket, "items": items}
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.services.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics(db: Session = Depends(get_db)):
+    """Prometheus scrape 대상: 스텝 소요 시간 히스토그램, 스텝 자원 사용량 합계, 상태별 run 수, 큐 길이"""
+    return PlainTextResponse(render_metrics(db), media_type="text/plain; version=0.0.4; charset=utf-8")
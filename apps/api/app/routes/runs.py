@@ -1,37 +1,206 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.db import get_db
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import AsyncSessionLocal, get_async_db, run_sync
 from app import schemas, crud
-from app.workers.tasks import run_pipeline
-from app.services.logs import tail_log
+from app.models import RunStatus, StepStatus
+from app.workers.tasks import STEP_OUTPUTS, enqueue_runs, pipeline_chain, revoke_run
+from app.services.logs import read_log_from, tail_log
 from app.config import settings
+from pipelines.models import MODEL_REGISTRY
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
+MAX_BULK_RUNS = 5000
+
+def _submit(db, specs: list[dict]) -> tuple[list, list]:
+    """crud.submit_runs 결과를 세션 안에서 응답 스키마로 변환(발행 목록은 id/attempt/priority만 사용)"""
+    runs, dispatch = crud.submit_runs(db, specs, coalesce=settings.RUN_COALESCE_ENABLED)
+    return [schemas.RunOut.model_validate(r) for r in runs], dispatch
+
 @router.post("", response_model=schemas.RunOut)
-def create_run(payload: schemas.RunCreate, db: Session = Depends(get_db)):
+async def create_run(payload: schemas.RunCreate, db: AsyncSession = Depends(get_async_db)):
     # validate dataset
-    ds = next((d for d in crud.list_datasets(db, limit=500) if d.id == payload.dataset_id), None)
-    if not ds:
+    if not await run_sync(db, crud.get_dataset, payload.dataset_id):
         raise HTTPException(status_code=404, detail="dataset not found")
-    run = crud.create_run(db, payload.dataset_id, payload.model_type)
-    # enqueue
-    run_pipeline.delay(run.id)
-    # re-fetch to include steps relationship
-    run = crud.get_run(db, run.id)
-    return run
+    if payload.model_type not in MODEL_REGISTRY:
+        raise HTTPException(status_code=400, detail=f"unknown model_type: {payload.model_type}")
+    if payload.parent_run_id is not None:
+        parent = await run_sync(db, crud.get_run, payload.parent_run_id)
+        if not parent:
+            raise HTTPException(status_code=404, detail="parent run not found")
+        if parent.dataset_id != payload.dataset_id:
+            raise HTTPException(status_code=400, detail="parent run must use the same dataset")
+    # 같은 입력으로 이미 queued인 run이 있으면 그 run을 반환(coalesced=true)
+    runs, dispatch = await run_sync(db, _submit, [payload.model_dump()])
+    # enqueue: 스텝별 작업 chain(preprocess → io 큐, 이후 스텝 → cpu 큐), run priority → broker 우선순위
+    for run in dispatch:
+        await run_in_threadpool(pipeline_chain(run.id, run.attempt, priority=run.priority).apply_async)
+    return runs[0]
+
+@router.post("/bulk", response_model=schemas.RunBulkOut)
+async def create_runs_bulk(payload: schemas.RunBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """여러 run을 한 트랜잭션으로 만들고, broker에는 fan-out 메시지 하나만 보냄"""
+    if len(payload.runs) > MAX_BULK_RUNS:
+        raise HTTPException(status_code=400, detail=f"too many runs: {len(payload.runs)} > {MAX_BULK_RUNS}")
+    unknown_types = sorted({r.model_type for r in payload.runs} - set(MODEL_REGISTRY))
+    if unknown_types:
+        raise HTTPException(status_code=400, detail=f"unknown model_type: {', '.join(unknown_types)}")
+    dataset_ids = {r.dataset_id for r in payload.runs}
+    missing = sorted(dataset_ids - await run_sync(db, crud.existing_dataset_ids, dataset_ids))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"dataset not found: {', '.join(map(str, missing))}")
+    specs = [r.model_dump() for r in payload.runs]
+    runs, dispatch = await run_sync(db, crud.submit_runs, specs, coalesce=settings.RUN_COALESCE_ENABLED)
+    if dispatch:
+        await run_in_threadpool(enqueue_runs.delay, [r.id for r in dispatch])
+    created = {r.id for r in runs if not getattr(r, "coalesced", False)}
+    return {"run_ids": [r.id for r in runs], "coalesced": len(specs) - len(created)}
+
+@router.get("/model-types")
+def list_model_types():
+    return [{"model_type": k, "description": v.description, "time_budget_s": v.time_budget_s} for k, v in MODEL_REGISTRY.items()]
 
-@router.get("", response_model=list[schemas.RunOut])
-def list_runs(db: Session = Depends(get_db)):
-    return crud.list_runs(db)
+@router.get("", response_model=schemas.RunPage)
+async def list_runs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    status: list[RunStatus] | None = Query(None),
+    dataset_id: int | None = None,
+    model_type: str | None = None,
+    sweep_id: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """최신순 페이지. 다음 페이지는 응답의 next_cursor를 cursor로 넘김"""
+    try:
+        items, next_cursor = await run_sync(
+            db, crud.list_runs, limit, cursor=cursor, status=status, dataset_id=dataset_id, model_type=model_type,
+            sweep_id=sweep_id, created_after=created_after, created_before=created_before,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{run_id}", response_model=schemas.RunOut)
-def get_run(run_id: int, db: Session = Depends(get_db)):
-    run = crud.get_run(db, run_id)
+async def get_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    run = await run_sync(db, crud.get_run, run_id, out=schemas.RunOut)
+    if not run:
+        raise HTTPException(status_code=404, detail="run not found")
+    return run
+
+def _resume_error(run, from_step: str) -> str | None:
+    """from_step 이전 스텝이 모두 성공(또는 생략)했고 기록된 아티팩트 파일이 남아 있는지 확인"""
+    steps = {st.name: st for st in run.steps}
+    artifacts = run.artifacts or {}
+    for name in crud.STEP_NAMES[:crud.STEP_NAMES.index(from_step)]:
+        step = steps.get(name)
+        if step is None or not crud.step_done(step):
+            return f"step {name} has not succeeded"
+        if step.status == StepStatus.success:
+            path = artifacts.get(STEP_OUTPUTS[name])
+            if not path or not Path(path).exists():
+                return f"artifact of step {name} is missing: {path}"
+    return None
+
+@router.post("/{run_id}/retry", response_model=schemas.RunOut)
+async def retry_run(run_id: int, from_step: str | None = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    실패/취소된 run을 from_step부터 다시 실행(기본: 첫 번째 미완료 스텝).
+    이전 스텝은 run.artifacts에 기록된 아티팩트를 그대로 사용
+    """
+    run = await run_sync(db, crud.get_run, run_id, eager=True)  # steps 포함 로딩(세션 밖에서 lazy 로딩 없음)
     if not run:
         raise HTTPException(status_code=404, detail="run not found")
+    if run.status not in (RunStatus.failed, RunStatus.canceled):
+        raise HTTPException(status_code=409, detail=f"run is {run.status.value}, only failed or canceled runs can be retried")
+    running = [st.name for st in run.steps if st.status == StepStatus.running]
+    if running:
+        raise HTTPException(status_code=409, detail=f"step {running[0]} is still running")
+    if from_step is None:
+        done = {st.name for st in run.steps if crud.step_done(st)}
+        from_step = next((name for name in crud.STEP_NAMES if name not in done), crud.STEP_NAMES[-1])
+    elif from_step not in crud.STEP_NAMES:
+        raise HTTPException(status_code=400, detail=f"unknown step: {from_step} (available: {', '.join(crud.STEP_NAMES)})")
+    error = await run_in_threadpool(_resume_error, run, from_step)  # 아티팩트 파일 확인
+    if error:
+        raise HTTPException(status_code=409, detail=error)
+    run = await run_sync(db, crud.reset_run_from_step, run_id, from_step, out=schemas.RunOut)
+    await run_in_threadpool(pipeline_chain(run.id, run.attempt, from_step, priority=run.priority).apply_async)
     return run
 
+@router.post("/{run_id}/cancel", response_model=schemas.RunOut)
+async def cancel_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    queued/running run 취소. 아직 시작하지 않은 스텝 작업은 revoke하고,
+    실행 중인 스텝은 끝까지 수행한 뒤 다음 스텝부터 건너뜀(협조적 중단)
+    """
+    status = await run_sync(db, crud.get_run_status, run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="run not found")
+    row = await run_sync(db, crud.cancel_run, run_id)
+    if row is None:
+        raise HTTPException(status_code=409, detail=f"run is {status.value}, only queued or running runs can be canceled")
+    await run_in_threadpool(revoke_run, run_id, row.attempt)
+    return await run_sync(db, crud.get_run, run_id, out=schemas.RunOut)
+
 @router.get("/{run_id}/logs")
 def get_run_logs(run_id: int, lines: int = Query(200, ge=10, le=5000)):
-    return {"run_id": run_id, "tail": tail_log(settings.DATA_ROOT, run_id, n=lines)}
+    tail, offset = tail_log(settings.DATA_ROOT, run_id, n=lines)
+    return {"run_id": run_id, "tail": tail, "offset": offset}
+
+@router.get("/{run_id}/logs/delta")
+def get_run_log_delta(run_id: int, offset: int = Query(0, ge=0), max_bytes: int = Query(256 * 1024, ge=1024, le=4 * 1024 * 1024)):
+    """offset(바이트) 이후 추가된 로그만 반환. 다음 호출에는 next_offset을 넘김"""
+    data, next_offset, size = read_log_from(settings.DATA_ROOT, run_id, offset, max_bytes=max_bytes)
+    return {"run_id": run_id, "offset": offset, "next_offset": next_offset, "size": size, "data": data}
+
+LOG_STREAM_POLL_SECONDS = 0.5
+TERMINAL_STATUSES = (RunStatus.success, RunStatus.failed, RunStatus.canceled)
+
+async def _run_finished(run_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        status = await run_sync(db, crud.get_run_status, run_id)
+        return status is None or status in TERMINAL_STATUSES
+
+def _sse_data(offset: int, data: str) -> str:
+    lines = "\n".join(f"data: {line}" for line in data.rstrip("\n").split("\n"))
+    return f"id: {offset}\n{lines}\n\n"
+
+@router.get("/{run_id}/logs/stream")
+async def stream_run_logs(run_id: int, request: Request, offset: int = Query(0, ge=0)):
+    """
+    SSE 로그 스트림: 새로 추가된 줄만 전송(event id = 다음 offset).
+    재연결 시 Last-Event-ID 헤더의 offset부터 이어서 보내고, run 종료 후 남은 로그를 보내면 end 이벤트로 닫음
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+
+    async def events():
+        nonlocal offset
+        polls = 0
+        while not await request.is_disconnected():
+            data, offset, _ = await run_in_threadpool(read_log_from, settings.DATA_ROOT, run_id, offset)
+            if data:
+                yield _sse_data(offset, data)
+                continue
+            polls += 1
+            # 종료 여부는 새 로그가 없을 때만 가끔 확인(DB 부하 최소화)
+            if polls % 10 == 1 and await _run_finished(run_id):
+                # 상태 변경 직후 기록된 마지막 줄까지 보낸 뒤 종료
+                data, offset, _ = await run_in_threadpool(read_log_from, settings.DATA_ROOT, run_id, offset)
+                if data:
+                    yield _sse_data(offset, data)
+                yield f"id: {offset}\nevent: end\ndata: {offset}\n\n"
+                return
+            if polls % 30 == 0:
+                yield ": keepalive\n\n"  # 프록시 read timeout 방지
+            await asyncio.sleep(LOG_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db, run_sync
+from app import schemas, crud
+from app.config import settings
+from app.models import RunStatus
+from app.services.serving import ARROW_FILE, ARROW_STREAM, ModelCache, Timer, parse_arrow, rows_to_frame, score_frame
+
+router = APIRouter(tags=["serving"])
+
+model_cache = ModelCache(max_size=settings.SERVING_CACHE_SIZE, n_jobs=settings.SERVING_N_JOBS)
+
+def _model_path(run) -> str:
+    if not run:
+        raise HTTPException(status_code=404, detail="run not found")
+    model_path = (run.artifacts or {}).get("model_path")
+    if run.status != RunStatus.success or not model_path:
+        raise HTTPException(status_code=409, detail=f"run {run.id} has no trained model (status={run.status.value})")
+    if (run.artifacts or {}).get("collected"):
+        raise HTTPException(status_code=409, detail=f"run {run.id} model was removed by artifact retention")
+    return model_path
+
+async def _predict(run_id: int, model_path: str, request: Request, response: Response) -> dict:
+    timer = Timer()
+    body = await request.body()
+    # 파싱/로딩/스코어링은 CPU 작업이므로 이벤트 루프를 막지 않도록 threadpool에서 실행
+    out = await run_in_threadpool(_predict_sync, run_id, model_path, body, request, timer)
+    response.headers["Server-Timing"] = ", ".join(f"{k};dur={v}" for k, v in out["latency_ms"].items())
+    return out
+
+def _predict_sync(run_id: int, model_path: str, body: bytes, request: Request, timer: Timer) -> dict:
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith((ARROW_STREAM, ARROW_FILE)):
+            df = parse_arrow(body, content_type)
+            return_proba = request.query_params.get("return_proba", "").lower() in ("1", "true", "yes")
+        else:
+            payload = schemas.PredictRequest.model_validate_json(body or b"{}")
+            df = rows_to_frame(payload.rows, payload.columns, payload.data)
+            return_proba = payload.return_proba
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"invalid payload: {e}")
+    if len(df) > settings.SERVING_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"too many rows: {len(df)} > {settings.SERVING_MAX_ROWS}")
+    timer.mark("parse")
+
+    try:
+        bundle, cache_hit = model_cache.get(model_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail=f"model artifact missing: {model_path}")
+    timer.mark("load")
+
+    try:
+        out = score_frame(bundle, df, return_proba=return_proba)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    timer.mark("score")
+
+    return {"run_id": run_id, "n_rows": len(df), **out, "cache_hit": cache_hit, "latency_ms": timer.done()}
+
+@router.post("/runs/{run_id}/predict", response_model=schemas.PredictOut)
+async def predict_run(run_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    배치 예측. body는 JSON(PredictRequest) 또는 Arrow IPC
+    (Content-Type: application/vnd.apache.arrow.stream | .file, 확률은 ?return_proba=true)
+    """
+    run = await run_sync(db, crud.get_run, run_id)
+    await db.close()  # 파싱/스코어링 동안 DB 연결을 풀에 반환
+    return await _predict(run_id, _model_path(run), request, response)
+
+@router.post("/runs/{run_id}/promote", response_model=schemas.RunOut)
+async def promote_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    _model_path(await run_sync(db, crud.get_run, run_id))
+    return await run_sync(db, crud.set_run_promoted, run_id, True, out=schemas.RunOut)
+
+@router.delete("/runs/{run_id}/promote", response_model=schemas.RunOut)
+async def demote_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    run = await run_sync(db, crud.set_run_promoted, run_id, False, out=schemas.RunOut)
+    if not run:
+        raise HTTPException(status_code=404, detail="run not found")
+    return run
+
+@router.get("/serving")
+async def serving_status(db: AsyncSession = Depends(get_async_db)):
+    run = await run_sync(db, crud.get_promoted_run)
+    return {
+        "run_id": run.id if run else None,
+        "model_type": run.model_type if run else None,
+        "promoted_at": run.promoted_at if run else None,
+        "cache": model_cache.stats(),
+    }
+
+@router.post("/serving/predict", response_model=schemas.PredictOut)
+async def predict_serving(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    run = await run_sync(db, crud.get_promoted_run)
+    await db.close()
+    if not run:
+        raise HTTPException(status_code=404, detail="no promoted run")
+    return await _predict(run.id, _model_path(run), request, response)
@@ -0,0 +1,48 @@
+import itertools
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db, run_sync
+from app import schemas, crud, models
+from app.workers.tasks import run_sweep
+from pipelines.models import MODEL_REGISTRY
+
+router = APIRouter(prefix="/sweeps", tags=["sweeps"])
+
+MAX_SWEEP_RUNS = 200
+
+def _expand(payload: schemas.SweepCreate) -> list[dict]:
+    configs = [c.model_dump() for c in payload.configs]
+    if payload.grid:
+        names = list(payload.grid.params)
+        for model_type in payload.grid.model_type:
+            for values in itertools.product(*(payload.grid.params[n] for n in names)):
+                configs.append({"model_type": model_type, "params": dict(zip(names, values))})
+    return configs
+
+@router.post("", response_model=schemas.SweepOut)
+async def create_sweep(payload: schemas.SweepCreate, db: AsyncSession = Depends(get_async_db)):
+    if not await db.get(models.Dataset, payload.dataset_id):
+        raise HTTPException(status_code=404, detail="dataset not found")
+    configs = _expand(payload)
+    if not configs:
+        raise HTTPException(status_code=400, detail="configs or grid required")
+    unknown = sorted({c["model_type"] for c in configs} - set(MODEL_REGISTRY))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown model_type: {', '.join(unknown)}")
+    if len(configs) > MAX_SWEEP_RUNS:
+        raise HTTPException(status_code=400, detail=f"too many configs: {len(configs)} > {MAX_SWEEP_RUNS}")
+    sweep = await run_sync(db, crud.create_sweep, payload.dataset_id, payload.metric, configs)
+    await run_in_threadpool(run_sweep.delay, sweep.id)
+    return await run_sync(db, crud.get_sweep, sweep.id, out=schemas.SweepOut)
+
+@router.get("", response_model=list[schemas.SweepOut])
+async def list_sweeps(db: AsyncSession = Depends(get_async_db)):
+    return await run_sync(db, crud.list_sweeps)
+
+@router.get("/{sweep_id}", response_model=schemas.SweepOut)
+async def get_sweep(sweep_id: int, db: AsyncSession = Depends(get_async_db)):
+    sweep = await run_sync(db, crud.get_sweep, sweep_id, out=schemas.SweepOut)
+    if not sweep:
+        raise HTTPException(status_code=404, detail="sweep not found")
+    return sweep
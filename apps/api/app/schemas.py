@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, Field
 
 class DatasetCreate(BaseModel):
@@ -6,19 +7,48 @@ class DatasetCreate(BaseModel):
     source_path: str = Field(..., examples=["/data/inbound/sample_timeseries.csv"])
     meta: dict = Field(default_factory=dict)
 
+class DatasetAppend(BaseModel):
+    source_path: str = Field(..., examples=["/data/inbound/sample_timeseries_0100.csv"])
+    sha256: str | None = None  # 검증용(서버가 항상 파일을 해시하고, 값이 다르면 400)
+
+class DatasetSegmentOut(BaseModel):
+    seq: int
+    source_path: str
+    sha256: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class DatasetOut(BaseModel):
     id: int
     name: str
     source_path: str
     meta: dict
+    sha256: str | None = None
     created_at: datetime
+    segments: list[DatasetSegmentOut] = []
 
     class Config:
         from_attributes = True
 
+class DatasetPage(BaseModel):
+    items: list[DatasetOut]
+    next_cursor: str | None = None
+
 class RunCreate(BaseModel):
     dataset_id: int
     model_type: str = "baseline_sklearn"
+    params: dict = Field(default_factory=dict)
+    parent_run_id: int | None = None  # 같은 데이터셋의 이전 run 모델에서 warm start
+    priority: Literal["high", "normal", "low"] = "normal"
+
+class RunBulkCreate(BaseModel):
+    runs: list[RunCreate] = Field(..., min_length=1)
+
+class RunBulkOut(BaseModel):
+    run_ids: list[int]
+    coalesced: int = 0  # 이미 queued인 run으로 대체된 요청 수
 
 class RunStepOut(BaseModel):
     id: int
@@ -27,6 +57,14 @@ class RunStepOut(BaseModel):
     started_at: datetime | None
     finished_at: datetime | None
     message: str | None
+    wall_seconds: float | None = None
+    cpu_seconds: float | None = None
+    peak_rss_mb: float | None = None
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes_read: int | None = None
+    bytes_written: int | None = None
+    rows_per_sec: float | None = None
 
     class Config:
         from_attributes = True
@@ -35,14 +73,108 @@ class RunOut(BaseModel):
     id: int
     dataset_id: int
     model_type: str
+    params: dict = {}
+    sweep_id: int | None = None
+    parent_run_id: int | None = None
     status: str
+    attempt: int = 0
+    priority: str = "normal"
+    coalesced: bool = False  # 생성 요청이 같은 입력의 queued run으로 대체됨
     created_at: datetime
     started_at: datetime | None
     finished_at: datetime | None
     artifacts: dict
     metrics: dict
     error: str | None
+    promoted: bool = False
+    promoted_at: datetime | None = None
     steps: list[RunStepOut] = []
 
     class Config:
         from_attributes = True
+
+class RunPage(BaseModel):
+    items: list[RunOut]
+    next_cursor: str | None = None
+
+class PredictRequest(BaseModel):
+    rows: list[dict] | None = Field(default=None, examples=[[{"time": 0, "sensor_1": 0.1, "sensor_2": 0.9}]])
+    columns: list[str] | None = None
+    data: list[list] | None = None
+    return_proba: bool = False
+
+class PredictOut(BaseModel):
+    run_id: int
+    n_rows: int
+    predictions: list
+    classes: list | None = None
+    probabilities: list[list[float]] | None = None
+    cache_hit: bool
+    latency_ms: dict[str, float]
+
+class SweepConfig(BaseModel):
+    model_type: str = "baseline_sklearn"
+    params: dict = Field(default_factory=dict)
+
+class SweepGrid(BaseModel):
+    model_type: list[str] = Field(default_factory=lambda: ["baseline_sklearn"])
+    params: dict[str, list] = Field(default_factory=dict, examples=[{"n_estimators": [100, 200], "max_depth": [None, 8]}])
+
+class SweepCreate(BaseModel):
+    dataset_id: int
+    metric: str = "f1"
+    configs: list[SweepConfig] = Field(default_factory=list)
+    grid: SweepGrid | None = None
+
+class SweepOut(BaseModel):
+    id: int
+    dataset_id: int
+    metric: str
+    status: str
+    created_at: datetime
+    finished_at: datetime | None
+    artifacts: dict
+    best: dict
+    error: str | None
+    runs: list[RunOut] = []
+
+    class Config:
+        from_attributes = True
+
+class LeaderboardEntry(BaseModel):
+    run_id: int
+    dataset_id: int
+    model_type: str
+    params: dict = {}
+    value: float
+    recorded_at: datetime
+
+class LeaderboardOut(BaseModel):
+    metric: str
+    items: list[LeaderboardEntry]
+
+class LeaderboardGroup(BaseModel):
+    key: str | int  # group_by 값(model_type 또는 dataset_id)
+    runs: int
+    best: float
+    best_run_id: int
+    mean: float
+    min: float
+    max: float
+
+class LeaderboardGroupsOut(BaseModel):
+    metric: str
+    group_by: str
+    items: list[LeaderboardGroup]
+
+class TrendPoint(BaseModel):
+    bucket: datetime  # 구간 시작 시각(UTC)
+    runs: int
+    mean: float
+    min: float
+    max: float
+
+class TrendOut(BaseModel):
+    metric: str
+    bucket: str
+    items: list[TrendPoint]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from .utils import ensure_dir
+
+MANIFEST = "manifest.json"
+
+@lru_cache(maxsize=1)
+def pipeline_code_version(override: str = "") -> str:
+    """pipelines/*.py 소스 내용의 해시(override가 있으면 그대로 사용)"""
+    if override:
+        return override
+    spec = importlib.util.find_spec("pipelines")
+    h = hashlib.sha256()
+    for loc in sorted(spec.submodule_search_locations or []) if spec else []:
+        for p in sorted(Path(loc).glob("*.py")):
+            h.update(p.name.encode())
+            h.update(p.read_bytes())
+    return h.hexdigest()[:16]
+
+def link_or_copy(src: str | Path, dst: str | Path):
+    dst = Path(dst)
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+@dataclass
+class CacheEntry:
+    key: str
+    files: dict[str, str] = field(default_factory=dict)   # 이름 -> 경로
+    outputs: dict = field(default_factory=dict)            # 스칼라 결과(예: metrics)
+
+class StepCache:
+    """
+    스텝 단위 content-addressed 캐시: DATA_ROOT/cache/{step}/{key}/
+    - key = sha256(step, 입력 해시, 파이프라인 코드 버전, 파라미터)
+    - 아티팩트는 하드링크로 저장/복원(같은 볼륨이면 복사 비용 없음)
+      → 파이프라인은 기존 파일을 제자리에서 덮어쓰지 말고 unlink 후 새로 써야 함
+    - 크기/나이 기준으로 LRU eviction
+    """
+
+    def __init__(self, data_root: str, code_version: str, max_bytes: int, max_age_seconds: int):
+        self.root = Path(data_root) / "cache"
+        self.code_version = code_version
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def key(self, step: str, input_hash: str, params: dict | None = None) -> str:
+        payload = {"step": step, "input": input_hash, "code": self.code_version, "params": params or {}}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _entry_dir(self, step: str, key: str) -> Path:
+        return self.root / step / key
+
+    def restore(self, step: str, key: str, dest_dir: str) -> CacheEntry | None:
+        d = self._entry_dir(step, key)
+        manifest_path = d / MANIFEST
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            files = {}
+            ensure_dir(Path(dest_dir))
+            for name, fname in manifest["files"].items():
+                dst = Path(dest_dir) / fname
+                link_or_copy(d / fname, dst)
+                files[name] = str(dst)
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            return None
+        os.utime(manifest_path)  # LRU 기준 시각 갱신
+        return CacheEntry(key=key, files=files, outputs=manifest.get("outputs", {}))
+
+    def store(self, step: str, key: str, files: dict[str, str], outputs: dict | None = None):
+        final = self._entry_dir(step, key)
+        if final.exists():
+            return
+        tmp = self.root / ".tmp" / f"{key}-{uuid.uuid4().hex}"
+        ensure_dir(tmp)
+        try:
+            size = 0
+            names = {}
+            for name, src in files.items():
+                fname = Path(src).name
+                link_or_copy(src, tmp / fname)
+                size += (tmp / fname).stat().st_size
+                names[name] = fname
+            manifest = {"key": key, "step": step, "files": names, "outputs": outputs or {}, "size_bytes": size, "created_at": time.time()}
+            (tmp / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+            ensure_dir(final.parent)
+            os.rename(tmp, final)
+        except OSError:
+            # 동시에 같은 key를 저장한 경우 등: 먼저 저장된 엔트리를 유지
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def evict(self) -> int:
+        """max_age 초과 엔트리 삭제 후, 총 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 순서로 삭제"""
+        entries = []
+        for manifest_path in self.root.glob(f"*/*/{MANIFEST}"):
+            try:
+                st = manifest_path.stat()
+                size = json.loads(manifest_path.read_text(encoding="utf-8")).get("size_bytes", 0)
+            except (OSError, json.JSONDecodeError):
+                continue
+            entries.append((st.st_mtime, size, manifest_path.parent))
+        entries.sort()
+
+        now = time.time()
+        total = sum(e[1] for e in entries)
+        freed = 0
+        for last_used, size, d in entries:
+            if now - last_used <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+            freed += size
+        return freed
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import orjson
+import redis
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "exam_ai:events"
+RETRY_AFTER_SECONDS = 5.0
+
+_client: redis.Redis | None = None
+_down_until = 0.0
+_deferred: ContextVar[list | None] = ContextVar("deferred_events", default=None)
+
+def _redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _client
+
+def _iso(ts: datetime | None) -> str | None:
+    return ts.isoformat() if ts else None
+
+def run_payload(run) -> dict:
+    """목록 갱신에 필요한 run 필드(steps 제외)"""
+    return {
+        "id": run.id,
+        "dataset_id": run.dataset_id,
+        "model_type": run.model_type,
+        "params": run.params or {},
+        "sweep_id": run.sweep_id,
+        "parent_run_id": run.parent_run_id,
+        "status": run.status.value,
+        "attempt": run.attempt or 0,
+        "priority": run.priority.value if run.priority else "normal",
+        "created_at": _iso(run.created_at),
+        "started_at": _iso(run.started_at),
+        "finished_at": _iso(run.finished_at),
+        "artifacts": run.artifacts or {},
+        "metrics": run.metrics or {},
+        "error": run.error,
+        "promoted": bool(run.promoted),
+        "promoted_at": _iso(run.promoted_at),
+    }
+
+STEP_PROFILE_FIELDS = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "rows_in", "rows_out", "bytes_read", "bytes_written", "rows_per_sec")
+
+def step_payload(step) -> dict:
+    return {
+        "id": step.id,
+        "run_id": step.run_id,
+        "name": step.name,
+        "status": step.status.value,
+        "started_at": _iso(step.started_at),
+        "finished_at": _iso(step.finished_at),
+        "message": step.message,
+        **{f: getattr(step, f, None) for f in STEP_PROFILE_FIELDS},
+    }
+
+def dataset_payload(ds) -> dict:
+    return {"id": ds.id, "name": ds.name, "source_path": ds.source_path, "meta": ds.meta or {}, "sha256": ds.sha256, "created_at": _iso(ds.created_at)}
+
+@contextmanager
+def defer_events():
+    """블록 안의 publish_event(s)를 발행하지 않고 모아 둠(async 라우트가 이벤트 루프 밖에서 발행하도록)"""
+    events: list[tuple[str, dict]] = []
+    token = _deferred.set(events)
+    try:
+        yield events
+    finally:
+        _deferred.reset(token)
+
+def publish_event(kind: str, data: dict):
+    publish_events([(kind, data)])
+
+def publish_events(events: list[tuple[str, dict]]):
+    """
+    상태 변경 이벤트를 Redis pub/sub으로 발행(best-effort, 여러 건은 pipeline 한 번으로).
+    Redis 장애 시 요청/작업을 막지 않도록 잠시 발행을 건너뜀
+    """
+    global _down_until
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.extend(events)
+        return
+    if not events or time.monotonic() < _down_until:
+        return
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for kind, data in events:
+            pipe.publish(CHANNEL, orjson.dumps({"type": kind, "data": data}))
+        pipe.execute()
+    except redis.RedisError as e:
+        _down_until = time.monotonic() + RETRY_AFTER_SECONDS
+        log.warning("event publish failed (%s): %s", events[0][0], e)
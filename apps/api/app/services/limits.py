@@ -0,0 +1,72 @@
+from __future__ import annotations
+import logging
+import time
+import redis
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "exam_ai:slots"
+
+# 모든 key에 자리가 있을 때만 한 번에 점유(원자적). 점수 = lease 만료 시각, 만료된 점유는 먼저 정리
+_ACQUIRE = """
+local now = tonumber(ARGV[1])
+local expires = tonumber(ARGV[2])
+local token = ARGV[3]
+for i, key in ipairs(KEYS) do
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+  if not redis.call('ZSCORE', key, token) and redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+    return 0
+  end
+end
+for _, key in ipairs(KEYS) do
+  redis.call('ZADD', key, expires, token)
+end
+return 1
+"""
+
+_client: redis.Redis | None = None
+_script = None
+
+def _redis() -> redis.Redis:
+    global _client, _script
+    if _client is None:
+        _client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        _script = _client.register_script(_ACQUIRE)
+    return _client
+
+def slot_limits(queue: str | None, model_type: str | None) -> dict[str, int]:
+    """작업에 적용되는 제한 {redis key: 최대 동시 실행 수}. 설정이 없으면 빈 dict(Redis 사용 안 함)"""
+    limits = {}
+    if queue and queue in settings.QUEUE_CONCURRENCY_LIMITS:
+        limits[f"{KEY_PREFIX}:queue:{queue}"] = settings.QUEUE_CONCURRENCY_LIMITS[queue]
+    if model_type and model_type in settings.MODEL_TYPE_CONCURRENCY_LIMITS:
+        limits[f"{KEY_PREFIX}:model_type:{model_type}"] = settings.MODEL_TYPE_CONCURRENCY_LIMITS[model_type]
+    return limits
+
+def acquire(limits: dict[str, int], token: str) -> bool:
+    """
+    limits의 모든 key에서 자리를 점유. 이미 token으로 점유 중이면(재시도) 그대로 성공.
+    Redis에 연결할 수 없으면 제한 없이 진행(실행 자체를 막지 않음)
+    """
+    if not limits:
+        return True
+    now = time.time()
+    try:
+        _redis()
+        ok = _script(keys=list(limits), args=[now, now + settings.CONCURRENCY_LEASE_S, token, *limits.values()])
+    except redis.RedisError as e:
+        log.warning("concurrency limit unavailable, running without it: %s", e)
+        return True
+    return bool(ok)
+
+def release(limits: dict[str, int], token: str):
+    if not limits:
+        return
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for key in limits:
+            pipe.zrem(key, token)
+        pipe.execute()
+    except redis.RedisError as e:
+        log.warning("concurrency slot release failed (expires after lease): %s", e)
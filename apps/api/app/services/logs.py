@@ -1,7 +1,10 @@
+import os
 from pathlib import Path
 from datetime import datetime
 from .utils import ensure_dir
 
+TAIL_BLOCK = 8192
+
 def run_log_path(data_root: str, run_id: int) -> Path:
     return Path(data_root) / "logs" / f"run_{run_id}.log"
 
@@ -12,9 +15,53 @@ def append_log(data_root: str, run_id: int, message: str):
     with p.open("a", encoding="utf-8") as f:
         f.write(f"[{ts}] {message}\n")
 
-def tail_log(data_root: str, run_id: int, n: int = 200) -> str:
+def log_size(data_root: str, run_id: int) -> int:
+    try:
+        return run_log_path(data_root, run_id).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+def tail_log(data_root: str, run_id: int, n: int = 200) -> tuple[str, int]:
+    """파일 끝에서부터 블록 단위로 거꾸로 읽어 마지막 n줄과 (읽은 시점의) 파일 크기 반환"""
+    p = run_log_path(data_root, run_id)
+    try:
+        f = p.open("rb")
+    except FileNotFoundError:
+        return "", 0
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        pos = size
+        data = b""
+        # 마지막 줄의 개행 + n개 줄 경계가 보일 때까지
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="ignore").splitlines()
+    return "\n".join(lines[-n:]), size
+
+def read_log_from(data_root: str, run_id: int, offset: int, max_bytes: int = 256 * 1024) -> tuple[str, int, int]:
+    """
+    offset 이후에 추가된 바이트만 읽음 → (data, next_offset, size).
+    완성된 줄 단위로 끊어 반환하며, 파일이 offset보다 작아졌으면(교체/삭제) 처음부터 다시 읽음
+    """
     p = run_log_path(data_root, run_id)
-    if not p.exists():
-        return ""
-    lines = p.read_text(encoding="utf-8", errors="ignore").splitlines()
-    return "\n".join(lines[-n:])
+    try:
+        f = p.open("rb")
+    except FileNotFoundError:
+        return "", 0, 0
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if offset > size:
+            offset = 0
+        if offset == size:
+            return "", offset, size
+        f.seek(offset)
+        chunk = f.read(max_bytes)
+    cut = chunk.rfind(b"\n") + 1
+    if cut == 0 and len(chunk) < max_bytes:
+        return "", offset, size  # 아직 줄이 끝나지 않음
+    if cut == 0:
+        cut = len(chunk)  # 개행 없이 max_bytes를 넘는 한 줄
+    return chunk[:cut].decode("utf-8", errors="ignore"), offset + cut, size
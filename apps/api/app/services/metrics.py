@@ -0,0 +1,106 @@
+from __future__ import annotations
+import logging
+import redis
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from .. import models
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+# 스텝 wall time 히스토그램 구간(초)
+STEP_DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# 스텝별 누적 카운터: (메트릭 이름, RunStep 컬럼, 설명)
+STEP_COUNTERS = (
+    ("exam_ai_step_cpu_seconds_total", "cpu_seconds", "CPU time spent in completed steps."),
+    ("exam_ai_step_rows_in_total", "rows_in", "Rows processed by completed steps."),
+    ("exam_ai_step_bytes_read_total", "bytes_read", "Input bytes read by completed steps."),
+    ("exam_ai_step_bytes_written_total", "bytes_written", "Output bytes written by completed steps."),
+)
+
+_client: redis.Redis | None = None
+
+def _redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _client
+
+def _queue_names() -> list[str]:
+    from ..workers.celery_app import celery
+    routes = celery.conf.task_routes or {}
+    return sorted({r["queue"] for r in routes.values() if "queue" in r} | {celery.conf.task_default_queue})
+
+def _num(v) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v or 0)
+
+def _label(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"')
+
+def _step_lines(db: Session) -> list[str]:
+    """RunStep 자원 사용량 컬럼을 스텝 이름별로 한 번의 집계 쿼리로 읽어 히스토그램/카운터로 변환"""
+    s = models.RunStep
+    buckets = [func.sum(case((s.wall_seconds <= b, 1), else_=0)) for b in STEP_DURATION_BUCKETS]
+    counters = [func.sum(getattr(s, col)) for _, col, _ in STEP_COUNTERS]
+    stmt = (
+        select(s.name, func.count(), func.sum(s.wall_seconds), func.max(s.peak_rss_mb), *buckets, *counters)
+        .where(s.wall_seconds.isnot(None))
+        .group_by(s.name)
+        .order_by(s.name)
+    )
+    rows = db.execute(stmt).all()
+    nb = len(STEP_DURATION_BUCKETS)
+
+    lines = [
+        "# HELP exam_ai_step_duration_seconds Wall time of completed pipeline steps.",
+        "# TYPE exam_ai_step_duration_seconds histogram",
+    ]
+    for name, count, total, _, *rest in rows:
+        for le, n in zip(STEP_DURATION_BUCKETS, rest[:nb]):
+            lines.append(f'exam_ai_step_duration_seconds_bucket{{step="{_label(name)}",le="{le}"}} {_num(n)}')
+        lines.append(f'exam_ai_step_duration_seconds_bucket{{step="{_label(name)}",le="+Inf"}} {count}')
+        lines.append(f'exam_ai_step_duration_seconds_sum{{step="{_label(name)}"}} {_num(float(total or 0))}')
+        lines.append(f'exam_ai_step_duration_seconds_count{{step="{_label(name)}"}} {count}')
+    for i, (metric, _, help_text) in enumerate(STEP_COUNTERS):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for name, _, _, _, *rest in rows:
+            lines.append(f'{metric}{{step="{_label(name)}"}} {_num(rest[nb + i])}')
+    lines += ["# HELP exam_ai_step_peak_rss_mb Largest peak RSS observed for a step.", "# TYPE exam_ai_step_peak_rss_mb gauge"]
+    for name, _, _, peak, *_ in rows:
+        lines.append(f'exam_ai_step_peak_rss_mb{{step="{_label(name)}"}} {_num(float(peak or 0))}')
+    return lines
+
+def _run_lines(db: Session) -> list[str]:
+    counts = dict(db.execute(select(models.Run.status, func.count()).group_by(models.Run.status)).all())
+    lines = ["# HELP exam_ai_runs Runs by status.", "# TYPE exam_ai_runs gauge"]
+    for status in models.RunStatus:
+        lines.append(f'exam_ai_runs{{status="{status.value}"}} {counts.get(status, 0)}')
+    return lines
+
+def _priority_keys(name: str) -> list[str]:
+    """kombu Redis transport의 우선순위별 list key(우선순위 0은 큐 이름 그대로)"""
+    from ..workers.celery_app import celery
+    opts = celery.conf.broker_transport_options or {}
+    sep = opts.get("sep", "\x06\x16")
+    return [name] + [f"{name}{sep}{p}" for p in opts.get("priority_steps", [0, 3, 6, 9]) if p]
+
+def _queue_lines() -> list[str]:
+    """broker(Redis) 큐 길이(우선순위 sub-queue 합계). Redis에 연결할 수 없으면 생략(scrape 자체는 성공)"""
+    names = _queue_names()
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for name in names:
+            for key in _priority_keys(name):
+                pipe.llen(key)
+        depths = iter(pipe.execute())
+    except redis.RedisError as e:
+        log.warning("queue depth unavailable: %s", e)
+        return []
+    lines = ["# HELP exam_ai_queue_depth Messages waiting in the broker queue.", "# TYPE exam_ai_queue_depth gauge"]
+    for name in names:
+        lines.append(f'exam_ai_queue_depth{{queue="{_label(name)}"}} {sum(next(depths) for _ in _priority_keys(name))}')
+    return lines
+
+def render_metrics(db: Session) -> str:
+    """Prometheus text exposition(0.0.4). 값은 모두 DB/broker에서 읽으므로 API/워커 프로세스 수와 무관"""
+    return "\n".join([*_step_lines(db), *_run_lines(db), *_queue_lines()]) + "\n"
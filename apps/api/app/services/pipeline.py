@@ -4,13 +4,24 @@ from .utils import ensure_dir
 def make_run_dirs(data_root: str, run_id: int) -> dict:
     base = Path(data_root) / "runs" / f"run_{run_id}"
     processed = base / "processed"
+    features = base / "features"
     model_dir = base / "model"
     metrics_dir = base / "metrics"
-    for p in [processed, model_dir, metrics_dir]:
+    for p in [processed, features, model_dir, metrics_dir]:
         ensure_dir(p)
     return {
         "run_base": str(base),
         "processed_dir": str(processed),
+        "features_dir": str(features),
         "model_dir": str(model_dir),
         "metrics_dir": str(metrics_dir),
     }
+
+def make_sweep_dirs(data_root: str, sweep_id: int) -> dict:
+    base = Path(data_root) / "sweeps" / f"sweep_{sweep_id}"
+    processed = base / "processed"
+    ensure_dir(processed)
+    return {
+        "sweep_base": str(base),
+        "processed_dir": str(processed),
+    }
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import re
+import resource
+import time
+from pathlib import Path
+
+_HWM = re.compile(rb"VmHWM:\s+(\d+)\s+kB")
+
+def _cpu_seconds() -> float:
+    """현재 프로세스(모든 스레드) + 종료된 자식 프로세스의 user+system CPU 시간"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def _reset_peak_rss() -> bool:
+    """Linux: RSS high-water mark(VmHWM)를 현재 RSS로 초기화"""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb(reset: bool) -> float:
+    if reset:
+        try:
+            m = _HWM.search(Path("/proc/self/status").read_bytes())
+            if m:
+                return int(m.group(1)) / 1024
+        except OSError:
+            pass
+    # 초기화가 불가능하면 프로세스 수명 전체의 최대값(Linux는 kB 단위)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def file_bytes(*paths: str | None) -> int:
+    return sum(Path(p).stat().st_size for p in paths if p and Path(p).exists())
+
+class StepProfiler:
+    """
+    스텝 하나의 자원 사용량 측정(생성 시 시작, stop()에서 RunStep 컬럼 값 반환).
+    - wall/CPU 시간: CPU는 스레드 풀(n_jobs)과 자식 프로세스 사용량 포함
+    - peak RSS: 시작 시 high-water mark를 초기화해 스텝 구간의 최대값만 측정
+    - rows/bytes: 스텝이 실제로 처리한 행 수와 입력/출력 아티팩트 크기(캐시 hit이면 0)
+    """
+
+    def __init__(self):
+        self._reset = _reset_peak_rss()
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+
+    def stop(self, *, rows_in: int | None = None, rows_out: int | None = None,
+             bytes_read: int | None = None, bytes_written: int | None = None) -> dict:
+        wall = time.perf_counter() - self._wall
+        return {
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(_cpu_seconds() - self._cpu, 4),
+            "peak_rss_mb": round(_peak_rss_mb(self._reset), 1),
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+            "rows_per_sec": round(rows_in / wall, 1) if rows_in and wall > 0 else None,
+        }
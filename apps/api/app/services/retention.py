@@ -0,0 +1,74 @@
+from __future__ import annotations
+import logging
+import shutil
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy.orm import Session
+from .. import crud
+
+log = logging.getLogger(__name__)
+
+# 정리 대상: 재계산 가능한 큰 아티팩트. metrics/로그는 이력 조회용으로 유지
+RUN_GC_DIRS = ("processed", "features", "model")
+
+def _files(dirs: list[Path]) -> list[tuple[Path, tuple[int, int], int, int]]:
+    """dirs 아래 파일 (경로, inode, 크기, 하드링크 수)"""
+    out = []
+    for d in dirs:
+        for p in d.rglob("*") if d.is_dir() else []:
+            try:
+                st = p.lstat()
+            except OSError:
+                continue
+            if p.is_file():
+                out.append((p, (st.st_dev, st.st_ino), st.st_size, st.st_nlink))
+    return out
+
+def _usage(roots: list[Path]) -> tuple[Counter, dict]:
+    """roots 아래 inode별 링크 수와 크기(run 간 공유된 하드링크는 한 번만 계산)"""
+    links, sizes = Counter(), {}
+    for _, ino, size, _ in _files(roots):
+        links[ino] += 1
+        sizes[ino] = size
+    return links, sizes
+
+def collect_artifacts(db: Session, data_root: str, *, retention_days: int, max_bytes: int) -> dict:
+    """
+    승격되지 않은 종료 run의 processed/features/model과 종료된 sweep의 공유 processed 삭제.
+    - retention_days보다 오래된 대상은 모두 삭제
+    - 남은 runs/sweeps 디렉터리 크기(고유 inode 기준)가 max_bytes를 넘으면 오래된 대상부터 추가 삭제
+    캐시(DATA_ROOT/cache)와 하드링크된 파일은 링크만 제거되고, 실제 공간은 StepCache.evict()가 회수
+    """
+    root = Path(data_root)
+    links, sizes = _usage([root / "runs", root / "sweeps"])
+    total = sum(sizes.values())
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    candidates = [(row.ts, "run", row.id, [root / "runs" / f"run_{row.id}" / d for d in RUN_GC_DIRS])
+                  for row in crud.artifact_gc_runs(db)]
+    candidates += [(row.ts, "sweep", row.id, [root / "sweeps" / f"sweep_{row.id}" / "processed"])
+                   for row in crud.artifact_gc_sweeps(db)]
+    candidates.sort(key=lambda c: c[0])
+
+    stats = {"runs": 0, "sweeps": 0, "freed_bytes": 0}
+    for ts, kind, obj_id, dirs in candidates:
+        if ts >= cutoff and total <= max_bytes:
+            break
+        files = _files(dirs)
+        freed = sum(size for _, _, size, nlink in files if nlink == 1)
+        mark = crud.mark_run_artifacts_collected if kind == "run" else crud.mark_sweep_artifacts_collected
+        if not mark(db, obj_id, freed):
+            continue  # 그 사이 승격/재시도됨
+        for path, ino, size, _ in files:
+            path.unlink(missing_ok=True)
+            links[ino] -= 1
+            if links[ino] == 0:
+                total -= size
+        for d in dirs:
+            shutil.rmtree(d, ignore_errors=True)
+        stats[f"{kind}s"] += 1
+        stats["freed_bytes"] += freed
+        log.info("artifact gc: %s %s removed (%d bytes freed)", kind, obj_id, freed)
+    stats["total_bytes"] = total
+    return stats
@@ -0,0 +1,179 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import case, event, exists, literal, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .. import models
+from ..crud import replace_run_metrics
+from .events import publish_events, run_payload, step_payload
+
+RUN_TERMINAL = (models.RunStatus.success, models.RunStatus.failed, models.RunStatus.canceled)
+STEP_TERMINAL = (models.StepStatus.success, models.StepStatus.failed, models.StepStatus.skipped)
+
+_round_trips: ContextVar[list[int] | None] = ContextVar("db_round_trips", default=None)
+
+def _count(*_args, **_kwargs):
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
+# 문장 실행과 commit/rollback 모두 DB 왕복 1회로 집계
+event.listen(Engine, "before_cursor_execute", _count)
+event.listen(Engine, "commit", _count)
+event.listen(Engine, "rollback", _count)
+
+def _trips_so_far() -> int:
+    counter = _round_trips.get()
+    return counter[0] if counter is not None else 0
+
+@contextmanager
+def count_round_trips():
+    """블록 안에서 (현재 컨텍스트가) 실행한 DB 왕복 수를 counter[0]에 누적"""
+    counter = [0]
+    token = _round_trips.set(counter)
+    try:
+        yield counter
+    finally:
+        _round_trips.reset(token)
+
+class StaleAttempt(Exception):
+    """run.attempt가 바뀌어(retry/priority 상향) 이 작업의 기록이 반영되지 않음"""
+
+class RunStateWriter:
+    """
+    워커 전용 run 상태 기록기.
+    스텝 상태 + run 상태/아티팩트/지표를 UPDATE ... RETURNING 한 문장(PostgreSQL은 CTE, 그 외는 2문장)과 commit 1회로 기록.
+    run이 성공으로 끝나며 지표를 기록하면 run_metrics 행도 같은 트랜잭션으로 교체.
+    아티팩트/지표는 메모리에서 병합해 통째로 쓰므로 재조회·refresh가 없음(run 실행 중 유일한 writer라는 전제).
+    모든 UPDATE는 생성 시점의 attempt로 조건을 걸어, 새 attempt가 발행된 뒤 남은 이전 작업은 아무것도 덮어쓰지 못하고 StaleAttempt
+    스텝 종료/run 상태 기록 때 run 전체 DB 왕복 누적(count_round_trips로 잰 값)을 artifacts["db_round_trips"]에 함께 기록.
+    저장 값은 그 기록 직전까지의 측정치라 기록 자체의 문장/commit은 빠짐(다음 기록이나 db_round_trips 속성에서 반영)
+    """
+
+    def __init__(self, db: Session, run: models.Run):
+        self.db = db
+        self.run_id = run.id
+        self.attempt = run.attempt or 0
+        self.artifacts = dict(run.artifacts or {})
+        self.metrics = dict(run.metrics or {})
+        self.current_step: str | None = None  # 마지막으로 running 기록한 스텝(실패 시 이 스텝을 failed로 기록)
+        self._pg = db.get_bind().dialect.name == "postgresql"
+        self._trips_base = int(self.artifacts.get("db_round_trips") or 0)  # 이전 작업(스텝/재시도)까지 저장된 누적
+
+    @property
+    def db_round_trips(self) -> int:
+        """저장된 누적 + 이 작업에서 지금까지 잰 왕복 수"""
+        return self._trips_base + _trips_so_far()
+
+    def run(self, status: models.RunStatus, *, error: str | None = None):
+        self.write(run_status=status, error=error)
+
+    def step(self, name: str, status: models.StepStatus, message: str | None = None, **run_fields):
+        self.write(name, status, message, **run_fields)
+
+    def write(
+        self,
+        step_name: str | None = None,
+        step_status: models.StepStatus | None = None,
+        message: str | None = None,
+        *,
+        run_status: models.RunStatus | None = None,
+        artifacts: dict | None = None,
+        metrics: dict | None = None,
+        error: str | None = None,
+        profile: dict | None = None,
+    ):
+        now = datetime.utcnow()
+        run_values = {}
+        if run_status is not None:
+            # 취소된 run은 워커가 상태를 덮어쓰지 않음(실행 중이던 스텝 결과만 기록)
+            status = models.Run.__table__.c.status
+            run_values["status"] = case((status == models.RunStatus.canceled, status), else_=literal(run_status, status.type))
+            if run_status == models.RunStatus.running:
+                run_values["started_at"] = now
+            if run_status in RUN_TERMINAL:
+                run_values["finished_at"] = now
+        if artifacts:
+            self.artifacts.update(artifacts)
+            run_values["artifacts"] = dict(self.artifacts)
+        if metrics:
+            self.metrics.update(metrics)
+            run_values["metrics"] = dict(self.metrics)
+        if error:
+            run_values["error"] = error
+        if run_values or step_status in STEP_TERMINAL:
+            self.artifacts["db_round_trips"] = self.db_round_trips
+            run_values["artifacts"] = dict(self.artifacts)
+
+        step_row = run_row = None
+        if step_name:
+            step_values = {"status": step_status}
+            if step_status == models.StepStatus.running:
+                step_values["started_at"] = now
+                self.current_step = step_name
+            if step_status in STEP_TERMINAL:
+                step_values["finished_at"] = now
+            if message is not None:
+                step_values["message"] = message
+            if profile:
+                step_values.update(profile)  # StepProfiler.stop() 결과(RunStep 자원 사용량 컬럼)
+            step_row, run_row = self._update(step_name, step_values, run_values)
+        elif run_values:
+            run_row = self.db.execute(self._run_update(run_values)).first()
+        if run_values and run_row is None:
+            self.db.rollback()
+            raise StaleAttempt(f"run {self.run_id} attempt {self.attempt} superseded")
+        if metrics and run_row is not None and run_row.status == models.RunStatus.success:
+            # leaderboard/trend용 정규화 지표(취소되어 성공으로 기록되지 않은 run은 제외)
+            replace_run_metrics(self.db, self.run_id, run_row.dataset_id, run_row.model_type, self.metrics, now)
+        self.db.commit()
+
+        events = []
+        if step_row is not None:
+            events.append(("step.updated", step_payload(step_row)))
+        if run_row is not None:
+            events.append(("run.updated", run_payload(run_row)))
+        publish_events(events)
+
+    def _current(self):
+        """이 writer의 attempt가 아직 현재 attempt인 run 행 조건"""
+        runs = models.Run.__table__
+        return (runs.c.id == self.run_id) & (runs.c.attempt == self.attempt)
+
+    def _run_update(self, run_values: dict):
+        runs = models.Run.__table__
+        return update(runs).where(self._current()).values(**run_values).returning(*runs.c)
+
+    def _update(self, step_name: str, step_values: dict, run_values: dict):
+        steps, runs = models.RunStep.__table__, models.Run.__table__
+        step_stmt = (
+            update(steps)
+            .where(steps.c.run_id == self.run_id, steps.c.name == step_name, exists().where(self._current()))
+            .values(**step_values)
+            .returning(*steps.c)
+        )
+        if not run_values:
+            return self.db.execute(step_stmt).first(), None
+        if not self._pg:
+            step_row = self.db.execute(step_stmt).first()
+            run_row = self.db.execute(self._run_update(run_values)).first()
+            return step_row, run_row
+
+        # WITH s AS (UPDATE run_steps ... RETURNING *) UPDATE runs ... FROM s RETURNING runs.*, s.*
+        s = step_stmt.cte("s")
+        stmt = (
+            update(runs)
+            .where(runs.c.id == s.c.run_id, runs.c.attempt == self.attempt)
+            .values(**run_values)
+            .returning(*runs.c, *[c.label(f"step_{c.name}") for c in s.c])
+        )
+        row = self.db.execute(stmt).mappings().first()
+        if row is None:
+            # 스텝 행이 없는 run(스텝 추가 이전에 생성)은 run만 갱신
+            return None, self.db.execute(self._run_update(run_values)).first()
+        run_row = SimpleNamespace(**{c.name: row[c.name] for c in runs.c})
+        step_row = SimpleNamespace(**{c.name: row[f"step_{c.name}"] for c in steps.c})
+        return step_row, run_row
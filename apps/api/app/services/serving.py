@@ -0,0 +1,107 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+from pipelines.artifacts import load_model
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+
+class ModelCache:
+    """
+    모델 번들 LRU 캐시. key는 (경로, mtime) → 같은 run이 다시 학습되면 새로 로딩.
+    로딩은 경로별 lock으로 한 번만 수행(동시 요청이 같은 모델을 중복 로딩하지 않음)
+    """
+
+    def __init__(self, max_size: int = 8, n_jobs: int = 1):
+        self.max_size = max_size
+        self.n_jobs = n_jobs
+        self._items: OrderedDict[tuple[str, int], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_path: str) -> tuple[dict, bool]:
+        key = (model_path, Path(model_path).stat().st_mtime_ns)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key], True
+            load_lock = self._load_locks.setdefault(model_path, threading.Lock())
+        with load_lock:
+            with self._lock:
+                if key in self._items:
+                    self.hits += 1
+                    return self._items[key], True
+            bundle = load_model(model_path)  # 비압축 번들은 mmap(여러 워커 프로세스가 page cache 공유)
+            _set_n_jobs(bundle["model"], self.n_jobs)
+            with self._lock:
+                self.misses += 1
+                for k in [k for k in self._items if k[0] == model_path]:
+                    del self._items[k]
+                self._items[key] = bundle
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return bundle, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._items), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                    "models": [k[0] for k in self._items]}
+
+def _set_n_jobs(model, n_jobs: int):
+    """요청 단위 병렬은 API threadpool이 담당하므로, 작은 배치에서 joblib 병렬 오버헤드를 피함"""
+    est = model.steps[-1][1] if hasattr(model, "steps") else model
+    if "n_jobs" in est.get_params():
+        est.set_params(n_jobs=n_jobs)
+
+def parse_arrow(body: bytes, content_type: str) -> pd.DataFrame:
+    import pyarrow as pa
+    buf = pa.py_buffer(body)
+    reader = pa.ipc.open_file(buf) if content_type.startswith(ARROW_FILE) else pa.ipc.open_stream(buf)
+    return reader.read_all().to_pandas()
+
+def rows_to_frame(rows: list[dict] | None, columns: list[str] | None, data: list[list] | None) -> pd.DataFrame:
+    if rows is not None:
+        return pd.DataFrame.from_records(rows)
+    if data is not None:
+        return pd.DataFrame(data, columns=columns)
+    raise ValueError("either rows or columns+data is required")
+
+def score_frame(bundle: dict, df: pd.DataFrame, return_proba: bool = False) -> dict:
+    """학습 시 컬럼 순서로 맞춘 뒤 한 번의 벡터화 predict로 전체 배치 스코어링"""
+    if bundle.get("features"):
+        # 특성 스테이지로 학습한 모델: 배치(time 순서의 연속 구간)에 같은 spec으로 특성 계산
+        from pipelines.features import transform
+        df = transform(df, bundle["features"])
+    cols = bundle["columns"]
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"missing columns: {', '.join(missing)}")
+    model = bundle["model"]
+    X = df[cols]
+    out = {"predictions": model.predict(X).tolist()}
+    if return_proba and hasattr(model, "predict_proba"):
+        classes = getattr(model, "classes_", None)
+        out["classes"] = classes.tolist() if classes is not None else None
+        out["probabilities"] = model.predict_proba(X).tolist()
+    return out
+
+class Timer:
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.marks[name] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+    def done(self) -> dict[str, float]:
+        self.marks["total"] = round((time.perf_counter() - self._t0) * 1000, 3)
+        return self.marks
@@ -1,4 +1,15 @@
+import hashlib
 from pathlib import Path
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
+
+def sha256_file(p: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with Path(p).open("rb") as f:
+        while True:
+            b = f.read(chunk_size)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
@@ -6,7 +6,26 @@ celery = Celery(
     broker=settings.redis_url,
     backend=settings.redis_url,
 )
+# 스텝 작업은 자원 특성별 큐로 분리 → I/O 워커(preprocess)와 CPU 워커(features/train/evaluate)를 따로 확장
 celery.conf.update(
-    task_routes={"app.workers.tasks.*": {"queue": "default"}},
+    task_routes={
+        "app.workers.tasks.run_preprocess": {"queue": "io"},
+        "app.workers.tasks.run_sweep": {"queue": "io"},
+        "app.workers.tasks.gc_artifacts": {"queue": "io"},
+        "app.workers.tasks.run_features": {"queue": "cpu"},
+        "app.workers.tasks.run_train": {"queue": "cpu"},
+        "app.workers.tasks.run_evaluate": {"queue": "cpu"},
+        "app.workers.tasks.*": {"queue": "default"},
+    },
+    task_default_queue="default",
     task_track_started=True,
+    # Redis는 우선순위별 sub-queue(cpu, cpu:3, cpu:6 ...)로 priority를 구현, 0이 가장 먼저 소비됨
+    broker_transport_options={"priority_steps": list(range(10)), "sep": ":", "queue_order_strategy": "priority"},
+    task_default_priority=3,
+    # 우선순위가 높은 run이 prefetch된 메시지 뒤에 밀리지 않도록 워커 프로세스당 1개만 미리 가져옴
+    worker_prefetch_multiplier=1,
+    # artifact retention(beat 서비스가 발행)
+    beat_schedule={
+        "gc-artifacts": {"task": "app.workers.tasks.gc_artifacts", "schedule": settings.ARTIFACT_GC_INTERVAL_S},
+    },
 )
@@ -6,83 +6,585 @@ from sqlalchemy.orm import Session
 
 from app.workers.celery_app import celery
 from app.config import settings
-from app.db import SessionLocal, engine
-from app.models import Base, RunStatus, StepStatus
+from app.db import SessionLocal
+from app.models import RunPriority, RunStatus, StepStatus
 from app import crud
+from app.services import limits
+from app.services.cache import StepCache, pipeline_code_version
 from app.services.logs import append_log
-from app.services.pipeline import make_run_dirs
+from app.services.pipeline import make_run_dirs, make_sweep_dirs
+from app.services.profiling import StepProfiler, file_bytes
+from app.services.retention import collect_artifacts
+from app.services.run_state import RunStateWriter, StaleAttempt, count_round_trips
+from app.services.utils import sha256_file
 
-# Ensure tables exist (MVP)
-Base.metadata.create_all(bind=engine)
+def _db(**kw) -> Session:
+    return SessionLocal(**kw)
 
-def _db() -> Session:
-    return SessionLocal()
+def _step_cache() -> StepCache | None:
+    if not settings.STEP_CACHE_ENABLED:
+        return None
+    return StepCache(
+        settings.DATA_ROOT,
+        pipeline_code_version(settings.PIPELINE_CODE_VERSION),
+        max_bytes=int(settings.STEP_CACHE_MAX_GB * 1024 ** 3),
+        max_age_seconds=settings.STEP_CACHE_MAX_AGE_DAYS * 86400,
+    )
 
-@celery.task(name="app.workers.tasks.run_pipeline")
-def run_pipeline(run_id: int):
-    db = _db()
-    try:
-        run = crud.get_run(db, run_id)
-        if not run:
-            return {"ok": False, "error": f"run {run_id} not found"}
-
-        crud.set_run_status(db, run_id, RunStatus.running)
-        append_log(settings.DATA_ROOT, run_id, f"Run started (dataset_id={run.dataset_id}, model_type={run.model_type})")
-
-        dirs = make_run_dirs(settings.DATA_ROOT, run_id)
-
-        # Step 1: preprocess
-        crud.set_step_status(db, run_id, "preprocess", StepStatus.running)
-        append_log(settings.DATA_ROOT, run_id, "Step preprocess: start")
-        from pipelines.preprocess import preprocess
-        processed_path = preprocess(
-            source_path=run.dataset.source_path,
-            out_dir=dirs["processed_dir"],
+def _dataset_hash(db: Session, dataset) -> str:
+    checksum = (dataset.meta or {}).get("sha256")
+    if not checksum:
+        checksum = sha256_file(Path(dataset.source_path))
+        crud.update_dataset_meta(db, dataset.id, {"sha256": checksum})
+    return checksum
+
+def _cached(cache: StepCache | None, step: str, key: str, out_dir: str, compute, cacheable=None) -> tuple[dict, dict, bool]:
+    """
+    캐시 hit이면 아티팩트를 out_dir로 하드링크해 (files, outputs, True) 반환,
+    miss면 compute() -> (files, outputs) 실행 후 캐시에 저장(cacheable()이 False면 저장하지 않음)
+    """
+    if cache:
+        entry = cache.restore(step, key, out_dir)
+        if entry:
+            return entry.files, entry.outputs, True
+    files, outputs = compute()
+    if cache and (cacheable is None or cacheable()):
+        cache.store(step, key, files, outputs)
+        cache.evict()
+    return files, outputs, False
+
+def _preprocess_keys(db: Session, cache: StepCache | None, dataset) -> list[str]:
+    """
+    데이터셋 버전별 preprocess 캐시 키 [원본, +세그먼트1, +세그먼트2, ...].
+    세그먼트 키는 직전 키 + 세그먼트 checksum으로 계산 → 이전 버전의 processed를 찾아 delta만 처리
+    """
+    if not cache:
+        return [""] * (len(dataset.segments) + 1)
+    columns = (dataset.meta or {}).get("columns")
+    keys = [cache.key("preprocess", _dataset_hash(db, dataset), {"columns": columns} if columns else None)]
+    for seg in dataset.segments:
+        keys.append(cache.key("preprocess", keys[-1], {"append": seg.sha256}))
+    return keys
+
+def _restore_latest(cache: StepCache | None, step: str, keys: list[str], out_dir: str) -> tuple[int, dict]:
+    """keys 중 캐시에 있는 가장 최근 버전을 out_dir로 복원 → (index, files), 없으면 (-1, {})"""
+    if cache:
+        for i in range(len(keys) - 1, -1, -1):
+            entry = cache.restore(step, keys[i], out_dir)
+            if entry:
+                return i, entry.files
+    return -1, {}
+
+def _preprocess(db: Session, cache: StepCache | None, dataset, out_dir: str, run_id: int) -> tuple[str, str, bool, dict]:
+    """
+    원본 + append 세그먼트 전처리 → (processed_path, 최종 버전 키, cache hit 여부, 처리량).
+    캐시에 있는 가장 최근 버전부터 이어서 남은 세그먼트만 delta 전처리.
+    처리량은 실제로 전처리한 행/원본 바이트와 기록한 바이트(StepProfiler.stop 인자)
+    """
+    from pipelines.artifacts import processed_rows, read_schema
+    from pipelines.preprocess import preprocess, preprocess_append
+
+    meta = dataset.meta or {}
+    checksum = _dataset_hash(db, dataset)
+    columns = meta.get("columns")  # 등록 시 지정하면 해당 컬럼만 읽음(Parquet은 column projection)
+    keys = _preprocess_keys(db, cache, dataset)
+    # 같은 원본(sha256)에 대해 저장된 compact schema는 재사용 → 타입 추론 생략, 파싱 단계에서 바로 compact 타입
+    stored = meta.get("schema") or {}
+    schema = stored if stored.get("sha256") == checksum else None
+
+    def _compute():
+        path = preprocess(
+            source_path=dataset.source_path,
+            out_dir=out_dir,
             run_id=run_id,
+            mode=settings.PREPROCESS_MODE,
+            memory_budget_mb=settings.PREPROCESS_MEMORY_BUDGET_MB,
+            columns=columns,
+            schema=schema,
         )
-        crud.set_step_status(db, run_id, "preprocess", StepStatus.success, message=f"processed={processed_path}")
-        crud.update_run_artifacts_and_metrics(db, run_id, artifacts={"processed_path": processed_path})
-        append_log(settings.DATA_ROOT, run_id, f"Step preprocess: done -> {processed_path}")
-
-        # Step 2: train
-        crud.set_step_status(db, run_id, "train", StepStatus.running)
-        append_log(settings.DATA_ROOT, run_id, "Step train: start")
-        from pipelines.train import train
-        model_path = train(
-            processed_path=processed_path,
+        return {"processed": path}, {}
+
+    io = {"rows_in": 0, "bytes_read": 0, "bytes_written": 0}
+    start, files = _restore_latest(cache, "preprocess", keys, out_dir)
+    hit = start == len(keys) - 1
+    rows = processed_rows(files["processed"]) if start >= 0 else 0
+    if start < 0:
+        files, _, base_hit = _cached(cache, "preprocess", keys[0], out_dir, _compute)
+        start = 0
+        rows = processed_rows(files["processed"])
+        if not base_hit:
+            io["rows_in"] += rows
+            io["bytes_read"] += file_bytes(dataset.source_path)
+            io["bytes_written"] += file_bytes(files["processed"])
+        if schema is None:
+            inferred = read_schema(files["processed"])
+            if inferred:
+                crud.update_dataset_meta(db, dataset.id, {"schema": {**inferred, "sha256": checksum}})
+    path = files["processed"]
+    for i in range(start + 1, len(keys)):
+        seg = dataset.segments[i - 1]
+
+        def _append(parent=path, seg=seg):
+            return {"processed": preprocess_append(parent, seg.source_path, out_dir, run_id, columns=columns)}, {}
+
+        files, _, seg_hit = _cached(cache, "preprocess", keys[i], out_dir, _append)
+        path = files["processed"]
+        total = processed_rows(path)
+        if not seg_hit:
+            io["rows_in"] += total - rows
+            io["bytes_read"] += file_bytes(seg.source_path)
+            io["bytes_written"] += file_bytes(path)
+        rows = total
+        append_log(settings.DATA_ROOT, run_id, f"Step preprocess: appended segment {seg.seq} ({seg.source_path})")
+    io["rows_out"] = rows
+    return path, keys[-1], hit, io
+
+def _features(cache: StepCache | None, spec: dict, processed_path: str, pre_keys: list[str], out_dir: str, run_id: int) -> tuple[str, str, bool, dict]:
+    """
+    features 스텝 → (features_path, 키, cache hit 여부, 처리량). 키는 (데이터셋 버전의 preprocess 키, spec).
+    이전 버전의 features가 캐시에 있으면 이후 추가된 행만 계산해 붙임
+    """
+    from pipelines.artifacts import processed_rows
+    from pipelines.features import build_features, build_features_append
+
+    keys = [cache.key("features", k, spec) for k in pre_keys] if cache else [""]
+    start, files = _restore_latest(cache, "features", keys, out_dir)
+    if start == len(keys) - 1:
+        path = files["features"]
+        return path, keys[-1], True, {"rows_in": 0, "rows_out": processed_rows(path), "bytes_read": 0, "bytes_written": 0}
+    parent = files.get("features")
+    parent_rows = processed_rows(parent) if parent else 0
+
+    def _compute():
+        if parent:
+            return {"features": build_features_append(parent, processed_path, out_dir, run_id, spec)}, {}
+        return {"features": build_features(processed_path, out_dir, run_id, spec)}, {}
+
+    files, _, hit = _cached(cache, "features", keys[-1], out_dir, _compute)
+    path = files["features"]
+    rows = processed_rows(path)
+    if hit:
+        return path, keys[-1], True, {"rows_in": 0, "rows_out": rows, "bytes_read": 0, "bytes_written": 0}
+    # 행은 새로 계산한 행, 바이트는 입력 processed(+ append 시 parent features)와 출력 파일 크기
+    io = {"rows_in": rows - parent_rows, "rows_out": rows, "bytes_read": file_bytes(processed_path, parent), "bytes_written": file_bytes(path)}
+    return path, keys[-1], False, io
+
+def _feature_spec(params: dict) -> tuple[dict | None, dict]:
+    """run params에서 "features"를 분리 → (정규화된 spec 또는 None(생략), 모델 하이퍼파라미터)"""
+    from pipelines.features import resolve_spec
+
+    params = dict(params or {})
+    spec = params.pop("features", None)
+    if not settings.FEATURES_ENABLED or spec is False:
+        return None, params
+    return resolve_spec(spec if isinstance(spec, dict) else None), params
+
+def _train_n_jobs() -> int:
+    if settings.TRAIN_N_JOBS:
+        return settings.TRAIN_N_JOBS
+    from pipelines.models import available_cpus
+    return max(1, available_cpus() // max(1, settings.WORKER_CONCURRENCY))
+
+def _step_message(hit: bool, key: str, detail: str) -> str:
+    return f"cache hit (key={key[:12]}) {detail}" if hit else detail
+
+# 스텝별 Celery 작업. preprocess는 I/O 큐, 나머지는 CPU 큐(celery_app.task_routes)로 라우팅되어
+# 워커 종류별로 따로 확장. 스텝 사이 상태는 run.artifacts에 기록된 경로/캐시 키로만 전달
+STEP_OUTPUTS = {"preprocess": "processed_path", "features": "features_path", "train": "model_path", "evaluate": "metrics_path"}
+
+def _train_input(run, artifacts: dict) -> tuple[str, str, dict | None, dict]:
+    """train/evaluate 입력 → (경로, 캐시 부모 키, feature spec 또는 None, 모델 하이퍼파라미터)"""
+    feature_spec, params = _feature_spec(run.params)
+    if feature_spec is None:
+        return artifacts["processed_path"], artifacts.get("preprocess_key", ""), None, params
+    return artifacts["features_path"], artifacts.get("features_key", ""), feature_spec, params
+
+def _step_preprocess(db: Session, state: RunStateWriter, run, cache: StepCache | None, dirs: dict):
+    state.step("preprocess", StepStatus.running)
+    append_log(settings.DATA_ROOT, run.id, "Step preprocess: start")
+    prof = StepProfiler()
+    processed_path, pre_key, hit, io = _preprocess(db, cache, run.dataset, dirs["processed_dir"], run.id)
+    state.step("preprocess", StepStatus.success, _step_message(hit, pre_key, f"processed={processed_path}"),
+               artifacts={"processed_path": processed_path, "preprocess_key": pre_key, "processed_bytes": file_bytes(processed_path)},
+               profile=prof.stop(**io))
+    append_log(settings.DATA_ROOT, run.id, f"Step preprocess: {'cache hit' if hit else 'done'} -> {processed_path}")
+
+def _step_features(db: Session, state: RunStateWriter, run, cache: StepCache | None, dirs: dict):
+    # 캐시 키는 (전처리 키 = 데이터셋 해시, spec)만으로 결정 → 모델/하이퍼파라미터만 바꾼 run은 계산 없이 재사용
+    feature_spec, _ = _feature_spec(run.params)
+    if feature_spec is None:
+        state.step("features", StepStatus.skipped, "disabled")
+        return
+    processed_path = state.artifacts["processed_path"]
+    pre_key = state.artifacts.get("preprocess_key", "")
+    if not pre_key:
+        cache = None  # 입력 해시를 모르면 캐시를 사용하지 않음
+    state.step("features", StepStatus.running)
+    append_log(settings.DATA_ROOT, run.id, "Step features: start")
+    pre_keys = _preprocess_keys(db, cache, run.dataset) if cache else [pre_key]
+    if pre_keys[-1] != pre_key:
+        pre_keys = [pre_key]  # sweep 등에서 받은 processed가 현재 데이터셋 버전과 다름
+    prof = StepProfiler()
+    path, feat_key, hit, io = _features(cache, feature_spec, processed_path, pre_keys, dirs["features_dir"], run.id)
+    state.step("features", StepStatus.success, _step_message(hit, feat_key, f"features={path}"),
+               artifacts={"features_path": path, "features_key": feat_key, "features_bytes": file_bytes(path)}, profile=prof.stop(**io))
+    append_log(settings.DATA_ROOT, run.id, f"Step features: {'cache hit' if hit else 'done'} -> {path}")
+
+def _step_train(db: Session, state: RunStateWriter, run, cache: StepCache | None, dirs: dict):
+    from pipelines.artifacts import model_compress, processed_rows
+    from pipelines.train import fit
+
+    train_input, parent_key, feature_spec, params = _train_input(run, state.artifacts)
+    if not parent_key:
+        cache = None
+    # fused 모드: 같은 작업에서 train이 메모리에 올린 모델/val 데이터로 바로 evaluate(재로딩·재분할 없음)
+    fused = settings.PIPELINE_EXECUTION_MODE == "fused"
+    trained = None
+    # parent_run_id: parent 모델에 이후 추가된 행(delta)만 이어서 학습
+    warm_from = warm_key = None
+    if run.parent_run_id:
+        parent = crud.get_run(db, run.parent_run_id)
+        parent_artifacts = (parent.artifacts or {}) if parent else {}
+        if parent and parent.status == RunStatus.success and parent_artifacts.get("model_path"):
+            warm_from = parent_artifacts["model_path"]
+            warm_key = parent_artifacts.get("train_key") or warm_from
+        else:
+            append_log(settings.DATA_ROOT, run.id, f"Step train: parent run {run.parent_run_id} has no model, training from scratch")
+    state.step("train", StepStatus.running)
+    append_log(settings.DATA_ROOT, run.id, "Step train: start")
+
+    fit_info = {}
+    prof = StepProfiler()
+
+    def _train():
+        nonlocal trained, fit_info
+        result = fit(
+            processed_path=train_input,
             out_dir=dirs["model_dir"],
-            run_id=run_id,
+            run_id=run.id,
             model_type=run.model_type,
+            params=params,
+            n_jobs=_train_n_jobs(),
+            time_budget_s=settings.TRAIN_TIME_BUDGET_S,
+            features=feature_spec,
+            warm_start_from=warm_from,
+            compress=model_compress(settings.MODEL_COMPRESSION),
         )
-        crud.set_step_status(db, run_id, "train", StepStatus.success, message=f"model={model_path}")
-        crud.update_run_artifacts_and_metrics(db, run_id, artifacts={"model_path": model_path})
-        append_log(settings.DATA_ROOT, run_id, f"Step train: done -> {model_path}")
-
-        # Step 3: evaluate
-        crud.set_step_status(db, run_id, "evaluate", StepStatus.running)
-        append_log(settings.DATA_ROOT, run_id, "Step evaluate: start")
-        from pipelines.evaluate import evaluate
-        metrics = evaluate(
-            processed_path=processed_path,
-            model_path=model_path,
-            out_dir=dirs["metrics_dir"],
-            run_id=run_id,
-        )
-        metrics_path = str(Path(dirs["metrics_dir"]) / "metrics.json")
-        Path(metrics_path).write_text(json.dumps(metrics, ensure_ascii=False, indent=2), encoding="utf-8")
-        crud.set_step_status(db, run_id, "evaluate", StepStatus.success, message=f"metrics={metrics_path}")
-        crud.update_run_artifacts_and_metrics(db, run_id, artifacts={"metrics_path": metrics_path}, metrics=metrics)
-        append_log(settings.DATA_ROOT, run_id, f"Step evaluate: done -> {metrics_path}")
+        if fused:
+            trained = result
+        fit_info = result.fit_info
+        append_log(settings.DATA_ROOT, run.id, f"Step train: fit {result.fit_info}")
+        return {"model": result.model_path, "split": result.split_path}, {}
+
+    train_params = {"model_type": run.model_type, "params": params}
+    if warm_from:
+        train_params["warm_start_from"] = warm_key
+    train_key = cache.key("train", parent_key, train_params) if cache else ""
+    # 시간 예산으로 중간에 멈춘 학습은 예산과 무관한 키로 재사용되면 안 되므로 캐시하지 않음(evaluate 캐시도 생략)
+    files, _, hit = _cached(cache, "train", train_key, dirs["model_dir"], _train,
+                            cacheable=lambda: not fit_info.get("stopped_by_budget"))
+    if fit_info.get("stopped_by_budget"):
+        train_key = ""
+    model_path = files["model"]
+    split_path = files.get("split")
+    io = {}
+    if not hit:
+        # warm start는 delta 행만 읽으므로 입력 바이트도 읽은 행 비율만큼
+        total = processed_rows(train_input)
+        read_rows = fit_info.get("delta_rows") or total
+        io = {"rows_in": fit_info.get("train_rows"), "bytes_read": file_bytes(train_input) * read_rows // max(total, 1),
+              "bytes_written": file_bytes(model_path, split_path)}
+    state.step("train", StepStatus.success, _step_message(hit, train_key, f"model={model_path}"),
+               artifacts={"model_path": model_path, "split_path": split_path, "train_key": train_key,
+                          "model_bytes": file_bytes(model_path), "split_bytes": file_bytes(split_path)}, profile=prof.stop(**io))
+    append_log(settings.DATA_ROOT, run.id, f"Step train: {'cache hit' if hit else 'done'} -> {model_path}")
+    if fused:
+        # 취소 요청은 스텝 사이에서 확인(실행 중인 스텝은 끝까지 수행)
+        if crud.get_run_status(db, run.id) == RunStatus.canceled:
+            append_log(settings.DATA_ROOT, run.id, "Step evaluate: skipped (run canceled)")
+            return
+        _step_evaluate(db, state, run, cache, dirs, trained=trained)
+
+def _step_evaluate(db: Session, state: RunStateWriter, run, cache: StepCache | None, dirs: dict, trained=None):
+    from pipelines.evaluate import evaluate, score
+
+    train_input, _, _, _ = _train_input(run, state.artifacts)
+    model_path = state.artifacts["model_path"]
+    split_path = state.artifacts.get("split_path")
+    train_key = state.artifacts.get("train_key", "")
+    if not train_key:
+        cache = None
+    state.step("evaluate", StepStatus.running)
+    append_log(settings.DATA_ROOT, run.id, "Step evaluate: start" + (" (in-memory)" if trained else ""))
+
+    prof = StepProfiler()
+    in_memory = trained is not None
+
+    def _evaluate():
+        if trained:
+            metrics = score(trained.model, trained.X_val, trained.y_val)
+        else:
+            metrics = evaluate(
+                processed_path=train_input,
+                model_path=model_path,
+                out_dir=dirs["metrics_dir"],
+                run_id=run.id,
+                split_path=split_path,
+            )
+        path = Path(dirs["metrics_dir"]) / "metrics.json"
+        path.unlink(missing_ok=True)
+        path.write_text(json.dumps(metrics, ensure_ascii=False, indent=2), encoding="utf-8")
+        return {"metrics": str(path)}, metrics
+
+    eval_key = cache.key("evaluate", train_key) if cache else ""
+    files, metrics, hit = _cached(cache, "evaluate", eval_key, dirs["metrics_dir"], _evaluate)
+    trained = None
+    metrics_path = files["metrics"]
+    io = {}
+    if not hit:
+        io = {"rows_in": metrics.get("val_samples"), "bytes_written": file_bytes(metrics_path),
+              "bytes_read": 0 if in_memory else file_bytes(model_path, split_path)}
+    # 마지막 스텝 완료와 run 성공을 한 번에 기록
+    state.step("evaluate", StepStatus.success, _step_message(hit, eval_key, f"metrics={metrics_path}"),
+               artifacts={"metrics_path": metrics_path, "metrics_bytes": file_bytes(metrics_path)}, metrics=metrics, run_status=RunStatus.success, profile=prof.stop(**io))
+    append_log(settings.DATA_ROOT, run.id, f"Step evaluate: {'cache hit' if hit else 'done'} -> {metrics_path}")
+    append_log(settings.DATA_ROOT, run.id, f"Run finished: SUCCESS (db round trips: {state.db_round_trips})")
+
+STEPS = {
+    "preprocess": _step_preprocess,
+    "features": _step_features,
+    "train": _step_train,
+    "evaluate": _step_evaluate,
+}
+
+# broker 우선순위(Redis priority 큐: 0이 가장 먼저 소비)
+BROKER_PRIORITY = {RunPriority.high: 0, RunPriority.normal: 3, RunPriority.low: 6}
 
-        crud.set_run_status(db, run_id, RunStatus.success)
-        append_log(settings.DATA_ROOT, run_id, "Run finished: SUCCESS")
-        return {"ok": True, "run_id": run_id, "metrics": metrics}
+def _task_queue(task) -> str:
+    return celery.amqp.router.route({}, task.name)["queue"].name
 
+def _run_step(task, name: str, run_id: int, attempt: int) -> dict:
+    result = _execute_step(task, name, run_id, attempt)
+    if result is None:
+        if task.request.retries >= settings.CONCURRENCY_MAX_RETRIES:
+            # 자리를 너무 오래 기다림 → run을 failed로 기록하고 chain 종료(queued/running에 남지 않게)
+            error = f"no concurrency slot after {task.request.retries} retries"
+            db = _db()
+            try:
+                crud.fail_run(db, run_id, attempt, name, error)
+            finally:
+                db.close()
+            append_log(settings.DATA_ROOT, run_id, f"Run failed: {error}")
+            return {"ok": False, "run_id": run_id, "step": name, "error": error}
+        # 동시 실행 제한에 걸림 → 같은 작업(같은 chain 위치, 같은 task id)을 잠시 뒤 다시 큐에 넣음
+        raise task.retry(countdown=settings.CONCURRENCY_RETRY_S, max_retries=None)
+    return result
+
+def _execute_step(task, name: str, run_id: int, attempt: int) -> dict | None:
+    """
+    스텝 하나 실행(동시 실행 제한으로 대기해야 하면 None). 실패하면 실제로 실행 중이던 스텝(fused 모드의 evaluate 포함)을
+    failed로 기록하고 예외를 올리지 않으므로 chain의 나머지 작업은 아래 검사에서 바로 종료(sweep chord도 정상 완료).
+    attempt가 run.attempt와 다르면 이전 시도(retry/priority 상향 전)의 작업이므로 무시, 취소된 run은 남은 스텝을 건너뜀.
+    상태 기록기 생성 전 실패는 crud.fail_run으로 기록하고, run 조회/기록부터 안 되면 STEP_DB_MAX_RETRIES번까지 재시도
+    """
+    with count_round_trips():
+        # 상태 기록은 RunStateWriter가 UPDATE ... RETURNING으로 처리하므로 commit 후 ORM 객체 재조회가 필요 없음
+        db = _db(expire_on_commit=False)
+        run = state = None
+        slots = {}
+        try:
+            run = crud.get_run(db, run_id, eager=True)
+            if not run:
+                return {"ok": False, "error": f"run {run_id} not found"}
+            if run.attempt != attempt or run.status in (RunStatus.failed, RunStatus.canceled):
+                if run.attempt == attempt and run.status == RunStatus.canceled:
+                    append_log(settings.DATA_ROOT, run_id, f"Step {name}: skipped (run canceled)")
+                return {"ok": False, "run_id": run_id, "step": name, "skipped": True}
+            slots = limits.slot_limits(_task_queue(task), run.model_type if name == "train" else None)
+            if not limits.acquire(slots, task.request.id or f"{run_id}-{attempt}-{name}"):
+                slots = {}
+                return None
+
+            state = RunStateWriter(db, run)
+            if run.status != RunStatus.running:
+                state.run(RunStatus.running)
+                start = f"Run started (dataset_id={run.dataset_id}, model_type={run.model_type})"
+                if attempt:
+                    start = f"Run resumed from {name} (attempt {attempt})"
+                append_log(settings.DATA_ROOT, run_id, start)
+            STEPS[name](db, state, run, _step_cache(), make_run_dirs(settings.DATA_ROOT, run_id))
+            return {"ok": True, "run_id": run_id, "step": name, "db_round_trips": state.db_round_trips}
+
+        except StaleAttempt:
+            # 실행 중 retry/priority 상향으로 새 attempt가 발행됨 → 기록 없이 중단(새 attempt의 chain이 이어서 실행)
+            append_log(settings.DATA_ROOT, run_id, f"Step {name}: stopped (attempt {attempt} superseded)")
+            return {"ok": False, "run_id": run_id, "step": name, "skipped": True}
+        except Exception as e:
+            tb = traceback.format_exc()
+            db.rollback()
+            if state is None:
+                # 상태 기록기 생성 전 실패(자리 확보 등) → run을 직접 failed로 기록해 queued/running에 남지 않게 함
+                if run is not None:
+                    try:
+                        crud.fail_run(db, run_id, attempt, name, str(e))
+                        append_log(settings.DATA_ROOT, run_id, f"Run failed: {e}\n{tb}")
+                        return {"ok": False, "run_id": run_id, "step": name, "error": str(e)}
+                    except Exception as db_error:
+                        db.rollback()
+                        e = db_error
+                # run 조회/실패 기록부터 안 됨(일시적 DB 오류) → 횟수 제한을 두고 작업 재시도
+                append_log(settings.DATA_ROOT, run_id, f"Step {name}: database error, retrying: {e}")
+                raise task.retry(exc=e, countdown=settings.STEP_DB_RETRY_S, max_retries=settings.STEP_DB_MAX_RETRIES)
+            state.step(state.current_step or name, StepStatus.failed, str(e), run_status=RunStatus.failed, error=str(e))
+            append_log(settings.DATA_ROOT, run_id, f"Run failed (db round trips: {state.db_round_trips}): {e}\n{tb}")
+            return {"ok": False, "run_id": run_id, "step": state.current_step or name, "error": str(e), "db_round_trips": state.db_round_trips}
+        finally:
+            limits.release(slots, task.request.id or f"{run_id}-{attempt}-{name}")
+            db.close()
+
+@celery.task(bind=True, name="app.workers.tasks.run_preprocess")
+def run_preprocess(self, run_id: int, attempt: int = 0):
+    return _run_step(self, "preprocess", run_id, attempt)
+
+@celery.task(bind=True, name="app.workers.tasks.run_features")
+def run_features(self, run_id: int, attempt: int = 0):
+    return _run_step(self, "features", run_id, attempt)
+
+@celery.task(bind=True, name="app.workers.tasks.run_train")
+def run_train(self, run_id: int, attempt: int = 0):
+    return _run_step(self, "train", run_id, attempt)
+
+@celery.task(bind=True, name="app.workers.tasks.run_evaluate")
+def run_evaluate(self, run_id: int, attempt: int = 0):
+    return _run_step(self, "evaluate", run_id, attempt)
+
+STEP_TASKS = {"preprocess": run_preprocess, "features": run_features, "train": run_train, "evaluate": run_evaluate}
+
+def step_task_id(run_id: int, attempt: int, name: str) -> str:
+    """스텝 작업 id는 (run, attempt, 스텝)으로 결정 → 따로 저장하지 않아도 취소 시 revoke 가능"""
+    return f"run-{run_id}-{attempt}-{name}"
+
+def pipeline_chain(run_id: int, attempt: int = 0, from_step: str = "preprocess", priority: RunPriority = RunPriority.normal):
+    """from_step부터 마지막 스텝까지의 chain. fused 모드에서는 train 작업이 evaluate까지 수행"""
+    from celery import chain
+
+    names = list(crud.STEP_NAMES[crud.STEP_NAMES.index(from_step):])
+    if settings.PIPELINE_EXECUTION_MODE == "fused" and "train" in names:
+        names.remove("evaluate")
+    return chain(
+        STEP_TASKS[name].si(run_id, attempt).set(task_id=step_task_id(run_id, attempt, name), priority=BROKER_PRIORITY[RunPriority(priority)])
+        for name in names
+    )
+
+def revoke_run(run_id: int, attempt: int):
+    """아직 시작하지 않은 스텝 작업 revoke(best-effort: 실패해도 스텝 시작 시 canceled 상태를 보고 건너뜀)"""
+    try:
+        celery.control.revoke([step_task_id(run_id, attempt, name) for name in crud.STEP_NAMES])
     except Exception as e:
-        tb = traceback.format_exc()
-        append_log(settings.DATA_ROOT, run_id, f"Run failed: {e}\n{tb}")
-        crud.set_step_status(db, run_id, "evaluate", StepStatus.failed, message=str(e))
-        crud.set_run_status(db, run_id, RunStatus.failed, error=str(e))
-        return {"ok": False, "run_id": run_id, "error": str(e)}
+        append_log(settings.DATA_ROOT, run_id, f"Revoke failed (remaining steps will be skipped): {e}")
+
+@celery.task(name="app.workers.tasks.run_pipeline")
+def run_pipeline(run_id: int, attempt: int = 0, from_step: str = "preprocess"):
+    """스텝 chain 발행(API는 pipeline_chain을 직접 발행, 이전 버전에서 큐에 남은 메시지 호환용)"""
+    pipeline_chain(run_id, attempt, from_step).apply_async()
+    return {"ok": True, "run_id": run_id, "from_step": from_step}
+
+
+@celery.task(name="app.workers.tasks.enqueue_runs")
+def enqueue_runs(run_ids: list[int]):
+    """
+    bulk 제출 fan-out: API는 이 메시지 하나만 broker에 보내고,
+    워커가 producer 연결 하나를 재사용해 run별 스텝 chain을 (run의 attempt/priority로) 발행
+    """
+    db = _db()
+    try:
+        runs = crud.run_dispatch_info(db, run_ids)
+    finally:
+        db.close()
+    with celery.producer_or_acquire() as producer:
+        for rid, attempt, priority in runs:
+            pipeline_chain(rid, attempt, priority=priority).apply_async(producer=producer)
+    return {"ok": True, "count": len(runs)}
+
+
+@celery.task(name="app.workers.tasks.run_sweep")
+def run_sweep(sweep_id: int):
+    """
+    sweep: 전처리는 한 번만 수행하고, 각 run의 features 이후 스텝 chain을 chord로 워커들에 분산.
+    모든 run이 끝나면 finalize_sweep이 best config를 기록
+    """
+    from celery import chord
+
+    db = _db()
+    try:
+        sweep = crud.get_sweep(db, sweep_id)
+        if not sweep:
+            return {"ok": False, "error": f"sweep {sweep_id} not found"}
+        run_ids = [r.id for r in sweep.runs]
+        priorities = {r.id: r.priority for r in sweep.runs}
+        crud.set_sweep_status(db, sweep_id, RunStatus.running)
+
+        try:
+            dirs = make_sweep_dirs(settings.DATA_ROOT, sweep_id)
+            for rid in run_ids:
+                crud.set_step_status(db, rid, "preprocess", StepStatus.running)
+            processed_path, pre_key, hit, _ = _preprocess(db, _step_cache(), sweep.runs[0].dataset, dirs["processed_dir"], run_ids[0])
+        except Exception as e:
+            for rid in run_ids:
+                append_log(settings.DATA_ROOT, rid, f"Sweep {sweep_id} preprocess failed: {e}\n{traceback.format_exc()}")
+                crud.set_step_status(db, rid, "preprocess", StepStatus.failed, message=str(e))
+                crud.set_run_status(db, rid, RunStatus.failed, error=str(e))
+            crud.set_sweep_status(db, sweep_id, RunStatus.failed, error=str(e))
+            return {"ok": False, "sweep_id": sweep_id, "error": str(e)}
+
+        crud.set_sweep_status(db, sweep_id, RunStatus.running, artifacts={"processed_path": processed_path, "preprocess_key": pre_key})
+        for rid in run_ids:
+            message = _step_message(hit, pre_key, f"shared from sweep {sweep_id}: processed={processed_path}")
+            crud.set_step_status(db, rid, "preprocess", StepStatus.success, message=message)
+            crud.update_run_artifacts_and_metrics(db, rid, artifacts={"processed_path": processed_path, "preprocess_key": pre_key,
+                                                                 "processed_bytes": file_bytes(processed_path)})
+            append_log(settings.DATA_ROOT, rid, f"Step preprocess: shared from sweep {sweep_id} -> {processed_path}")
+
+        chord(pipeline_chain(rid, from_step="features", priority=priorities[rid]) for rid in run_ids)(finalize_sweep.si(sweep_id))
+        return {"ok": True, "sweep_id": sweep_id, "runs": run_ids}
+    finally:
+        db.close()
+
+@celery.task(name="app.workers.tasks.finalize_sweep")
+def finalize_sweep(sweep_id: int):
+    db = _db()
+    try:
+        sweep = crud.get_sweep(db, sweep_id)
+        if not sweep:
+            return {"ok": False, "error": f"sweep {sweep_id} not found"}
+        scored = [r for r in sweep.runs if r.status == RunStatus.success and sweep.metric in (r.metrics or {})]
+        if not scored:
+            crud.set_sweep_status(db, sweep_id, RunStatus.failed, best={}, error=f"no successful run reported '{sweep.metric}'")
+            return {"ok": False, "sweep_id": sweep_id}
+        best = max(scored, key=lambda r: r.metrics[sweep.metric])
+        summary = {
+            "run_id": best.id,
+            "model_type": best.model_type,
+            "params": best.params,
+            "metric": sweep.metric,
+            "value": best.metrics[sweep.metric],
+            "succeeded": len(scored),
+            "total": len(sweep.runs),
+        }
+        crud.set_sweep_status(db, sweep_id, RunStatus.success, best=summary)
+        return {"ok": True, "sweep_id": sweep_id, "best": summary}
+    finally:
+        db.close()
+
+@celery.task(name="app.workers.tasks.gc_artifacts")
+def gc_artifacts():
+    """retention: 오래되었거나 디스크 예산을 넘는 run 아티팩트 정리 후 step cache eviction(beat가 주기 실행)"""
+    db = _db()
+    try:
+        stats = collect_artifacts(db, settings.DATA_ROOT, retention_days=settings.ARTIFACT_RETENTION_DAYS,
+                                  max_bytes=int(settings.ARTIFACT_MAX_GB * 1024 ** 3))
     finally:
         db.close()
+    cache = _step_cache()
+    stats["cache_freed_bytes"] = cache.evict() if cache else 0
+    return {"ok": True, **stats}
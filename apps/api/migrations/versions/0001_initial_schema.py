@@ -0,0 +1,168 @@
+"""initial schema
+
+기존에 create_all로 만든 DB에서도 그대로 실행 가능: 이미 있는 테이블은 빠진 컬럼만 추가한 뒤 빠진 인덱스 생성.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:01:04.845999
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = {
+    "runstatus": ("queued", "running", "success", "failed", "canceled"),
+    "runpriority": ("high", "normal", "low"),
+    "stepstatus": ("pending", "running", "success", "failed", "skipped"),
+}
+
+# 이전 버전 create_all DB에 없을 수 있는 NOT NULL 컬럼: 기존 행을 채울 server_default
+ADOPT_DEFAULTS = {
+    ("runs", "params"): "{}",
+    ("runs", "attempt"): "0",
+    ("runs", "priority"): "normal",
+    ("runs", "promoted"): sa.false(),
+}
+# 테이블 단위 FK로 선언된 컬럼을 기존 테이블에 추가할 때 따로 생성할 FK
+ADOPT_FOREIGN_KEYS = {
+    ("runs", "sweep_id"): "sweeps",
+    ("runs", "parent_run_id"): "runs",
+}
+
+def _enum(name: str):
+    # PostgreSQL 타입은 upgrade() 시작 시 한 번만 생성(테이블마다 CREATE TYPE 하지 않음)
+    return postgresql.ENUM(*ENUMS[name], name=name, create_type=False)
+
+def _create_or_adopt(bind, existing: set, table: str, *elements):
+    """테이블이 없으면 생성, 있으면(create_all로 만든 DB) 빠진 컬럼만 추가"""
+    if table not in existing:
+        op.create_table(table, *elements)
+        return
+    have = {c["name"] for c in sa.inspect(bind).get_columns(table)}
+    sqlite = bind.dialect.name == "sqlite"
+    for col in elements:
+        if not isinstance(col, sa.Column) or col.name in have:
+            continue
+        default = ADOPT_DEFAULTS.get((table, col.name))
+        if not col.nullable and default is None:
+            raise RuntimeError(f"cannot adopt {table}: missing NOT NULL column {col.name} has no default")
+        op.add_column(table, sa.Column(col.name, col.type, nullable=col.nullable, server_default=default))
+        if default is not None and not sqlite:
+            # 기존 행만 채우고 기본값은 새로 만든 스키마와 같게 제거(값은 ORM이 채움)
+            op.alter_column(table, col.name, server_default=None)
+        target = ADOPT_FOREIGN_KEYS.get((table, col.name))
+        if target and not sqlite:  # SQLite는 ALTER로 FK를 추가할 수 없음
+            op.create_foreign_key(f"{table}_{col.name}_fkey", table, target, [col.name], ["id"])
+
+
+def upgrade():
+    bind = op.get_bind()
+    for name, values in ENUMS.items():
+        sa.Enum(*values, name=name).create(bind, checkfirst=True)
+    existing = set(sa.inspect(bind).get_table_names())
+    _create_or_adopt(bind, existing, 'datasets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('source_path', sa.String(length=800), nullable=False),
+    sa.Column('meta', sa.JSON(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_datasets_sha256'), 'datasets', ['sha256'], unique=False, if_not_exists=True)
+    _create_or_adopt(bind, existing, 'dataset_segments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dataset_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('source_path', sa.String(length=800), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['dataset_id'], ['datasets.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_dataset_segments_dataset_id_seq', 'dataset_segments', ['dataset_id', 'seq'], unique=True, if_not_exists=True)
+    _create_or_adopt(bind, existing, 'sweeps',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dataset_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(length=100), nullable=False),
+    sa.Column('status', _enum('runstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('artifacts', sa.JSON(), nullable=False),
+    sa.Column('best', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['dataset_id'], ['datasets.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_or_adopt(bind, existing, 'runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dataset_id', sa.Integer(), nullable=False),
+    sa.Column('model_type', sa.String(length=100), nullable=False),
+    sa.Column('params', sa.JSON(), nullable=False),
+    sa.Column('sweep_id', sa.Integer(), nullable=True),
+    sa.Column('parent_run_id', sa.Integer(), nullable=True),
+    sa.Column('status', _enum('runstatus'), nullable=False),
+    sa.Column('attempt', sa.Integer(), nullable=False),
+    sa.Column('priority', _enum('runpriority'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('artifacts', sa.JSON(), nullable=False),
+    sa.Column('metrics', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('promoted', sa.Boolean(), nullable=False),
+    sa.Column('promoted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['dataset_id'], ['datasets.id'], ),
+    sa.ForeignKeyConstraint(['parent_run_id'], ['runs.id'], ),
+    sa.ForeignKeyConstraint(['sweep_id'], ['sweeps.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_runs_created_at_id', 'runs', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_runs_dataset_id_created_at', 'runs', ['dataset_id', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_runs_promoted'), 'runs', ['promoted'], unique=False, if_not_exists=True)
+    op.create_index('ix_runs_status_created_at', 'runs', ['status', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_runs_sweep_id'), 'runs', ['sweep_id'], unique=False, if_not_exists=True)
+    _create_or_adopt(bind, existing, 'run_steps',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('status', _enum('stepstatus'), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('wall_seconds', sa.Float(), nullable=True),
+    sa.Column('cpu_seconds', sa.Float(), nullable=True),
+    sa.Column('peak_rss_mb', sa.Float(), nullable=True),
+    sa.Column('rows_in', sa.BigInteger(), nullable=True),
+    sa.Column('rows_out', sa.BigInteger(), nullable=True),
+    sa.Column('bytes_read', sa.BigInteger(), nullable=True),
+    sa.Column('bytes_written', sa.BigInteger(), nullable=True),
+    sa.Column('rows_per_sec', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['runs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_run_steps_run_id_name', 'run_steps', ['run_id', 'name'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_run_steps_run_id_name', table_name='run_steps')
+    op.drop_table('run_steps')
+    op.drop_index(op.f('ix_runs_sweep_id'), table_name='runs')
+    op.drop_index('ix_runs_status_created_at', table_name='runs')
+    op.drop_index(op.f('ix_runs_promoted'), table_name='runs')
+    op.drop_index('ix_runs_dataset_id_created_at', table_name='runs')
+    op.drop_index('ix_runs_created_at_id', table_name='runs')
+    op.drop_table('runs')
+    op.drop_table('sweeps')
+    op.drop_index('ix_dataset_segments_dataset_id_seq', table_name='dataset_segments')
+    op.drop_table('dataset_segments')
+    op.drop_index(op.f('ix_datasets_sha256'), table_name='datasets')
+    op.drop_table('datasets')
+    for name, values in ENUMS.items():
+        sa.Enum(*values, name=name).drop(op.get_bind(), checkfirst=True)
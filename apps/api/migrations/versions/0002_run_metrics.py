@@ -0,0 +1,70 @@
+"""run_metrics: 정규화 지표 테이블 + 기존 성공 run의 Run.metrics backfill
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:30:00.000000
+"""
+import math
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BATCH = 5000
+NON_SCORE_METRICS = ("val_samples", "db_round_trips")  # app.crud.NON_SCORE_METRICS(migration은 앱 코드에 의존하지 않음)
+
+
+def _backfill(bind, run_metrics):
+    runs = sa.table(
+        "runs",
+        sa.column("id", sa.Integer), sa.column("dataset_id", sa.Integer), sa.column("model_type", sa.String),
+        sa.column("status", sa.String), sa.column("metrics", sa.JSON), sa.column("finished_at", sa.DateTime),
+        sa.column("created_at", sa.DateTime),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(runs).where(runs.c.status == "success", runs.c.id > last_id).order_by(runs.c.id).limit(BATCH)
+        ).all()
+        if not rows:
+            return
+        values = [
+            {"run_id": r.id, "name": k, "value": float(v), "dataset_id": r.dataset_id, "model_type": r.model_type,
+             "recorded_at": r.finished_at or r.created_at}
+            for r in rows
+            for k, v in (r.metrics or {}).items()
+            if k not in NON_SCORE_METRICS and isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+        ]
+        if values:
+            op.bulk_insert(run_metrics, values)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    run_metrics = op.create_table('run_metrics',
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('dataset_id', sa.Integer(), nullable=False),
+    sa.Column('model_type', sa.String(length=100), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['run_id'], ['runs.id'], ),
+    sa.PrimaryKeyConstraint('run_id', 'name')
+    )
+    op.create_index('ix_run_metrics_name_value', 'run_metrics', ['name', 'value'], unique=False)
+    op.create_index('ix_run_metrics_name_dataset_id_value', 'run_metrics', ['name', 'dataset_id', 'value'], unique=False)
+    op.create_index('ix_run_metrics_name_model_type_value', 'run_metrics', ['name', 'model_type', 'value'], unique=False)
+    op.create_index('ix_run_metrics_name_recorded_at', 'run_metrics', ['name', 'recorded_at'], unique=False)
+    _backfill(op.get_bind(), run_metrics)
+
+
+def downgrade():
+    op.drop_index('ix_run_metrics_name_recorded_at', table_name='run_metrics')
+    op.drop_index('ix_run_metrics_name_model_type_value', table_name='run_metrics')
+    op.drop_index('ix_run_metrics_name_dataset_id_value', table_name='run_metrics')
+    op.drop_index('ix_run_metrics_name_value', table_name='run_metrics')
+    op.drop_table('run_metrics')
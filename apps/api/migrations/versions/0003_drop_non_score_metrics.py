@@ -0,0 +1,26 @@
+"""run_metrics: 순위 대상이 아닌 수치(val_samples 등) 행 삭제
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+NON_SCORE_METRICS = ("val_samples", "db_round_trips")
+
+
+def upgrade():
+    run_metrics = sa.table("run_metrics", sa.column("name", sa.String))
+    op.execute(sa.delete(run_metrics).where(run_metrics.c.name.in_(NON_SCORE_METRICS)))
+
+
+def downgrade():
+    # 삭제한 행은 Run.metrics에 그대로 남아 있고 순위 대상도 아니므로 복원하지 않음
+    pass
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import os
 import time
+import heapq
+import queue
+import sqlite3
 import hashlib
 import threading
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -14,17 +18,104 @@ from watchdog.events import FileSystemEventHandler
 WATCH_DIR = Path(os.environ.get("WATCH_DIR", "/data/inbound"))
 API_BASE = os.environ.get("API_BASE", "http://api:8000/api").rstrip("/")
 STABLE_SECONDS = int(os.environ.get("STABLE_SECONDS", "10"))
-POLL_INTERVAL = float(os.environ.get("POLL_INTERVAL", "1.0"))
 AUTO_RUN = os.environ.get("AUTO_RUN", "true").lower() in ("1", "true", "yes", "y")
+AUTO_RUN_PRIORITY = os.environ.get("AUTO_RUN_PRIORITY", "low")  # 자동 run은 수동 run 뒤로(high/normal/low)
 
 INCLUDE_EXT = set([e.strip().lower() for e in os.environ.get("INCLUDE_EXT", ".csv,.parquet,.json").split(",") if e.strip()])
 IGNORE_SUFFIX = tuple([s.strip() for s in os.environ.get("IGNORE_SUFFIX", ".tmp,.partial").split(",") if s.strip()])
 USE_DONE_FILE = os.environ.get("USE_DONE_FILE", "false").lower() in ("1", "true", "yes", "y")  # if true, process only when *.done exists
+MAX_WORKERS = max(1, int(os.environ.get("MAX_WORKERS", "4")))  # 안정화된 파일을 동시에 해시/등록하는 worker 수(안정화 대기는 스케줄러 스레드가 담당)
+MAX_QUEUE = max(1, int(os.environ.get("MAX_QUEUE", "1000")))   # 안정화된 파일 대기열 크기. 가득 차면 스케줄러가 자리가 날 때까지 대기(backpressure)
+INDEX_PATH = Path(os.environ.get("INDEX_PATH", str(Path(os.environ.get("DATA_ROOT", "/data")) / "watcher" / "index.sqlite")))
 
 print(f"[watcher] WATCH_DIR={WATCH_DIR}")
 print(f"[watcher] API_BASE={API_BASE}")
-print(f"[watcher] STABLE_SECONDS={STABLE_SECONDS} POLL_INTERVAL={POLL_INTERVAL} AUTO_RUN={AUTO_RUN}")
+print(f"[watcher] STABLE_SECONDS={STABLE_SECONDS} AUTO_RUN={AUTO_RUN}")
 print(f"[watcher] INCLUDE_EXT={sorted(INCLUDE_EXT)} IGNORE_SUFFIX={IGNORE_SUFFIX} USE_DONE_FILE={USE_DONE_FILE}")
+print(f"[watcher] MAX_WORKERS={MAX_WORKERS} MAX_QUEUE={MAX_QUEUE} INDEX_PATH={INDEX_PATH}")
+
+_local = threading.local()
+
+
+def http() -> requests.Session:
+    """worker 스레드별 keep-alive 세션(요청마다 새 TCP 연결을 만들지 않음)"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        _local.session = session
+    return session
+
+
+class FileIndex:
+    """
+    처리한 파일의 로컬 영구 인덱스(SQLite): path → (size, mtime_ns, sha256, dataset_id).
+    (size, mtime_ns)가 같으면 해시 없이 건너뛰고, 재시작 시 변경된 파일만 다시 처리.
+    처리 중인 체크섬은 메모리에서 선점해 같은 내용을 동시에 두 번 등록하지 않음
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, dir TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL, dataset_id INTEGER, indexed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_files_dir ON files(dir)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_files_sha256 ON files(sha256)")
+        self._claimed: set[str] = set()
+
+    def seen_file(self, p: Path, size: int, mtime_ns: int) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns FROM files WHERE path = ?", (str(p),)).fetchone()
+        return row == (size, mtime_ns)
+
+    def dir_entries(self, d: str) -> dict[str, tuple[int, int]]:
+        """디렉터리 하나의 인덱스 항목(재조정 스캔용, 디렉터리당 쿼리 1회)"""
+        with self._lock:
+            rows = self._db.execute("SELECT path, size, mtime_ns FROM files WHERE dir = ?", (d,)).fetchall()
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def add_file(self, p: Path, size: int, mtime_ns: int, checksum: str, dataset_id: int | None = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, sha256, dataset_id, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(p), str(p.parent), size, mtime_ns, checksum, dataset_id, time.time()),
+            )
+            self._claimed.discard(checksum)  # 이후에는 인덱스 조회로 중복 판단
+
+    def claim(self, checksum: str) -> bool:
+        """
+        처음 보는 체크섬이면 선점하고 True. 다른 worker가 같은 내용을 처리 중이거나
+        인덱스/API에 이미 있는 체크섬이면 False. 등록에 실패하면 release로 선점 해제
+        """
+        with self._lock:
+            if checksum in self._claimed:
+                return False
+            if self._db.execute("SELECT 1 FROM files WHERE sha256 = ? LIMIT 1", (checksum,)).fetchone():
+                return False
+            self._claimed.add(checksum)
+        try:
+            r = http().get(f"{API_BASE}/datasets/lookup", params={"sha256": checksum}, timeout=30)
+            if r.status_code == 404:
+                return True
+            r.raise_for_status()
+            return False
+        except Exception:
+            self.release(checksum)
+            raise
+
+    def release(self, checksum: str):
+        with self._lock:
+            self._claimed.discard(checksum)
+
+
+index: FileIndex | None = None  # main()에서 생성
 
 
 def sha256_file(p: Path, chunk_size: int = 1024 * 1024) -> str:
@@ -38,40 +129,24 @@ def sha256_file(p: Path, chunk_size: int = 1024 * 1024) -> str:
     return h.hexdigest()
 
 
-def is_target_file(p: Path) -> bool:
-    if not p.is_file():
-        return False
-    name = p.name.lower()
+def is_target_name(name: str) -> bool:
+    name = name.lower()
     if name.endswith(".done"):
         return False
     if name.endswith(IGNORE_SUFFIX):
         return False
-    ext = p.suffix.lower()
+    ext = os.path.splitext(name)[1]
     if INCLUDE_EXT and ext not in INCLUDE_EXT:
         return False
     return True
 
 
-def wait_until_stable(p: Path, stable_seconds: int, poll: float) -> bool:
-    """파일 크기가 stable_seconds 동안 변하지 않으면 True"""
+def file_state(path: str) -> tuple[int, int] | None:
     try:
-        last_size = p.stat().st_size
-    except FileNotFoundError:
-        return False
-
-    stable_for = 0.0
-    while stable_for < stable_seconds:
-        time.sleep(poll)
-        try:
-            size = p.stat().st_size
-        except FileNotFoundError:
-            return False
-        if size == last_size:
-            stable_for += poll
-        else:
-            last_size = size
-            stable_for = 0.0
-    return True
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
 
 
 def done_file_ready(p: Path) -> bool:
@@ -80,24 +155,28 @@ def done_file_ready(p: Path) -> bool:
 
 
 def create_dataset_and_run(p: Path):
-    if USE_DONE_FILE and not done_file_ready(p):
-        print(f"[watcher] waiting for done file: {p.name}")
-        return
-
+    """안정화(또는 done 파일 확인)가 끝난 파일을 해시 → 중복 확인 → 등록"""
     print(f"[watcher] candidate: {p}")
-    if not wait_until_stable(p, STABLE_SECONDS, POLL_INTERVAL):
-        print(f"[watcher] not stable or missing: {p}")
-        return
-
     try:
         st = p.stat()
         size = st.st_size
         mtime = int(st.st_mtime)
+        if index.seen_file(p, size, st.st_mtime_ns):
+            return
         checksum = sha256_file(p)
     except Exception as e:
         print(f"[watcher] metadata error: {p} -> {e}")
         return
 
+    try:
+        if not index.claim(checksum):
+            index.add_file(p, size, st.st_mtime_ns, checksum)
+            print(f"[watcher] duplicate skipped (sha256={checksum[:12]}): {p}")
+            return
+    except Exception as e:
+        print(f"[watcher] API error looking up checksum: {e}")
+        return
+
     dataset_name = p.stem
     payload = {
         "name": dataset_name,
@@ -112,82 +191,229 @@ def create_dataset_and_run(p: Path):
     }
 
     try:
-        r = requests.post(f"{API_BASE}/datasets", json=payload, timeout=30)
+        r = http().post(f"{API_BASE}/datasets", json=payload, timeout=30)
         if r.status_code >= 400:
             print(f"[watcher] create dataset failed: {r.status_code} {r.text}")
+            index.release(checksum)
             return
         ds = r.json()
+        index.add_file(p, size, st.st_mtime_ns, checksum, ds.get("id"))
         print(f"[watcher] dataset created: id={ds.get('id')} path={ds.get('source_path')}")
     except Exception as e:
         print(f"[watcher] API error creating dataset: {e}")
+        index.release(checksum)
         return
 
     if AUTO_RUN:
         try:
-            r2 = requests.post(f"{API_BASE}/runs", json={"dataset_id": ds["id"], "model_type": "baseline_sklearn"}, timeout=30)
+            r2 = http().post(f"{API_BASE}/runs", json={"dataset_id": ds["id"], "model_type": "baseline_sklearn", "priority": AUTO_RUN_PRIORITY}, timeout=30)
             if r2.status_code >= 400:
                 print(f"[watcher] create run failed: {r2.status_code} {r2.text}")
                 return
             run = r2.json()
-            print(f"[watcher] run enqueued: id={run.get('id')} dataset_id={run.get('dataset_id')}")
+            print(f"[watcher] run enqueued: id={run.get('id')} dataset_id={run.get('dataset_id')} coalesced={run.get('coalesced')}")
         except Exception as e:
             print(f"[watcher] API error creating run: {e}")
             return
 
 
+def _work(q: queue.Queue, inflight: set[str], lock: threading.Lock):
+    while True:
+        k = q.get()
+        try:
+            create_dataset_and_run(Path(k))
+        except Exception as e:
+            print(f"[watcher] unexpected error: {k} -> {e}")
+        finally:
+            with lock:
+                inflight.discard(k)
+            q.task_done()
+
+
+class StabilityScheduler:
+    """
+    모든 후보 파일의 안정화 대기를 스레드 하나로 처리.
+    다음 확인 시각 기준 heap에 넣고, 확인 시 (size, mtime_ns)가 직전 값과 같으면(= STABLE_SECONDS 동안 변화 없음)
+    worker 대기열로 넘김. 바뀌었으면 그 시점부터 다시 STABLE_SECONDS 뒤에 확인.
+    done 파일로 완료가 확인된 파일은 안정화 대기 없이 바로 넘김
+    """
+
+    RETRY_SECONDS = 1.0  # 같은 파일이 처리 중일 때 재확인 간격
+
+    def __init__(self, q: queue.Queue, inflight: set[str], lock: threading.Lock):
+        self._queue = q
+        self._inflight = inflight
+        self._cond = threading.Condition(lock)
+        self._heap: list[tuple[float, str]] = []
+        # path → (due, 마지막 (size, mtime_ns)). state가 None이면 완료 확인됨(done 파일)
+        self._files: dict[str, tuple[float, tuple[int, int] | None]] = {}
+        threading.Thread(target=self._run, name="scheduler", daemon=True).start()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._files)
+
+    def submit(self, path: str, ready: bool = False):
+        if ready:
+            state = None
+        else:
+            state = file_state(path)
+            if state is None:
+                return
+        with self._cond:
+            if not ready and path in self._files:
+                return  # 이미 추적 중: 변경 여부는 다음 확인 때 stat 비교로 판단
+            self._schedule(path, time.monotonic() + (0.0 if ready else STABLE_SECONDS), state)
+
+    def _schedule(self, path: str, due: float, state: tuple[int, int] | None):
+        self._files[path] = (due, state)
+        heapq.heappush(self._heap, (due, path))
+        if self._heap[0][1] == path:
+            self._cond.notify()
+
+    def _reschedule(self, path: str, old_due: float, due: float, state: tuple[int, int] | None):
+        # 확인하는 동안 submit으로 갱신된 항목은 그대로 둠
+        if self._files.get(path, (None, None))[0] == old_due:
+            self._schedule(path, due, state)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                due, path = heapq.heappop(self._heap)
+                entry = self._files.get(path)
+                if entry is None or entry[0] != due:
+                    continue  # 다시 예약되면서 남은 이전 heap 항목
+                state = entry[1]
+
+            if state is not None:
+                current = file_state(path)
+                if current is None:
+                    with self._cond:
+                        if self._files.get(path, (None, None))[0] == due:
+                            del self._files[path]
+                    print(f"[watcher] missing: {path}")
+                    continue
+                if current != state:
+                    with self._cond:
+                        self._reschedule(path, due, time.monotonic() + STABLE_SECONDS, current)
+                    continue
+
+            with self._cond:
+                if self._files.get(path, (None, None))[0] != due:
+                    continue
+                if path in self._inflight:
+                    # 같은 파일을 처리 중이면 끝난 뒤 다시 확인
+                    self._reschedule(path, due, time.monotonic() + self.RETRY_SECONDS, state)
+                    continue
+                del self._files[path]
+                self._inflight.add(path)
+            # 대기열이 가득 차면 여기서 기다림(backpressure). 그동안 들어온 이벤트는 submit으로 계속 쌓이고,
+            # 안정화 판단은 마지막 stat 값과의 비교라 확인이 늦어져도 결과는 같음
+            self._queue.put(path)
+
+
 class Handler(FileSystemEventHandler):
     def __init__(self):
         super().__init__()
-        self._lock = threading.Lock()
-        self._pending: dict[str, float] = {}
-        self._worker = threading.Thread(target=self._loop, daemon=True)
-        self._worker.start()
+        lock = threading.Lock()
+        inflight: set[str] = set()
+        # 고정 크기 worker pool + 제한된 대기열(backpressure): 파일이 몰려도 NAS 동시 읽기는 MAX_WORKERS개
+        q: queue.Queue[str] = queue.Queue(maxsize=MAX_QUEUE)
+        for i in range(MAX_WORKERS):
+            threading.Thread(target=_work, args=(q, inflight, lock), name=f"worker-{i}", daemon=True).start()
+        self.scheduler = StabilityScheduler(q, inflight, lock)
 
     def on_created(self, event):
         if event.is_directory:
             return
-        self._mark(event.src_path)
+        self._on_path(event.src_path)
 
     def on_moved(self, event):
         if event.is_directory:
+            # 디렉터리째 옮겨 온 경우 내부 파일 이벤트가 따로 오지 않으므로 스캔
+            threading.Thread(target=reconcile, args=(Path(event.dest_path), self), daemon=True).start()
             return
-        self._mark(event.dest_path)
+        self._on_path(event.dest_path)
 
     def on_modified(self, event):
         if event.is_directory:
             return
-        self._mark(event.src_path)
-
-    def _mark(self, path_str: str):
-        p = Path(path_str)
-        if not is_target_file(p):
+        self._on_path(event.src_path)
+
+    def _on_path(self, path_str: str):
+        path = str(Path(path_str))
+        name = os.path.basename(path)
+        if name.lower().endswith(".done"):
+            # done 파일 생성이 곧 완료 신호(sample.csv.done → sample.csv)
+            data = path[: -len(".done")]
+            if USE_DONE_FILE and is_target_name(os.path.basename(data)):
+                self.scheduler.submit(data, ready=True)
             return
-        with self._lock:
-            self._pending[str(p)] = time.time()
-
-    def _loop(self):
-        debounce = 2.0
-        while True:
-            time.sleep(1.0)
-            now = time.time()
-            to_process = []
-            with self._lock:
-                for k, t0 in list(self._pending.items()):
-                    if now - t0 >= debounce:
-                        to_process.append(k)
-                        del self._pending[k]
-            for k in to_process:
-                threading.Thread(target=create_dataset_and_run, args=(Path(k),), daemon=True).start()
+        if USE_DONE_FILE or not is_target_name(name):
+            return  # done 모드에서는 데이터 파일의 수정 이벤트를 추적하지 않음
+        self.scheduler.submit(path)
+
+    def mark(self, path_str: str):
+        """스캔으로 찾은 파일 등록(done 모드에서는 done 파일이 이미 있는 경우만)"""
+        path = str(Path(path_str))
+        if USE_DONE_FILE:
+            if done_file_ready(Path(path)):
+                self.scheduler.submit(path, ready=True)
+            return
+        self.scheduler.submit(path)
+
+
+def reconcile(root: Path, handler: Handler) -> tuple[int, int]:
+    """
+    재귀 os.scandir로 디렉터리별 인덱스 항목과 (size, mtime_ns)를 비교해
+    새로 생기거나 바뀐 파일만 처리 대상에 추가(해시는 worker에서 변경된 파일만). 숨김 디렉터리(.snapshot 등)는 제외
+    """
+    t0 = time.time()
+    scanned = queued = 0
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        known = index.dir_entries(d)
+        try:
+            it = os.scandir(d)
+        except OSError as e:
+            print(f"[watcher] scan error: {d} -> {e}")
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            stack.append(entry.path)
+                        continue
+                    if not entry.is_file() or not is_target_name(entry.name):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                scanned += 1
+                if known.get(entry.path) != (st.st_size, st.st_mtime_ns):
+                    handler.mark(entry.path)
+                    queued += 1
+    print(f"[watcher] reconcile {root}: scanned={scanned} changed={queued} ({time.time() - t0:.1f}s)")
+    return scanned, queued
 
 
 def main():
+    global index
     WATCH_DIR.mkdir(parents=True, exist_ok=True)
+    index = FileIndex(INDEX_PATH)
 
     event_handler = Handler()
     observer = Observer()
-    observer.schedule(event_handler, str(WATCH_DIR), recursive=False)
+    observer.schedule(event_handler, str(WATCH_DIR), recursive=True)
     observer.start()
 
+    # 감시 시작 후 스캔: 중단 중에 들어온 파일을 놓치지 않고, 스캔 중 도착한 파일은 이벤트로 처리됨
+    reconcile(WATCH_DIR, event_handler)
+
     print("[watcher] started.")
     try:
         while True:
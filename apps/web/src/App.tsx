@@ -1,62 +1,188 @@
-import React, { useEffect, useMemo, useState } from "react";
-import { apiGet, apiPost } from "./api/client";
+import React, { useEffect, useMemo, useRef, useState } from "react";
+import { apiGet, apiPost, subscribeEvents, ServerEvent } from "./api/client";
 import { StatusBadge } from "./components/StatusBadge";
 
 type Dataset = { id: number; name: string; source_path: string; created_at: string; meta: any; };
-type Step = { id: number; name: string; status: string; started_at?: string; finished_at?: string; message?: string; };
+type Step = {
+  id: number; name: string; status: string; started_at?: string; finished_at?: string; message?: string;
+  wall_seconds?: number; cpu_seconds?: number; peak_rss_mb?: number; rows_in?: number; rows_per_sec?: number;
+};
 type Run = { id: number; dataset_id: number; model_type: string; status: string; created_at: string; started_at?: string; finished_at?: string; metrics: any; artifacts: any; error?: string; steps?: Step[]; };
 
+type Page<T> = { items: T[]; next_cursor?: string | null; };
+
+const LOG_LINES = 400;
+const RUN_STATUSES = ["queued", "running", "success", "failed", "canceled"];
+
+function lastLines(text: string, n: number) {
+  const lines = text.split("\n");
+  return lines.length > n ? lines.slice(-n).join("\n") : text;
+}
+
 function fmt(ts?: string) {
   if (!ts) return "-";
   try { return new Date(ts).toLocaleString(); } catch { return ts; }
 }
 
+function fmtProfile(s: Step) {
+  if (s.wall_seconds == null) return "-";
+  const parts = [`${s.wall_seconds.toFixed(2)}s`, `cpu ${(s.cpu_seconds ?? 0).toFixed(2)}s`];
+  if (s.peak_rss_mb != null) parts.push(`${Math.round(s.peak_rss_mb)}MB`);
+  if (s.rows_in) parts.push(`${s.rows_in} rows` + (s.rows_per_sec ? ` (${Math.round(s.rows_per_sec)}/s)` : ""));
+  return parts.join(" · ");
+}
+
 export default function App() {
   const [tab, setTab] = useState<"dashboard"|"datasets"|"runs">("dashboard");
   const [datasets, setDatasets] = useState<Dataset[]>([]);
   const [runs, setRuns] = useState<Run[]>([]);
+  const [datasetsCursor, setDatasetsCursor] = useState<string | null>(null);
+  const [runsCursor, setRunsCursor] = useState<string | null>(null);
+  const [statusFilter, setStatusFilter] = useState("");
+  const statusFilterRef = useRef("");
   const [selectedRun, setSelectedRun] = useState<Run | null>(null);
   const [logTail, setLogTail] = useState<string>("");
+  const [live, setLive] = useState(false);
+  const logOffset = useRef(0);
+  const logRunId = useRef<number | null>(null);
 
   const [dsName, setDsName] = useState("sample");
   const [dsPath, setDsPath] = useState("/data/inbound/sample_timeseries.csv");
 
+  // 처음 선택 시에만 tail을 받고, 이후에는 offset 이후 추가된 로그만 받아 이어 붙임
+  async function loadLogTail(runId: number) {
+    const logs = await apiGet<{tail:string; offset:number}>(`/runs/${runId}/logs?lines=${LOG_LINES}`);
+    setLogTail(logs.tail || "");
+    logOffset.current = logs.offset || 0;
+  }
+
+  async function loadLogDelta(runId: number) {
+    const prevOffset = logOffset.current;
+    const d = await apiGet<{data:string; next_offset:number; size:number}>(`/runs/${runId}/logs/delta?offset=${prevOffset}`);
+    logOffset.current = d.next_offset;
+    if (d.size < prevOffset) { setLogTail(lastLines(d.data.replace(/\n$/, ""), LOG_LINES)); return; }
+    if (d.data) setLogTail(prev => lastLines((prev ? prev + "\n" : "") + d.data.replace(/\n$/, ""), LOG_LINES));
+  }
+
+  async function loadLogs(runId: number) {
+    if (logRunId.current !== runId) {
+      logRunId.current = runId;
+      await loadLogTail(runId);
+    } else {
+      await loadLogDelta(runId);
+    }
+  }
+
+  function runsQuery(cursor?: string | null) {
+    const q = new URLSearchParams({ limit: "50" });
+    if (statusFilterRef.current) q.set("status", statusFilterRef.current);
+    if (cursor) q.set("cursor", cursor);
+    return `/runs?${q}`;
+  }
+
+  // 첫 페이지만 다시 받음(이후 페이지는 "더 보기"로 이어 읽기)
   async function refresh() {
     const [d, r] = await Promise.all([
-      apiGet<Dataset[]>("/datasets"),
-      apiGet<Run[]>("/runs"),
+      apiGet<Page<Dataset>>("/datasets"),
+      apiGet<Page<Run>>(runsQuery()),
     ]);
-    setDatasets(d);
-    setRuns(r);
-    if (selectedRun) {
-      const full = await apiGet<Run>(`/runs/${selectedRun.id}`);
-      setSelectedRun(full);
-      const logs = await apiGet<{tail:string}>(`/runs/${selectedRun.id}/logs?lines=400`);
-      setLogTail(logs.tail || "");
+    setDatasets(d.items);
+    setDatasetsCursor(d.next_cursor || null);
+    setRuns(r.items);
+    setRunsCursor(r.next_cursor || null);
+    setSelectedRun(prev => (prev ? (r.items.find(x => x.id === prev.id) || prev) : prev));
+  }
+
+  async function loadMoreDatasets() {
+    if (!datasetsCursor) return;
+    const d = await apiGet<Page<Dataset>>(`/datasets?cursor=${encodeURIComponent(datasetsCursor)}`);
+    setDatasets(prev => [...prev, ...d.items.filter(x => !prev.some(p => p.id === x.id))]);
+    setDatasetsCursor(d.next_cursor || null);
+  }
+
+  async function loadMoreRuns() {
+    if (!runsCursor) return;
+    const r = await apiGet<Page<Run>>(runsQuery(runsCursor));
+    setRuns(prev => [...prev, ...r.items.filter(x => !prev.some(p => p.id === x.id))]);
+    setRunsCursor(r.next_cursor || null);
+  }
+
+  function changeStatusFilter(status: string) {
+    statusFilterRef.current = status;
+    setStatusFilter(status);
+    refresh().catch(console.error);
+  }
+
+  // 서버 이벤트(delta)로 로컬 상태 갱신
+  function applyEvent(e: ServerEvent) {
+    const d = e.data;
+    if (e.type === "dataset.created") {
+      setDatasets(prev => prev.some(x => x.id === d.id) ? prev : [d, ...prev]);
+    } else if (e.type === "run.created" || e.type === "run.updated") {
+      const f = statusFilterRef.current;
+      setRuns(prev => {
+        if (!prev.some(x => x.id === d.id)) return !f || d.status === f ? [d, ...prev] : prev;
+        if (f && d.status !== f) return prev.filter(x => x.id !== d.id);
+        return prev.map(x => x.id === d.id ? { ...x, ...d } : x);
+      });
+      setSelectedRun(prev => (prev && prev.id === d.id ? { ...prev, ...d } : prev));
+    } else if (e.type === "step.updated") {
+      const patch = (r: Run) => ({ ...r, steps: (r.steps || []).map(st => st.id === d.id ? { ...st, ...d } : st) });
+      setRuns(prev => prev.map(x => x.id === d.run_id ? patch(x) : x));
+      setSelectedRun(prev => (prev && prev.id === d.run_id ? patch(prev) : prev));
     }
   }
 
-  useEffect(() => { refresh().catch(console.error); }, [tab]);
+  useEffect(() => subscribeEvents(
+    applyEvent,
+    () => { setLive(true); refresh().catch(console.error); },
+    () => setLive(false),
+  ), []);
+
+  // 이벤트 스트림이 끊긴 동안에만 전체 목록 폴링
+  useEffect(() => {
+    if (live) return;
+    refresh().catch(console.error);
+    const t = setInterval(() => refresh().catch(()=>{}), 10000);
+    return () => clearInterval(t);
+  }, [live]);
 
-  // polling on dashboard/runs
+  // 선택된 run이 진행 중일 때만 로그 delta 폴링(상태가 바뀌면 한 번 더 받아 마지막 줄까지 반영)
   useEffect(() => {
-    const t = setInterval(() => refresh().catch(()=>{}), 3000);
+    if (!selectedRun) return;
+    loadLogs(selectedRun.id).catch(()=>{});
+    if (!["queued", "running"].includes(selectedRun.status)) return;
+    const t = setInterval(() => loadLogs(selectedRun.id).catch(()=>{}), 3000);
     return () => clearInterval(t);
-  }, [selectedRun?.id, tab]);
+  }, [selectedRun?.id, selectedRun?.status]);
 
   const recentRuns = useMemo(() => runs.slice(0, 6), [runs]);
 
   async function createDataset() {
-    await apiPost("/datasets", { name: dsName, source_path: dsPath, meta: { note: "created from UI" } });
-    await refresh();
+    const ds = await apiPost<Dataset>("/datasets", { name: dsName, source_path: dsPath, meta: { note: "created from UI" } });
+    applyEvent({ type: "dataset.created", data: ds });
     setTab("datasets");
   }
 
   async function createRun(dataset_id: number) {
     const run = await apiPost<Run>("/runs", { dataset_id, model_type: "baseline_sklearn" });
+    applyEvent({ type: "run.created", data: run });
     setTab("runs");
     setSelectedRun(run);
-    await refresh();
+  }
+
+  async function retryRun(runId: number) {
+    // 실패한 스텝부터 재실행(이전 스텝 아티팩트 재사용)
+    const run = await apiPost<Run>(`/runs/${runId}/retry`, {});
+    applyEvent({ type: "run.updated", data: run });
+    setSelectedRun(run);
+  }
+
+  async function cancelRun(runId: number) {
+    // 실행 중인 스텝은 끝까지 수행하고 이후 스텝은 건너뜀
+    const run = await apiPost<Run>(`/runs/${runId}/cancel`, {});
+    applyEvent({ type: "run.updated", data: run });
+    setSelectedRun(run);
   }
 
   return (
@@ -67,6 +193,7 @@ export default function App() {
         <button className="btn" onClick={() => setTab("datasets")} disabled={tab==="datasets"}>Datasets</button>
         <button className="btn" onClick={() => setTab("runs")} disabled={tab==="runs"}>Runs</button>
         <div className="spacer" />
+        <span className="badge" title="서버 이벤트 스트림 연결 상태">{live ? "live" : "polling"}</span>
         <a className="badge" href="/api/docs" target="_blank">Swagger</a>
       </div>
 
@@ -143,6 +270,7 @@ export default function App() {
                 )}
               </tbody>
             </table>
+            {datasetsCursor && <button className="btn" onClick={() => loadMoreDatasets().catch(console.error)}>더 보기</button>}
           </div>
         </>
       )}
@@ -152,6 +280,10 @@ export default function App() {
           <div className="h1">실행 이력</div>
           <div className="grid">
             <div className="card">
+              <select className="input" value={statusFilter} onChange={e => changeStatusFilter(e.target.value)}>
+                <option value="">all status</option>
+                {RUN_STATUSES.map(st => <option key={st} value={st}>{st}</option>)}
+              </select>
               <table className="table">
                 <thead>
                   <tr>
@@ -163,8 +295,6 @@ export default function App() {
                     <tr key={r.id} style={{ cursor:"pointer" }} onClick={async () => {
                       const full = await apiGet<Run>(`/runs/${r.id}`);
                       setSelectedRun(full);
-                      const logs = await apiGet<{tail:string}>(`/runs/${r.id}/logs?lines=400`);
-                      setLogTail(logs.tail || "");
                     }}>
                       <td>#{r.id}</td>
                       <td><StatusBadge status={r.status} /></td>
@@ -177,6 +307,7 @@ export default function App() {
                   )}
                 </tbody>
               </table>
+              {runsCursor && <button className="btn" onClick={() => loadMoreRuns().catch(console.error)}>더 보기</button>}
             </div>
 
             <div className="card">
@@ -188,18 +319,27 @@ export default function App() {
                       <b>Run #{selectedRun.id}</b> <span className="muted">dataset {selectedRun.dataset_id}</span>
                       <div className="muted">created {fmt(selectedRun.created_at)} · started {fmt(selectedRun.started_at)} · finished {fmt(selectedRun.finished_at)}</div>
                     </div>
-                    <StatusBadge status={selectedRun.status} />
+                    <div className="row">
+                      {(selectedRun.status === "failed" || selectedRun.status === "canceled") && (
+                        <button className="btn" onClick={() => retryRun(selectedRun.id).catch(console.error)}>Retry</button>
+                      )}
+                      {(selectedRun.status === "queued" || selectedRun.status === "running") && (
+                        <button className="btn" onClick={() => cancelRun(selectedRun.id).catch(console.error)}>Cancel</button>
+                      )}
+                      <StatusBadge status={selectedRun.status} />
+                    </div>
                   </div>
 
                   <div style={{ marginTop: 12 }}>
                     <div className="muted">Steps</div>
                     <table className="table">
-                      <thead><tr><th>Name</th><th>Status</th><th>Message</th></tr></thead>
+                      <thead><tr><th>Name</th><th>Status</th><th>Profile</th><th>Message</th></tr></thead>
                       <tbody>
                         {(selectedRun.steps || []).map(s => (
                           <tr key={s.id}>
                             <td>{s.name}</td>
                             <td><StatusBadge status={s.status} /></td>
+                            <td className="muted">{fmtProfile(s)}</td>
                             <td className="muted">{s.message || "-"}</td>
                           </tr>
                         ))}
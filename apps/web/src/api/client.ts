@@ -15,3 +15,16 @@ export async function apiPost<T>(path: string, body: any): Promise<T> {
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
+
+export type ServerEvent = { type: string; data: any };
+
+// /events SSE 구독. 연결(재연결 포함)될 때마다 onOpen으로 전체 상태를 한 번 동기화
+export function subscribeEvents(onEvent: (e: ServerEvent) => void, onOpen: () => void, onError: () => void): () => void {
+  const es = new EventSource(`${API_BASE}/events`);
+  es.addEventListener("ready", () => onOpen());
+  es.onmessage = (m) => {
+    try { onEvent(JSON.parse(m.data)); } catch (err) { console.error(err); }
+  };
+  es.onerror = () => onError();
+  return () => es.close();
+}
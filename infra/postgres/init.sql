@@ -1 +1 @@
--- keep minimal; tables created by SQLAlchemy on startup
+-- keep minimal; tables created by alembic migrations (migrate service)
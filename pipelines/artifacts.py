@@ -0,0 +1,102 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+import joblib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+PROCESSED_FILE = "processed.arrow"
+MODEL_FILE = "model.joblib"
+SCHEMA_META_KEY = b"exam_ai.schema"  # 원본을 읽을 때 쓴 compact schema(readers.infer_schema)
+
+def schema_metadata(schema: dict | None) -> dict | None:
+    return {SCHEMA_META_KEY: json.dumps(schema).encode()} if schema else None
+
+def write_processed(df: pd.DataFrame, out_dir: str | Path, schema: dict | None = None) -> str:
+    """
+    전처리 결과를 Arrow IPC(Feather v2, 비압축)로 저장.
+    - 비압축이라 읽는 쪽에서 memory map으로 zero-copy 로딩 가능
+    - schema는 파일 메타데이터로 함께 기록(read_schema)
+    """
+    return write_arrow(df, Path(out_dir) / PROCESSED_FILE, schema)
+
+def write_arrow(df: pd.DataFrame, path: str | Path, schema: dict | None = None) -> str:
+    path = Path(path)
+    path.unlink(missing_ok=True)  # 캐시와 하드링크된 기존 파일을 덮어쓰지 않도록 새 inode로 기록
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **schema_metadata(schema)})
+    feather.write_feather(table, path, compression="uncompressed")
+    return str(path)
+
+def model_compress(spec: str | int | None) -> int | tuple[str, int]:
+    """
+    MODEL_COMPRESSION 설정 → joblib compress 인자.
+    "none"/"0"/"" → 0(비압축, mmap 로딩 가능), "3" → zlib level 3, "zlib:3"/"lzma:1"/"lz4" → (방식, level)
+    """
+    spec = str(spec or "").strip().lower()
+    if spec in ("", "0", "none", "false"):
+        return 0
+    if spec.isdigit():
+        return int(spec)
+    method, _, level = spec.partition(":")
+    return method, int(level or 3)
+
+def dump_model(bundle: dict, path: str | Path, compress: int | tuple[str, int] = 0) -> str:
+    path = Path(path)
+    path.unlink(missing_ok=True)  # 캐시와 하드링크된 기존 파일을 덮어쓰지 않도록 새 inode로 기록
+    joblib.dump(bundle, path, compress=compress)
+    return str(path)
+
+def load_model(path: str | Path, mmap: bool = True) -> dict:
+    """
+    모델 번들 로딩. 비압축 번들(pickle 헤더로 판별)은 mmap_mode="r"로 열어 큰 NumPy 배열을 복사 없이
+    page cache에서 읽음(읽기 전용). 압축 번들은 전체를 해제해 로딩. 배열을 수정할 경우(warm start) mmap=False
+    """
+    with open(path, "rb") as f:
+        uncompressed = f.read(1) == b"\x80"  # pickle PROTO opcode(압축 파일은 zlib/lzma/lz4 매직으로 시작)
+    return joblib.load(path, mmap_mode="r" if mmap and uncompressed else None)
+
+def append_arrow(parent_path: str | Path, df: pd.DataFrame, path: str | Path, schema: dict | None = None) -> str:
+    """
+    parent 파일의 행 뒤에 df를 붙여 path에 새 파일로 기록(append 데이터셋의 delta 반영).
+    parent는 memory map으로 batch를 그대로 옮기므로 pandas 변환·정렬·결측 처리는 df(delta)에만 수행.
+    컬럼 추가/타입 승격은 permissive concat, category는 사전을 합쳐 기록
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")  # parent와 같은 경로여도 읽는 중에 덮어쓰지 않음
+    with pa.memory_map(str(parent_path), "r") as source:
+        parent = pa.ipc.open_file(source).read_all()
+        delta = pa.Table.from_pandas(df, preserve_index=False)
+        table = pa.concat_tables([parent, delta], promote_options="permissive").unify_dictionaries()
+        meta = {**(parent.schema.metadata or {}), **(schema_metadata(schema) or {})}
+        feather.write_feather(table.replace_schema_metadata(meta), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return str(path)
+
+def read_schema(path: str | Path) -> dict | None:
+    """processed 파일 footer에 기록된 compact schema(없으면 None)"""
+    with pa.memory_map(str(path), "r") as source:
+        meta = pa.ipc.open_file(source).schema.metadata or {}
+    raw = meta.get(SCHEMA_META_KEY)
+    return json.loads(raw) if raw else None
+
+def processed_columns(path: str | Path) -> list[str]:
+    """파일 footer의 스키마만 읽어 컬럼 목록 반환(데이터는 읽지 않음)"""
+    with pa.memory_map(str(path), "r") as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+def processed_rows(path: str | Path) -> int:
+    """footer의 batch 메타데이터로 행 수 계산(데이터는 읽지 않음)"""
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+def read_processed(path: str | Path, columns: list[str] | None = None, rows=None) -> pd.DataFrame:
+    """필요한 컬럼(및 rows 위치의 행)만 memory map으로 읽어 DataFrame으로 변환"""
+    table = feather.read_table(str(path), columns=columns, memory_map=True)
+    if rows is not None:
+        table = table.take(rows)
+    return table.to_pandas(split_blocks=True)
@@ -1,29 +1,38 @@
 from __future__ import annotations
-import joblib
-import pandas as pd
+from pathlib import Path
+import numpy as np
+from pipelines.artifacts import load_model, read_processed
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 from sklearn.model_selection import train_test_split
 
-def evaluate(processed_path: str, model_path: str, out_dir: str, run_id: int) -> dict:
+def score(model, X_val, y_val) -> dict:
+    pred = model.predict(X_val)
+    return {
+        "accuracy": float(accuracy_score(y_val, pred)),
+        "f1": float(f1_score(y_val, pred, average="weighted")),
+        "precision": float(precision_score(y_val, pred, average="weighted", zero_division=0)),
+        "recall": float(recall_score(y_val, pred, average="weighted", zero_division=0)),
+        "val_samples": int(len(y_val)),
+    }
+
+def evaluate(processed_path: str, model_path: str, out_dir: str, run_id: int, split_path: str | None = None) -> dict:
     """
     MVP 평가:
-    - train/val split을 동일 방식으로 다시 나누어 val 지표 산출(간단 예시)
+    - train이 저장한 split.npy(val 행 위치)가 있으면 해당 행만 읽어 지표 산출
+    - 없으면(이전 run) train/val split을 동일 방식으로 다시 나눔
     """
-    bundle = joblib.load(model_path)
+    bundle = load_model(model_path)
     model = bundle["model"]
     cols = bundle["columns"]
 
-    df = pd.read_csv(processed_path)
+    if split_path and Path(split_path).exists():
+        val_idx = np.load(split_path, mmap_mode="r")
+        df = read_processed(processed_path, columns=[*cols, "label"], rows=val_idx)
+        return score(model, df[cols], df["label"])
+
+    df = read_processed(processed_path, columns=[*cols, "label"])
     X = df[cols]
     y = df["label"]
 
     _, X_val, _, y_val = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-
-    pred = model.predict(X_val)
-    return {
-        "accuracy": float(accuracy_score(y_val, pred)),
-        "f1": float(f1_score(y_val, pred, average="weighted")),
-        "precision": float(precision_score(y_val, pred, average="weighted", zero_division=0)),
-        "recall": float(recall_score(y_val, pred, average="weighted", zero_division=0)),
-        "val_samples": int(len(y_val)),
-    }
+    return score(model, X_val, y_val)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from pipelines.artifacts import append_arrow, processed_rows, read_processed, write_arrow
+
+FEATURES_FILE = "features.arrow"
+# 창 통계/FFT를 계산할 때 한 번에 펼치는 행 수(행 수 × 창 길이 크기의 임시 배열을 제한)
+FFT_BLOCK_ROWS = 65_536
+
+DEFAULT_SPEC = {
+    "columns": None,      # None이면 sensor_* 숫자 컬럼
+    "windows": [5, 20],   # rolling mean/std/min/max 창 길이(행 수)
+    "lags": [1, 5],
+    "delta": True,        # x[t] - x[t-1]
+    "fft_window": 32,     # FFT 창 길이(0이면 생략)
+    "fft_bands": 4,       # 주파수 대역 수(대역별 에너지)
+}
+
+def resolve_spec(spec: dict | None = None) -> dict:
+    """기본값을 채운 정규화된 spec(캐시 키로도 사용)"""
+    unknown = set(spec or {}) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f"unknown feature options: {', '.join(sorted(unknown))}")
+    out = {**DEFAULT_SPEC, **(spec or {})}
+    out["windows"] = sorted({int(w) for w in out["windows"] if int(w) > 1})
+    out["lags"] = sorted({int(k) for k in out["lags"] if int(k) > 0})
+    out["fft_window"] = int(out["fft_window"] or 0)
+    out["fft_bands"] = max(1, min(int(out["fft_bands"]), out["fft_window"] // 2 + 1)) if out["fft_window"] else 0
+    return out
+
+def _pad(x: np.ndarray, n: int) -> np.ndarray:
+    """앞쪽을 첫 값으로 채워, 첫 행부터 창 통계가 정의되도록 함"""
+    return np.concatenate([np.full(n, x[0] if len(x) else np.nan), x])
+
+def _rolling(x: np.ndarray, w: int) -> dict[str, np.ndarray]:
+    xp = _pad(x, w - 1)
+    view = sliding_window_view(xp, w)
+    # mean/std는 창마다 직접 계산(전역 누적합 차분은 긴 시계열에서 정밀도가 무너지고 append 시작 위치에 따라 값이 달라짐)
+    mean, std = np.empty(len(x)), np.empty(len(x))
+    for start in range(0, len(x), FFT_BLOCK_ROWS):
+        block = view[start:start + FFT_BLOCK_ROWS]
+        mean[start:start + FFT_BLOCK_ROWS] = block.mean(axis=1)
+        std[start:start + FFT_BLOCK_ROWS] = block.std(axis=1)
+    return {f"mean_{w}": mean, f"std_{w}": std, f"min_{w}": view.min(axis=1), f"max_{w}": view.max(axis=1)}
+
+def _lag(x: np.ndarray, k: int) -> np.ndarray:
+    return _pad(x, k)[: len(x)]
+
+def _fft_bands(x: np.ndarray, window: int, bands: int) -> dict[str, np.ndarray]:
+    """직전 window 행의 파워 스펙트럼을 bands개 대역으로 나눈 에너지"""
+    xp = _pad(x, window - 1)
+    view = sliding_window_view(xp, window)
+    n_bins = window // 2 + 1
+    edges = np.linspace(0, n_bins, bands + 1).astype(int)[:-1]
+    out = np.empty((len(x), bands))
+    for start in range(0, len(x), FFT_BLOCK_ROWS):
+        block = view[start:start + FFT_BLOCK_ROWS]
+        power = np.abs(np.fft.rfft(block - block.mean(axis=1, keepdims=True), axis=1)) ** 2
+        out[start:start + FFT_BLOCK_ROWS] = np.add.reduceat(power, edges, axis=1) / window
+    return {f"fft_band_{b}": out[:, b] for b in range(bands)}
+
+def feature_columns(df: pd.DataFrame, spec: dict) -> list[str]:
+    if spec["columns"]:
+        return list(spec["columns"])
+    return [c for c in df.columns if c.startswith("sensor_") and pd.api.types.is_numeric_dtype(df[c])]
+
+def transform(df: pd.DataFrame, spec: dict | None = None) -> pd.DataFrame:
+    """
+    time 순서로 정렬된 df에 시계열 특성을 붙여 반환(원본 컬럼 유지, 특성은 float32).
+    컬럼별로 NumPy 배열 연산만 사용(행 단위 Python 루프 없음)
+    """
+    spec = resolve_spec(spec)
+    features: dict[str, np.ndarray] = {}
+    for c in feature_columns(df, spec):
+        x = df[c].to_numpy(dtype=np.float64)
+        cols: dict[str, np.ndarray] = {}
+        for w in spec["windows"]:
+            cols.update(_rolling(x, w))
+        for k in spec["lags"]:
+            cols[f"lag_{k}"] = _lag(x, k)
+        if spec["delta"]:
+            cols["delta"] = x - _lag(x, 1)
+        if spec["fft_window"]:
+            cols.update(_fft_bands(x, spec["fft_window"], spec["fft_bands"]))
+        for name, values in cols.items():
+            features[f"{c}__{name}"] = values.astype(np.float32, copy=False)
+    return pd.concat([df.reset_index(drop=True), pd.DataFrame(features)], axis=1)
+
+def build_features(processed_path: str, out_dir: str, run_id: int, spec: dict | None = None) -> str:
+    """processed.arrow → features.arrow(원본 컬럼 + 특성)"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    df = read_processed(processed_path)
+    return write_arrow(transform(df, spec), out / FEATURES_FILE)
+
+def context_rows(spec: dict) -> int:
+    """특성 하나를 계산하는 데 필요한 직전 행 수(가장 긴 창/lag)"""
+    return max([1, *spec["windows"], *spec["lags"], spec["fft_window"]])
+
+def build_features_append(parent_path: str, processed_path: str, out_dir: str, run_id: int, spec: dict | None = None) -> str:
+    """
+    append 데이터셋: parent features 이후에 추가된 processed 행만 계산해 붙임.
+    창/lag 계산용으로 직전 context_rows 행을 함께 읽고, 결과에서는 제외
+    """
+    spec = resolve_spec(spec)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    start, n = processed_rows(parent_path), processed_rows(processed_path)
+    lo = max(0, start - context_rows(spec))
+    df = read_processed(processed_path, rows=np.arange(lo, n))
+    delta = transform(df, spec).iloc[start - lo:]
+    return append_arrow(parent_path, delta, out / FEATURES_FILE)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+class ModelSpec(NamedTuple):
+    """
+    model_type 하나에 대한 정의.
+    - factory(params): 추정기 생성(sklearn import는 여기서 지연 로딩)
+    - n_jobs_param: 추정기 자체 병렬 파라미터(없으면 OpenMP/BLAS 스레드 수만 제한)
+    - grow_param: 시간 예산 안에서 warm_start로 점진적으로 늘릴 파라미터(트리 수/반복 수)
+    - time_budget_s: 기본 학습 시간 예산(초)
+    - warm_start: parent 모델에 delta만 이어서 학습하는 방식("trees": 트리 추가, "partial_fit"), 없으면 전체 재학습
+    """
+    factory: Callable[[dict], Any]
+    description: str
+    n_jobs_param: str | None = None
+    grow_param: str | None = None
+    time_budget_s: float = 600.0
+    warm_start: str | None = None
+
+def _random_forest(params: dict):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**{"n_estimators": 200, "random_state": 42, **params})
+
+def _extra_trees(params: dict):
+    from sklearn.ensemble import ExtraTreesClassifier
+    return ExtraTreesClassifier(**{"n_estimators": 300, "random_state": 42, **params})
+
+def _hist_gb(params: dict):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(**{"max_iter": 200, "early_stopping": "auto", "random_state": 42, **params})
+
+def _logreg(params: dict):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), LogisticRegression(**{"max_iter": 1000, **params}))
+
+def _sgd(params: dict):
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), SGDClassifier(**{"loss": "log_loss", "random_state": 42, **params}))
+
+# warm start("trees"): delta마다 초기 트리 수의 10%를 추가하고, 초기 트리 수 × 2개까지만 최근 트리를 유지
+WARM_START_GROW = 0.1
+WARM_START_MAX_FACTOR = 2
+
+MODEL_REGISTRY: dict[str, ModelSpec] = {
+    "baseline_sklearn": ModelSpec(_random_forest, "RandomForest (기존 baseline)", n_jobs_param="n_jobs", grow_param="n_estimators", warm_start="trees"),
+    "random_forest": ModelSpec(_random_forest, "RandomForest", n_jobs_param="n_jobs", grow_param="n_estimators", warm_start="trees"),
+    "extra_trees": ModelSpec(_extra_trees, "ExtraTrees", n_jobs_param="n_jobs", grow_param="n_estimators", warm_start="trees"),
+    "hist_gb": ModelSpec(_hist_gb, "HistGradientBoosting (히스토그램 기반, OpenMP)", grow_param="max_iter"),
+    "logreg": ModelSpec(_logreg, "StandardScaler + LogisticRegression", time_budget_s=120.0),
+    "sgd": ModelSpec(_sgd, "StandardScaler + SGDClassifier(log_loss)", time_budget_s=120.0, warm_start="partial_fit"),
+}
+
+def get_spec(model_type: str) -> ModelSpec:
+    if model_type not in MODEL_REGISTRY:
+        raise ValueError(f"unknown model_type: {model_type} (available: {', '.join(MODEL_REGISTRY)})")
+    return MODEL_REGISTRY[model_type]
+
+def _read_int(p: Path) -> int | None:
+    try:
+        return int(p.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+def available_cpus() -> int:
+    """CPU affinity와 cgroup(v2 cpu.max / v1 cfs quota) 제한 중 작은 값"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    quota = None
+    try:
+        q, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if q != "max":
+            quota = int(q) / int(period)
+    except (OSError, ValueError):
+        q = _read_int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"))
+        period = _read_int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us"))
+        if q and q > 0 and period:
+            quota = q / period
+    if quota:
+        cpus = min(cpus, max(1, int(quota)))
+    return max(1, cpus)
+
+def _final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, "steps") else model
+
+def fit_model(model_type: str, params: dict | None, X, y, n_jobs: int = 0, time_budget_s: float = 0) -> tuple[Any, dict]:
+    """
+    registry에서 추정기를 만들어 학습.
+    - n_jobs(0이면 컨테이너에 할당된 전체 코어)를 추정기 및 OpenMP/BLAS 스레드 풀에 적용
+    - grow_param이 있으면 warm_start로 나눠 학습하며 time_budget_s를 넘기기 전에 멈춤
+    """
+    from threadpoolctl import threadpool_limits
+
+    spec = get_spec(model_type)
+    n_jobs = n_jobs or available_cpus()
+    budget = time_budget_s or spec.time_budget_s
+    model = spec.factory(dict(params or {}))
+    est = _final_estimator(model)
+    if spec.n_jobs_param:
+        est.set_params(**{spec.n_jobs_param: n_jobs})
+
+    started = time.perf_counter()
+    stopped_early = False
+    with threadpool_limits(limits=n_jobs):
+        if not spec.grow_param:
+            model.fit(X, y)
+        else:
+            target = int(est.get_params()[spec.grow_param])
+            step = max(1, target // 10)
+            if spec.n_jobs_param:
+                step = max(n_jobs, step - step % n_jobs)  # 트리 수를 코어 수 배수로 늘려 유휴 코어 방지
+            est.set_params(warm_start=True)
+            current = 0
+            while current < target:
+                current = min(target, current + step)
+                est.set_params(**{spec.grow_param: current})
+                model.fit(X, y)
+                elapsed = time.perf_counter() - started
+                if getattr(est, "n_iter_", current) < current:
+                    break  # early stopping
+                per_step = elapsed / current * step
+                if current < target and elapsed + per_step > budget:
+                    stopped_early = True
+                    break
+            est.set_params(warm_start=False)
+
+    info = {
+        "model_type": model_type,
+        "n_jobs": n_jobs,
+        "time_budget_s": budget,
+        "fit_seconds": round(time.perf_counter() - started, 3),
+        "stopped_by_budget": stopped_early,
+    }
+    if spec.grow_param:
+        info[spec.grow_param] = int(est.get_params()[spec.grow_param])
+    return model, info
+
+def warm_fit_model(model_type: str, model, params: dict | None, X, y, n_jobs: int = 0) -> tuple[Any, dict] | None:
+    """
+    parent 모델에 delta(X, y)만 이어서 학습.
+    - trees: warm_start로 트리를 추가(새 트리는 delta로 학습), 오래된 트리부터 제외해 크기 유지
+    - partial_fit: 전처리 단계(StandardScaler 등)와 분류기를 partial_fit
+    지원하지 않는 모델이거나 delta의 클래스 구성이 parent와 다르면 None(호출 측에서 전체 재학습)
+    """
+    import numpy as np
+    from threadpoolctl import threadpool_limits
+
+    spec = get_spec(model_type)
+    est = _final_estimator(model)
+    classes = getattr(est, "classes_", None)
+    if not spec.warm_start or classes is None:
+        return None
+    seen = set(np.unique(y).tolist())
+    # 트리는 fit마다 classes_를 다시 정하므로 클래스 구성이 같아야 함(partial_fit은 부분집합이면 됨)
+    if not seen <= set(classes.tolist()) or (spec.warm_start == "trees" and seen != set(classes.tolist())):
+        return None
+
+    n_jobs = n_jobs or available_cpus()
+    started = time.perf_counter()
+    with threadpool_limits(limits=n_jobs):
+        if spec.warm_start == "trees":
+            base = int(spec.factory(dict(params or {})).get_params()[spec.grow_param])
+            est.set_params(warm_start=True, **{spec.grow_param: len(est.estimators_) + max(1, int(base * WARM_START_GROW))})
+            if spec.n_jobs_param:
+                est.set_params(**{spec.n_jobs_param: n_jobs})
+            est.fit(X, y)
+            est.set_params(warm_start=False)
+            keep = base * WARM_START_MAX_FACTOR
+            if len(est.estimators_) > keep:
+                est.estimators_ = est.estimators_[-keep:]
+                est.set_params(**{spec.grow_param: keep})
+        else:
+            Xt = X
+            for _, step in getattr(model, "steps", [])[:-1]:
+                step.partial_fit(Xt)
+                Xt = step.transform(Xt)
+            est.partial_fit(Xt, y, classes=classes)
+
+    info = {
+        "model_type": model_type,
+        "n_jobs": n_jobs,
+        "fit_seconds": round(time.perf_counter() - started, 3),
+        "warm_start": spec.warm_start,
+    }
+    if spec.grow_param:
+        info[spec.grow_param] = int(est.get_params()[spec.grow_param])
+    return model, info
@@ -1,24 +1,81 @@
 from __future__ import annotations
 from pathlib import Path
 import pandas as pd
+from pipelines.artifacts import PROCESSED_FILE, append_arrow, processed_rows, read_processed, read_schema, write_processed
+from pipelines.readers import apply_schema, detect_format, infer_schema, read_frame, source_bytes
+from pipelines.streaming import WORKING_SET_FACTOR, preprocess_streaming
 
-def preprocess(source_path: str, out_dir: str, run_id: int) -> str:
+def preprocess(
+    source_path: str,
+    out_dir: str,
+    run_id: int,
+    mode: str = "auto",
+    memory_budget_mb: int = 1024,
+    columns: list[str] | None = None,
+    schema: dict | None = None,
+) -> str:
     """
     MVP 전처리:
-    - CSV 읽기
+    - 입력 읽기(CSV / Parquet / JSON Lines, 확장자로 판단). columns가 있으면 해당 컬럼만
+    - compact schema 적용(float32 센서, 최소 정수 라벨, category 문자열). schema가 없으면 추론
     - 결측치 처리(간단히 forward fill)
     - time 정렬
-    - processed.csv 저장
+    - processed.arrow(Arrow IPC) 저장, 사용한 schema는 파일 메타데이터로 기록(artifacts.read_schema)
+
+    mode:
+    - memory: 전체 파일을 한 번에 로딩
+    - streaming: memory_budget_mb 안에서 청크 단위 처리(pipelines/streaming.py)
+    - auto: 파일 크기로 예산 초과가 예상되면 streaming
     """
     src = Path(source_path)
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
+    fmt = detect_format(src)
+
+    if mode == "auto":
+        expected = source_bytes(src, fmt) * WORKING_SET_FACTOR
+        mode = "streaming" if expected > memory_budget_mb * 1024 * 1024 else "memory"
+    if mode == "streaming":
+        return preprocess_streaming(str(src), str(out), memory_budget_mb=memory_budget_mb, fmt=fmt, columns=columns, schema=schema)
+    if mode != "memory":
+        raise ValueError(f"unknown preprocess mode: {mode}")
 
-    df = pd.read_csv(src)
+    df = read_frame(src, fmt, columns, schema)
+    if schema is None:
+        schema = infer_schema(df, fmt)
+        df = apply_schema(df, schema)
     if "time" in df.columns:
         df = df.sort_values("time")
     df = df.ffill().bfill()
 
-    processed_path = out / "processed.csv"
-    df.to_csv(processed_path, index=False)
-    return str(processed_path)
+    return write_processed(df, out, schema=schema)
+
+def preprocess_append(parent_path: str, source_path: str, out_dir: str, run_id: int, columns: list[str] | None = None) -> str:
+    """
+    append 세그먼트(delta) 전처리: 새 파일만 읽어 정제한 뒤 parent processed 뒤에 붙임.
+    - schema: parent schema에 delta 추론 결과를 합침(category 값 추가, 타입 승격)
+    - ffill: parent 마지막 행(이전 전처리의 forward-fill 상태)으로 delta의 선행 결측을 채움
+    - 세그먼트는 시간 순서로 추가된다고 가정. delta가 parent 마지막 time보다 앞서면 ValueError
+    delta는 보통 작으므로 항상 memory 모드로 처리
+    """
+    src = Path(source_path)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    fmt = detect_format(src)
+
+    n = processed_rows(parent_path)
+    last = read_processed(parent_path, rows=[n - 1]).iloc[0] if n else None
+    df = read_frame(src, fmt, columns)
+    schema = infer_schema(df, fmt, read_schema(parent_path))
+    if last is not None:
+        df = df.reindex(columns=list(dict.fromkeys([*last.index, *df.columns])))
+    if "time" in df.columns:
+        df = df.sort_values("time")
+        if last is not None and len(df) and pd.notna(last.get("time")) and df["time"].iloc[0] < last["time"]:
+            raise ValueError(f"appended segment starts before the end of the dataset (time {df['time'].iloc[0]} < {last['time']})")
+    df = df.ffill()
+    if last is not None:
+        df = df.fillna(value={c: v for c, v in last.items() if pd.notna(v)})
+    df = apply_schema(df.bfill(), schema)
+
+    return append_arrow(parent_path, df, out / PROCESSED_FILE, schema=schema)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+# 확장자 → 입력 포맷(.json은 JSON Lines 또는 JSON 배열)
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "json",
+}
+# 고유값이 이 개수 이하인 문자열 컬럼은 category로 저장
+MAX_CATEGORIES = 1_000
+# 다운캐스팅하지 않는 컬럼(정렬 키 정밀도 유지)
+KEEP_DTYPE_COLUMNS = ("time",)
+
+def detect_format(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"unsupported input format: {suffix or path}")
+    fmt = FORMATS[suffix]
+    if fmt == "json":
+        # 첫 글자가 '['면 JSON 배열, 아니면 JSON Lines
+        with Path(path).open("rb") as f:
+            head = f.read(4096).lstrip()
+        fmt = "json" if head.startswith(b"[") else "jsonl"
+    return fmt
+
+def source_bytes(path: str | Path, fmt: str) -> int:
+    """메모리 예산 판단용 데이터 크기. Parquet은 압축 해제 기준(row group 메타데이터)"""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        meta = pq.ParquetFile(path).metadata
+        return sum(meta.row_group(i).total_byte_size for i in range(meta.num_row_groups))
+    return Path(path).stat().st_size
+
+# ---------------------------------------------------------------------------
+# compact schema
+# {"format": "csv", "columns": {"sensor_1": {"dtype": "float32"}, "site": {"dtype": "category", "categories": [...]}}}
+# ---------------------------------------------------------------------------
+
+def to_dtype(spec: dict):
+    if spec["dtype"] == "category":
+        return pd.CategoricalDtype(spec["categories"])
+    return np.dtype(spec["dtype"])
+
+def schema_dtypes(schema: dict) -> dict:
+    return {c: to_dtype(spec) for c, spec in schema["columns"].items()}
+
+def _compact(name: str, s: pd.Series) -> dict:
+    """컬럼 하나의 compact dtype: float32 센서, 값 범위에 맞춘 최소 정수, 저카디널리티 문자열은 category"""
+    dt = s.dtype
+    if name in KEEP_DTYPE_COLUMNS or dt.kind in "bmM":
+        return {"dtype": str(dt)}
+    if dt.kind == "f":
+        return {"dtype": "float32"}
+    if dt.kind in "iu":
+        if not len(s):
+            return {"dtype": str(dt)}
+        return {"dtype": str(pd.to_numeric(pd.Series([s.min(), s.max()]), downcast="integer").dtype)}
+    if isinstance(dt, pd.CategoricalDtype):
+        values = [v for v in dt.categories.tolist() if isinstance(v, str)]
+    else:
+        values = s.dropna().unique().tolist()
+    if len(values) <= MAX_CATEGORIES and all(isinstance(v, str) for v in values):
+        return {"dtype": "category", "categories": sorted(values)}
+    return {"dtype": "object"}
+
+def _merge_spec(a: dict, b: dict) -> dict:
+    if a == b:
+        return a
+    if a["dtype"] == "category" and b["dtype"] == "category":
+        values = sorted(set(a["categories"]) | set(b["categories"]))
+        return {"dtype": "category", "categories": values} if len(values) <= MAX_CATEGORIES else {"dtype": "object"}
+    if "category" in (a["dtype"], b["dtype"]):
+        return {"dtype": "object"}
+    da, db = np.dtype(a["dtype"]), np.dtype(b["dtype"])
+    if da.kind in "biuf" and db.kind in "biuf":
+        return {"dtype": str(np.promote_types(da, db))}
+    return {"dtype": "object"}
+
+def infer_schema(df: pd.DataFrame, fmt: str, prev: dict | None = None) -> dict:
+    """df(또는 청크)의 compact schema. prev가 있으면 청크 간 타입을 승격해 합침"""
+    columns = {c: _compact(c, df[c]) for c in df.columns}
+    if prev:
+        merged = dict(prev["columns"])
+        for c, spec in columns.items():
+            merged[c] = _merge_spec(merged[c], spec) if c in merged else spec
+        columns = merged
+    return {"format": fmt, "columns": columns}
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    dtypes = {c: dt for c, dt in schema_dtypes(schema).items() if c in df.columns and df[c].dtype != dt}
+    return df.astype(dtypes) if dtypes else df
+
+def _read_dtypes(schema: dict | None, columns: list[str] | None) -> dict | None:
+    """파서에 넘길 dtype(파싱 단계에서 바로 compact 타입으로 읽음)"""
+    if not schema:
+        return None
+    return {c: dt for c, dt in schema_dtypes(schema).items() if columns is None or c in columns}
+
+# ---------------------------------------------------------------------------
+# readers
+# ---------------------------------------------------------------------------
+
+def read_frame(path: str | Path, fmt: str, columns: list[str] | None = None, schema: dict | None = None) -> pd.DataFrame:
+    """파일 전체를 한 번에 읽음(columns가 있으면 해당 컬럼만)"""
+    if fmt == "csv":
+        df = pd.read_csv(path, usecols=columns, dtype=_read_dtypes(schema, columns))
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        df = pq.read_table(path, columns=columns).to_pandas(split_blocks=True, self_destruct=True)
+    elif fmt == "jsonl":
+        df = pd.read_json(path, lines=True)
+    elif fmt == "json":
+        df = pd.read_json(path)
+    else:
+        raise ValueError(f"unsupported input format: {fmt}")
+    if columns is not None and fmt in ("jsonl", "json"):
+        df = df[[c for c in columns if c in df.columns]]
+    return apply_schema(df, schema) if schema else df
+
+def iter_frames(path: str | Path, fmt: str, chunk_rows: int, columns: list[str] | None = None, schema: dict | None = None) -> Iterator[pd.DataFrame]:
+    """chunk_rows 행씩 읽음. Parquet은 row group 단위 batch, JSON Lines는 줄 단위 스트리밍"""
+    if fmt == "csv":
+        chunks = pd.read_csv(path, chunksize=chunk_rows, usecols=columns, dtype=_read_dtypes(schema, columns))
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        chunks = (b.to_pandas() for b in pf.iter_batches(batch_size=chunk_rows, columns=columns))
+    elif fmt == "jsonl":
+        chunks = pd.read_json(path, lines=True, chunksize=chunk_rows)
+    elif fmt == "json":
+        # JSON 배열은 스트리밍 파싱이 불가 → 한 번 읽어 청크로 나눔
+        df = read_frame(path, fmt, columns)
+        chunks = (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
+    else:
+        raise ValueError(f"unsupported input format: {fmt}")
+    for chunk in chunks:
+        if columns is not None and fmt in ("jsonl", "json"):
+            chunk = chunk[[c for c in columns if c in chunk.columns]]
+        yield apply_schema(chunk, schema) if schema else chunk
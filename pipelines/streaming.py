@@ -0,0 +1,232 @@
+from __future__ import annotations
+import tempfile
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pipelines.artifacts import PROCESSED_FILE, schema_metadata
+from pipelines.readers import infer_schema, iter_frames, schema_dtypes
+
+# 청크 하나를 처리할 때 원본 크기 대비 필요한 작업 메모리 배수(읽기 + 정렬 + ffill + Arrow 변환)
+WORKING_SET_FACTOR = 4
+MIN_CHUNK_ROWS = 1_000
+SAMPLE_ROWS = 1_000
+
+def estimate_chunk_rows(source_path: str | Path, memory_budget_mb: int, fmt: str = "csv", columns: list[str] | None = None) -> int:
+    """샘플 행의 메모리 사용량으로 예산 안에 들어가는 청크 행 수를 추정"""
+    sample = next(iter_frames(source_path, fmt, SAMPLE_ROWS, columns), pd.DataFrame())
+    bytes_per_row = max(float(sample.memory_usage(deep=True, index=False).sum()) / max(len(sample), 1), 1.0)
+    budget = memory_budget_mb * 1024 * 1024
+    return max(MIN_CHUNK_ROWS, int(budget / (bytes_per_row * WORKING_SET_FACTOR)))
+
+def _arrow_schema(dtypes: dict, schema: dict | None = None) -> pa.Schema:
+    fields = []
+    for name, dt in dtypes.items():
+        if isinstance(dt, pd.CategoricalDtype):
+            typ = pa.dictionary(pa.int32(), pa.string())
+        elif dt.kind == "O":
+            typ = pa.string()
+        else:
+            typ = pa.from_numpy_dtype(dt)
+        fields.append(pa.field(name, typ))
+    return pa.schema(fields, metadata=schema_metadata(schema))
+
+class _Scan:
+    """1차 스캔 결과: compact schema, time 정렬 여부, (time 순서 기준) 컬럼별 첫 유효값"""
+
+    def __init__(self, fmt: str, schema: dict | None = None):
+        self.fmt = fmt
+        self.schema = schema
+        self._fixed = schema is not None  # 저장된 schema 재사용 시 타입 추론 생략
+        self.time_sorted = True
+        self.rows = 0
+        self._timed: dict[str, tuple[object, object]] = {}  # 컬럼 -> (time, 값)
+        self._untimed: dict[str, object] = {}  # time이 없거나 결측인 행의 파일 순서 첫 유효값
+        self._last_time = None
+
+    @property
+    def dtypes(self) -> dict:
+        return schema_dtypes(self.schema) if self.schema else {}
+
+    def update(self, chunk: pd.DataFrame):
+        if not self._fixed:
+            self.schema = infer_schema(chunk, self.fmt, self.schema)
+        self.rows += len(chunk)
+        if "time" not in chunk.columns:
+            self._update_untimed(chunk)
+            return
+
+        t = chunk["time"]
+        if self.time_sorted and len(t):
+            if not t.is_monotonic_increasing or (self._last_time is not None and t.iloc[0] < self._last_time):
+                self.time_sorted = False
+            self._last_time = t.iloc[-1]
+
+        # ffill().bfill() 이후 선행 결측은 "정렬 후 첫 유효값"으로 채워지므로,
+        # 컬럼별로 유효값 중 time이 가장 작은 값을 기억해 둔다(동일 time이면 먼저 나온 값).
+        has_time = t.notna()
+        for c in chunk.columns:
+            valid = chunk[c].notna() & has_time
+            if not valid.any():
+                continue
+            tv = t[valid]
+            pos = int(np.argmin(tv.to_numpy()))
+            tmin = tv.iloc[pos]
+            if c not in self._timed or tmin < self._timed[c][0]:
+                self._timed[c] = (tmin, chunk[c][valid].iloc[pos])
+        # time 결측 행은 정렬 시 맨 뒤로 가므로 timed 값이 없을 때만 사용
+        self._update_untimed(chunk[~has_time])
+
+    def _update_untimed(self, chunk: pd.DataFrame):
+        for c in chunk.columns:
+            if c not in self._untimed:
+                idx = chunk[c].first_valid_index()
+                if idx is not None:
+                    self._untimed[c] = chunk[c].loc[idx]
+
+    @property
+    def first_valid(self) -> dict[str, object]:
+        return {**self._untimed, **{c: v for c, (_, v) in self._timed.items()}}
+
+class _FillWriter:
+    """청크 경계를 넘어 forward-fill 상태를 이어가며 Arrow IPC 파일로 기록"""
+
+    def __init__(self, path: Path, scan: _Scan):
+        self.dtypes = scan.dtypes
+        self.state = dict(scan.first_valid)  # 첫 유효값으로 시작 → 선행 결측 bfill과 동일
+        self.schema = _arrow_schema(self.dtypes, scan.schema)
+        self._sink = pa.OSFile(str(path), "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, chunk: pd.DataFrame):
+        if not len(chunk):
+            return
+        filled = chunk.ffill()
+        if self.state:
+            filled = filled.fillna(value={k: v for k, v in self.state.items() if k in filled.columns})
+        last = filled.iloc[-1]
+        for c, v in last.items():
+            if pd.notna(v):
+                self.state[c] = v
+        self._writer.write_batch(_to_batch(filled, self.dtypes, self.schema))
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+def _to_batch(df: pd.DataFrame, dtypes: dict, schema: pa.Schema) -> pa.RecordBatch:
+    df = df.reindex(columns=list(dtypes))  # JSON Lines 청크는 컬럼 순서/누락이 다를 수 있음
+    df = df.astype({c: dt for c, dt in dtypes.items() if df[c].dtype != dt})
+    return pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+def _write_runs(chunks: Iterator[pd.DataFrame], scan: _Scan, spill_dir: Path) -> tuple[list[Path], Path]:
+    """청크 단위로 time 정렬(stable)해 run 파일로 내보냄. time 결측 행은 별도 tail 파일로 분리"""
+    dtypes = scan.dtypes
+    schema = _arrow_schema(dtypes)
+    runs: list[Path] = []
+    tail_path = spill_dir / "tail.arrow"
+    with pa.OSFile(str(tail_path), "wb") as tail_sink, pa.ipc.new_file(tail_sink, schema) as tail:
+        for i, chunk in enumerate(chunks):
+            missing = chunk["time"].isna()
+            if missing.any():
+                tail.write_batch(_to_batch(chunk[missing], dtypes, schema))
+                chunk = chunk[~missing]
+            chunk = chunk.sort_values("time", kind="mergesort")
+            run_path = spill_dir / f"run_{i:05d}.arrow"
+            with pa.OSFile(str(run_path), "wb") as sink, pa.ipc.new_file(sink, schema) as w:
+                w.write_batch(_to_batch(chunk, dtypes, schema))
+            runs.append(run_path)
+    return runs, tail_path
+
+def _open_table(path: Path) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+def _read_block(table: pa.Table, offset: int, block_rows: int) -> pd.DataFrame:
+    """offset부터 block_rows만큼 읽되, 마지막 time과 같은 값은 블록에 모두 포함(동일 time의 순서 보존)"""
+    block = table.slice(offset, block_rows).to_pandas()
+    end = offset + len(block)
+    while len(block) and end < table.num_rows:
+        last = block["time"].iloc[-1]
+        more = table.slice(end, block_rows).to_pandas()
+        cut = int(np.searchsorted(more["time"].to_numpy(), last, side="right"))
+        if cut == 0:
+            break
+        block = pd.concat([block, more.iloc[:cut]], ignore_index=True)
+        end += cut
+        if cut < len(more):
+            break
+    return block
+
+def _merge_runs(runs: list[Path], block_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    정렬된 run들을 블록 단위로 k-way merge.
+    - 각 run에서 block_rows씩만 메모리에 올림(run 파일은 memory map)
+    - 모든 버퍼의 마지막 time 중 최솟값(watermark) 이하인 행만 모아 정렬·방출
+    """
+    tables = [_open_table(p) for p in runs]
+    offsets = [0] * len(tables)
+    buffers: list[pd.DataFrame | None] = [None] * len(tables)
+
+    while True:
+        for i, table in enumerate(tables):
+            if (buffers[i] is None or not len(buffers[i])) and offsets[i] < table.num_rows:
+                buffers[i] = _read_block(table, offsets[i], block_rows)
+                offsets[i] += len(buffers[i])
+        active = [i for i, b in enumerate(buffers) if b is not None and len(b)]
+        if not active:
+            return
+        watermark = min(buffers[i]["time"].iloc[-1] for i in active)
+        heads = []
+        for i in active:
+            cut = int(np.searchsorted(buffers[i]["time"].to_numpy(), watermark, side="right"))
+            heads.append(buffers[i].iloc[:cut])
+            buffers[i] = buffers[i].iloc[cut:]
+        merged = pd.concat(heads, ignore_index=True).sort_values("time", kind="mergesort")
+        yield merged.reset_index(drop=True)
+
+def preprocess_streaming(
+    source_path: str,
+    out_dir: str,
+    memory_budget_mb: int = 1024,
+    fmt: str = "csv",
+    columns: list[str] | None = None,
+    schema: dict | None = None,
+) -> str:
+    """
+    대용량 입력 전처리(out-of-core, CSV/Parquet/JSON Lines):
+    - memory_budget_mb 안에서 청크 단위로 읽음
+    - 1차 스캔에서 compact schema 추론(schema가 주어지면 파싱 단계부터 해당 타입으로 읽음)
+    - time이 이미 정렬돼 있으면 단일 패스, 아니면 external merge sort
+    - ffill 상태를 청크 경계 너머로 전달, 선행 결측은 첫 유효값으로 bfill
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    processed_path = out / PROCESSED_FILE
+    processed_path.unlink(missing_ok=True)
+    chunk_rows = estimate_chunk_rows(source_path, memory_budget_mb, fmt, columns)
+
+    def chunks():
+        return iter_frames(source_path, fmt, chunk_rows, columns, schema)
+
+    scan = _Scan(fmt, schema)
+    for chunk in chunks():
+        scan.update(chunk)
+
+    writer = _FillWriter(processed_path, scan)
+    try:
+        if "time" not in scan.dtypes or scan.time_sorted:
+            for chunk in chunks():
+                writer.write(chunk)
+        else:
+            with tempfile.TemporaryDirectory(prefix="spill_", dir=out) as tmp:
+                runs, tail_path = _write_runs(chunks(), scan, Path(tmp))
+                block_rows = max(MIN_CHUNK_ROWS, chunk_rows // (len(runs) + 1))
+                for block in _merge_runs(runs, block_rows):
+                    writer.write(block)
+                tail = _open_table(tail_path)
+                for offset in range(0, tail.num_rows, block_rows):
+                    writer.write(tail.slice(offset, block_rows).to_pandas())
+    finally:
+        writer.close()
+    return str(processed_path)
@@ -1,32 +1,101 @@
 from __future__ import annotations
 from pathlib import Path
-import joblib
+from typing import Any, NamedTuple
+import numpy as np
 import pandas as pd
+from pipelines.artifacts import MODEL_FILE, dump_model, load_model, processed_columns, processed_rows, read_processed
+from pipelines.models import fit_model, warm_fit_model
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
 
-def train(processed_path: str, out_dir: str, run_id: int, model_type: str = "baseline_sklearn") -> str:
+SPLIT_FILE = "split.npy"
+
+class TrainResult(NamedTuple):
+    model_path: str
+    split_path: str
+    model: Any
+    fit_info: dict
+    X_val: pd.DataFrame
+    y_val: pd.Series
+
+def split_indices(y: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """train/val 행 위치(정렬됨). evaluate는 저장된 val 위치를 그대로 재사용"""
+    train_idx, val_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+    return np.sort(train_idx), np.sort(val_idx)
+
+def _warm_parent(model_path: str | None, model_type: str, columns: list[str], features: dict | None, n_rows: int) -> dict | None:
+    """warm start 가능한 parent 번들(같은 model_type/컬럼/특성 spec, 새 행이 있음) 또는 None"""
+    if not model_path or not Path(model_path).exists():
+        return None
+    bundle = load_model(model_path, mmap=False)  # 이어서 학습하며 모델 배열을 수정
+    if bundle.get("model_type") != model_type or bundle.get("features") != features:
+        return None
+    if bundle["columns"] != [c for c in columns if c != "label"]:
+        return None
+    rows = bundle.get("rows") or 0
+    return bundle if 0 < rows < n_rows else None
+
+def fit(
+    processed_path: str,
+    out_dir: str,
+    run_id: int,
+    model_type: str = "baseline_sklearn",
+    params: dict | None = None,
+    n_jobs: int = 0,
+    time_budget_s: float = 0,
+    features: dict | None = None,
+    warm_start_from: str | None = None,
+    compress: int | tuple[str, int] = 0,
+) -> TrainResult:
     """
-    MVP 학습:
-    - processed.csv에서 label 컬럼을 타깃으로 사용
-    - 간단한 RandomForest로 학습
-    - model.joblib 저장
+    학습 후 model.joblib / split.npy 저장.
+    메모리에 올라온 모델과 val 데이터도 함께 반환해 evaluate가 재로딩·재분할 없이 사용(fused 모드)
+    features: processed_path가 features.arrow일 때 사용한 spec(번들에 저장해 serving이 같은 특성을 계산)
+    warm_start_from: parent run의 model.joblib. parent가 학습한 행(번들의 rows) 이후의 delta만 읽어
+    이어서 학습하고 val도 delta 안에서 나눔. 조건이 맞지 않거나 모델이 지원하지 않으면 전체 재학습
+    compress: 번들 joblib 압축(artifacts.model_compress). 0이면 비압축(로딩 시 mmap)
     """
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(processed_path)
-    if "label" not in df.columns:
+    columns = processed_columns(processed_path)
+    if "label" not in columns:
         raise ValueError("processed data must contain 'label' column for MVP training")
 
-    X = df.drop(columns=["label"])
-    y = df["label"]
+    n_rows = processed_rows(processed_path)
+    fitted = None
+    parent = _warm_parent(warm_start_from, model_type, columns, features, n_rows)
+    if parent:
+        start = parent["rows"]
+        df = read_processed(processed_path, rows=np.arange(start, n_rows))
+        X, y = df.drop(columns=["label"]), df["label"]
+        train_idx, val_idx = split_indices(y)
+        fitted = warm_fit_model(model_type, parent["model"], params, X.iloc[train_idx], y.iloc[train_idx], n_jobs=n_jobs)
+    if fitted:
+        model, fit_info = fitted
+        fit_info.update(parent_rows=start, delta_rows=n_rows - start)
+        offset = start
+    else:
+        df = read_processed(processed_path)
+        X, y = df.drop(columns=["label"]), df["label"]
+        train_idx, val_idx = split_indices(y)
+        model, fit_info = fit_model(model_type, params, X.iloc[train_idx], y.iloc[train_idx], n_jobs=n_jobs, time_budget_s=time_budget_s)
+        offset = 0
+    fit_info["train_rows"] = int(len(train_idx))
 
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    model_path = out / MODEL_FILE
+    bundle = {"model": model, "columns": list(X.columns), "model_type": model_type, "fit_info": fit_info, "features": features, "rows": n_rows}
+    dump_model(bundle, model_path, compress)
 
-    model = RandomForestClassifier(n_estimators=200, random_state=42)
-    model.fit(X_train, y_train)
+    split_path = out / SPLIT_FILE
+    split_path.unlink(missing_ok=True)
+    np.save(split_path, val_idx + offset)  # processed 파일 기준 행 위치
+    return TrainResult(str(model_path), str(split_path), model, fit_info, X.iloc[val_idx], y.iloc[val_idx])
 
-    model_path = out / "model.joblib"
-    joblib.dump({"model": model, "columns": list(X.columns)}, model_path)
-    return str(model_path)
+def train(processed_path: str, out_dir: str, run_id: int, model_type: str = "baseline_sklearn", params: dict | None = None) -> str:
+    """
+    MVP 학습:
+    - processed.arrow에서 label 컬럼을 타깃으로 사용
+    - model_type으로 pipelines/models.py registry의 추정기 선택(params로 하이퍼파라미터 덮어쓰기)
+    - model.joblib + split.npy(val 행 위치) 저장
+    """
+    return fit(processed_path, out_dir, run_id, model_type, params).model_path
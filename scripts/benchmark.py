@@ -0,0 +1,266 @@
+"""
+파이프라인/API 성능 벤치마크.
+
+    # 파이프라인 스텝(in-process): preprocess / features / train / evaluate / predict
+    python scripts/benchmark.py --tiers small,medium
+
+    # API 포함: 데이터셋 등록 → run 완료까지(e2e) + 주요 엔드포인트 지연시간
+    python scripts/benchmark.py --tiers small --api-base http://localhost:8000/api
+
+    # 이전 결과와 비교(기준보다 20% 이상 느려진 항목이 있으면 exit code 1)
+    python scripts/benchmark.py --tiers small --compare /data/bench/baseline.json
+
+결과는 JSON(--out, 기본 DATA_ROOT/bench/results-<시각>.json)으로 저장
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# 컨테이너(/app: app, pipelines, scripts)와 저장소(apps/api/app, pipelines) 양쪽에서 실행
+sys.path[:0] = [str(ROOT), str(ROOT / "apps" / "api")]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_sample_data import FORMATS, generate  # noqa: E402
+
+DATA_ROOT = os.environ.get("DATA_ROOT", "/data")
+TIERS = {"small": 10_000, "medium": 1_000_000, "large": 10_000_000, "xlarge": 100_000_000}
+RUN_TERMINAL = ("success", "failed", "canceled")
+# 비교 기준 지표(클수록 느림)
+COMPARE_KEYS = ("wall_seconds", "p95_ms")
+
+# ---------------------------------------------------------------------------
+# pipeline (in-process)
+# ---------------------------------------------------------------------------
+
+def bench_pipeline(tier: str, src: Path, work: Path, args) -> list[dict]:
+    from app.services.profiling import StepProfiler, file_bytes
+    from app.services.serving import score_frame
+    from pipelines.artifacts import load_model, processed_rows
+    from pipelines.evaluate import evaluate
+    from pipelines.features import build_features
+    from pipelines.preprocess import preprocess
+    from pipelines.train import fit
+
+    results = []
+
+    def record(name: str, prof: StepProfiler, **io):
+        fields = prof.stop(**io)
+        results.append({"tier": tier, "phase": "pipeline", "name": name, **fields})
+        print(f"  {name:<10} {fields['wall_seconds']:>9.3f}s  cpu {fields['cpu_seconds']:>9.3f}s  rss {fields['peak_rss_mb']:>8.1f}MB  "
+              f"{fields['rows_per_sec'] or 0:>12.0f} rows/s")
+
+    prof = StepProfiler()
+    processed = preprocess(str(src), str(work / "processed"), 0, mode=args.preprocess_mode, memory_budget_mb=args.memory_budget_mb)
+    n = processed_rows(processed)
+    record("preprocess", prof, rows_in=n, rows_out=n, bytes_read=file_bytes(str(src)), bytes_written=file_bytes(processed))
+
+    train_input = processed
+    spec = None
+    if not args.no_features:
+        prof = StepProfiler()
+        train_input = build_features(processed, str(work / "features"), 0)
+        record("features", prof, rows_in=n, rows_out=n, bytes_read=file_bytes(processed), bytes_written=file_bytes(train_input))
+        from pipelines.features import resolve_spec
+        spec = resolve_spec(None)
+
+    prof = StepProfiler()
+    trained = fit(train_input, str(work / "model"), 0, model_type=args.model_type, n_jobs=args.n_jobs,
+                  time_budget_s=args.time_budget_s, features=spec)
+    record("train", prof, rows_in=trained.fit_info["train_rows"], bytes_read=file_bytes(train_input),
+           bytes_written=file_bytes(trained.model_path, trained.split_path))
+    trained = None
+
+    prof = StepProfiler()
+    metrics = evaluate(train_input, str(work / "model" / "model.joblib"), str(work / "metrics"), 0, split_path=str(work / "model" / "split.npy"))
+    record("evaluate", prof, rows_in=metrics["val_samples"])
+    results[-1]["metrics"] = metrics
+
+    # serving 경로: 원본 행(특성 계산 포함) 배치 스코어링
+    bundle = load_model(work / "model" / "model.joblib")
+    batch = _predict_batch(src, args.predict_rows)
+    prof = StepProfiler()
+    score_frame(bundle, batch)
+    record("predict", prof, rows_in=len(batch))
+    return results
+
+def _predict_batch(src: Path, rows: int):
+    """원본 앞부분 rows행(time 순, 결측 채움, label 제외)만 읽음"""
+    from pipelines.readers import detect_format, iter_frames
+    batch = next(iter_frames(src, detect_format(src), rows))
+    if "time" in batch.columns:
+        batch = batch.sort_values("time")
+    return batch.drop(columns=["label"]).ffill().bfill()
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+def _call(base: str, method: str, path: str, body: dict | None = None, timeout: float = 60) -> bytes:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base.rstrip("/") + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.read()
+
+def _request(base: str, method: str, path: str, body: dict | None = None):
+    return json.loads(_call(base, method, path, body) or b"null")
+
+def _latency(base: str, method: str, path: str, body: dict | None, requests: int) -> dict:
+    samples = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        _call(base, method, path, body)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "requests": requests,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+def bench_api(tier: str, src: Path, args) -> list[dict]:
+    """API가 src 경로를 볼 수 있어야 함(같은 DATA_ROOT 볼륨)"""
+    base = args.api_base
+    results = []
+    ds = _request(base, "POST", "/datasets", {"name": f"bench {tier} {src.name}", "source_path": str(src), "meta": {"bench": tier}})
+
+    t0 = time.perf_counter()
+    run = _request(base, "POST", "/runs", {"dataset_id": ds["id"], "model_type": args.model_type})
+    while run["status"] not in RUN_TERMINAL:
+        if time.perf_counter() - t0 > args.run_timeout_s:
+            raise TimeoutError(f"run {run['id']} did not finish within {args.run_timeout_s}s")
+        time.sleep(0.5)
+        run = _request(base, "GET", f"/runs/{run['id']}")
+    wall = time.perf_counter() - t0
+    steps = {s["name"]: {k: s.get(k) for k in ("status", "wall_seconds", "cpu_seconds", "peak_rss_mb", "rows_in", "rows_per_sec")} for s in run["steps"]}
+    results.append({"tier": tier, "phase": "api", "name": "run e2e", "run_id": run["id"], "status": run["status"],
+                    "wall_seconds": round(wall, 3), "steps": steps, "metrics": run["metrics"]})
+    print(f"  run e2e    {wall:>9.3f}s  ({run['status']})")
+    if run["status"] != "success":
+        return results
+
+    batch = _predict_batch(src, args.predict_rows)
+    predict_body = {"columns": list(batch.columns), "data": batch.astype(object).where(batch.notna(), None).values.tolist()}
+    endpoints = [
+        ("GET /health", "GET", "/health", None),
+        ("GET /runs", "GET", "/runs?limit=50", None),
+        ("GET /runs/{id}", "GET", f"/runs/{run['id']}", None),
+        ("GET /datasets", "GET", "/datasets?limit=100", None),
+        ("POST /runs/{id}/predict", "POST", f"/runs/{run['id']}/predict", predict_body),
+        ("GET /metrics", "GET", "/metrics", None),
+    ]
+    for name, method, path, body in endpoints:
+        stats = _latency(base, method, path, body, args.requests)
+        results.append({"tier": tier, "phase": "api", "name": name, **stats})
+        print(f"  {name:<26} p50 {stats['p50_ms']:>9.3f}ms  p95 {stats['p95_ms']:>9.3f}ms")
+    return results
+
+# ---------------------------------------------------------------------------
+# compare
+# ---------------------------------------------------------------------------
+
+def compare(baseline: dict, current: dict, max_regression: float) -> list[str]:
+    """(tier, phase, name)가 같은 항목의 wall_seconds / p95_ms 비교 → 허용치를 넘은 항목 목록"""
+    def index(doc):
+        return {(r["tier"], r["phase"], r["name"]): r for r in doc["results"]}
+
+    base, regressions = index(baseline), []
+    for key, cur in index(current).items():
+        old = base.get(key)
+        if not old:
+            continue
+        for metric in COMPARE_KEYS:
+            if old.get(metric) and cur.get(metric) is not None:
+                ratio = cur[metric] / old[metric]
+                flag = ratio > 1 + max_regression
+                print(f"  {'/'.join(key):<48} {metric:<12} {old[metric]:>10.3f} -> {cur[metric]:>10.3f}  x{ratio:.2f}{'  REGRESSION' if flag else ''}")
+                if flag:
+                    regressions.append(f"{'/'.join(key)} {metric} x{ratio:.2f}")
+    return regressions
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인/API 벤치마크")
+    parser.add_argument("--tiers", default="small,medium", help=f"쉼표 구분({', '.join(f'{k}={v}' for k, v in TIERS.items())}) 또는 행 수")
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--disorder-rate", type=float, default=0.0)
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model-type", default="baseline_sklearn")
+    parser.add_argument("--n-jobs", type=int, default=0)
+    parser.add_argument("--time-budget-s", type=float, default=0)
+    parser.add_argument("--preprocess-mode", default="auto")
+    parser.add_argument("--memory-budget-mb", type=int, default=1024)
+    parser.add_argument("--no-features", action="store_true")
+    parser.add_argument("--predict-rows", type=int, default=1000)
+    parser.add_argument("--api-base", help="지정하면 API e2e/엔드포인트 지연시간도 측정")
+    parser.add_argument("--requests", type=int, default=50, help="엔드포인트별 요청 수")
+    parser.add_argument("--run-timeout-s", type=float, default=3600)
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--work-dir", default=str(Path(DATA_ROOT) / "bench"))
+    parser.add_argument("--out")
+    parser.add_argument("--compare", help="이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    work = Path(args.work_dir)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    doc = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": [],
+    }
+    for tier in [t.strip() for t in args.tiers.split(",") if t.strip()]:
+        rows = TIERS[tier] if tier in TIERS else int(tier)
+        name = f"bench_{rows}_{args.sensors}s_{args.missing_rate}m_{args.disorder_rate}d_{args.seed}{FORMATS[args.format]}"
+        src = work / "data" / name
+        if not src.exists():
+            print(f"[gen] {src}")
+            t0 = time.perf_counter()
+            generate(src, rows, args.sensors, args.missing_rate, args.disorder_rate, args.format, seed=args.seed)
+            doc["results"].append({"tier": tier, "phase": "generate", "name": "generate", "rows": rows,
+                                   "wall_seconds": round(time.perf_counter() - t0, 3), "bytes_written": src.stat().st_size})
+        print(f"[{tier}] rows={rows}")
+        tier_dir = work / "runs" / f"{tier}_{stamp}"
+        if not args.skip_pipeline:
+            doc["results"] += [{**r, "rows": rows} for r in bench_pipeline(tier, src, tier_dir, args)]
+        if args.api_base:
+            doc["results"] += [{**r, "rows": rows} for r in bench_api(tier, src, args)]
+
+    out = Path(args.out) if args.out else work / f"results-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    print(f"[OK] results written: {out}")
+
+    if args.compare:
+        print(f"[compare] {args.compare}")
+        regressions = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), doc, args.max_regression)
+        if regressions:
+            print(f"[FAIL] {len(regressions)} regression(s) over {args.max_regression:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
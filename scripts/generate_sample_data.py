@@ -1,31 +1,104 @@
 from __future__ import annotations
+import argparse
+import os
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import os
 
 DATA_ROOT = os.environ.get("DATA_ROOT", "/data")
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "jsonl": ".jsonl"}
+CHUNK_ROWS = 1_000_000
 
-def main():
-    inbound = Path(DATA_ROOT) / "inbound"
-    inbound.mkdir(parents=True, exist_ok=True)
-    out = inbound / "sample_timeseries.csv"
-
-    n = 500
-    time = np.arange(n)
-    s1 = np.sin(time / 10) + np.random.normal(0, 0.1, n)
-    s2 = np.cos(time / 15) + np.random.normal(0, 0.1, n)
+def _chunk(rng: np.random.Generator, start: int, n: int, sensors: int, missing_rate: float, disorder_rate: float) -> pd.DataFrame:
+    time = np.arange(start, start + n)
+    cols = {"time": time}
+    for k in range(1, sensors + 1):
+        # sensor_1 = sin(t/10), sensor_2 = cos(t/15), 이후 센서는 주기/위상을 바꾼 사인파 + 잡음
+        if k == 1:
+            signal = np.sin(time / 10)
+        elif k == 2:
+            signal = np.cos(time / 15)
+        else:
+            signal = np.sin(time / (10 + 5 * k) + k)
+        cols[f"sensor_{k}"] = signal + rng.normal(0, 0.1, n)
     # 간단한 규칙 기반 라벨
-    label = (s1 + 0.5 * s2 > 0.3).astype(int)
-
-    df = pd.DataFrame({
-        "time": time,
-        "sensor_1": s1,
-        "sensor_2": s2,
-        "label": label
-    })
-    df.to_csv(out, index=False)
-    print(f"[OK] sample data written: {out}")
+    s2 = cols["sensor_2"] if sensors >= 2 else 0
+    label = (cols["sensor_1"] + 0.5 * s2 > 0.3).astype(np.int64)
+
+    df = pd.DataFrame({**cols, "label": label})
+    if missing_rate > 0:
+        for k in range(1, sensors + 1):
+            col = f"sensor_{k}"
+            df.loc[rng.random(n) < missing_rate, col] = np.nan
+    if disorder_rate > 0:
+        # 일부 행의 위치를 청크 안에서 서로 섞어 time 순서를 깨뜨림(streaming 전처리의 external sort 경로)
+        idx = np.arange(n)
+        picked = np.flatnonzero(rng.random(n) < disorder_rate)
+        idx[picked] = rng.permutation(picked)
+        df = df.iloc[idx]
+    return df
+
+def generate(
+    out: str | Path,
+    rows: int = 500,
+    sensors: int = 2,
+    missing_rate: float = 0.0,
+    disorder_rate: float = 0.0,
+    fmt: str = "csv",
+    chunk_rows: int = CHUNK_ROWS,
+    seed: int = 42,
+) -> Path:
+    """
+    합성 시계열 생성. chunk_rows 단위로 만들어 바로 기록하므로 1억 행도 메모리 사용량이 일정.
+    .partial로 기록한 뒤 rename → watcher가 쓰는 중인 파일을 등록하지 않음
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format: {fmt} (available: {', '.join(FORMATS)})")
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".partial")
+    tmp.unlink(missing_ok=True)
+    rng = np.random.default_rng(seed)
+
+    writer = None
+    try:
+        for start in range(0, rows, chunk_rows):
+            df = _chunk(rng, start, min(chunk_rows, rows - start), sensors, missing_rate, disorder_rate)
+            if fmt == "csv":
+                df.to_csv(tmp, mode="a", header=start == 0, index=False)
+            elif fmt == "jsonl":
+                with tmp.open("a", encoding="utf-8") as f:
+                    df.to_json(f, orient="records", lines=True)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, out)
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 시계열 데이터 생성")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="센서 값 결측 비율(0~1)")
+    parser.add_argument("--disorder-rate", type=float, default=0.0, help="time 순서를 깨뜨릴 행 비율(0~1)")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="출력 경로(기본: DATA_ROOT/inbound/sample_timeseries.<ext>)")
+    args = parser.parse_args()
+    if args.sensors < 1:
+        parser.error("--sensors must be >= 1")
+
+    out = args.out or Path(DATA_ROOT) / "inbound" / f"sample_timeseries{FORMATS[args.format]}"
+    path = generate(out, args.rows, args.sensors, args.missing_rate, args.disorder_rate, args.format, args.chunk_rows, args.seed)
+    print(f"[OK] sample data written: {path} ({args.rows} rows, {args.sensors} sensors, {args.format})")
 
 if __name__ == "__main__":
     main()